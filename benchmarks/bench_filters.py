@@ -0,0 +1,84 @@
+"""
+Benchmark of graph filtering on a synthetic graph.
+
+Compares the single-pass CommonFilter.apply with the previous approach, which rebuilt the graph once
+per criterion and built a regular expression for every node.
+
+Usage: PYTHONPATH=src python benchmarks/bench_filters.py [--nodes 1000000] [--edges 3000000]
+"""
+import argparse
+import random
+import re
+import time
+
+from core.graph.filters import CommonFilter, FilterFunc
+from core.models.common import TypeSource
+from core.models.edge import Edge, TypeEdge
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+
+FILE_SIZE = 20
+PACKAGES = 50
+
+
+def make_graph(node_count: int, edge_count: int, seed: int = 1) -> Graph:
+    random.seed(seed)
+    graph = Graph()
+    file_count = max(node_count // FILE_SIZE, 1)
+    for number in range(file_count):
+        file_id = f"pkg{number % PACKAGES}/f{number}.py"
+        graph.add_node(Node(file_id, f"f{number}.py", TypeNode.FILE))
+
+    ids = []
+    for number in range(node_count - file_count):
+        file_id = f"pkg{number % file_count % PACKAGES}/f{number % file_count}.py"
+        node_id = f"{file_id}#n{number}"
+        ids.append(node_id)
+        graph.add_node(Node(node_id, f"n{number}", TypeNode.FUNC if number % 3 else TypeNode.CLASS))
+        graph.add_edge(Edge(file_id, node_id, TypeEdge.CONTAIN, TypeSource.CODE))
+
+    for _ in range(edge_count):
+        graph.add_edge(Edge(random.choice(ids), random.choice(ids), TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def legacy_apply(graph: Graph, nodes_types, edges_types, node_reg) -> Graph:
+    # One rebuild per criterion and a regular expression built per node, as before the single-pass filter
+    graph = FilterFunc.apply_nodes_filter(graph, lambda node: node.type in nodes_types)
+    graph = FilterFunc.apply_nodes_filter(
+        graph, lambda node: bool(re.match(f"^{node_reg.replace('.', '.').replace('*', '.*')}$", node.id)))
+    return FilterFunc.apply_edges_filter(graph, lambda edge: edge.type in edges_types)
+
+
+def measure(title: str, function):
+    start_time = time.perf_counter()
+    result = function()
+    print(f"{title:<40} {time.perf_counter() - start_time:8.3f}s "
+          f"{len(result.nodes):>9} nodes {sum(len(edges) for edges in result.edges.values()):>9} edges")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of graph filtering")
+    parser.add_argument("--nodes", type=int, default=1_000_000, help="Number of nodes")
+    parser.add_argument("--edges", type=int, default=3_000_000, help="Number of 'use' edges")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    graph = make_graph(args.nodes, args.edges)
+    print(f"graph of {len(graph.nodes)} nodes built in {time.perf_counter() - start_time:.1f}s")
+
+    node_types = [TypeNode.CLASS, TypeNode.FUNC]
+    edge_types = [TypeEdge.USE]
+    measure("legacy: types, pattern, edges", lambda: legacy_apply(graph, node_types, edge_types, "pkg1*"))
+    measure("single pass: types, pattern, edges", lambda: CommonFilter.apply(graph, node_types, edge_types, "pkg1*"))
+    measure(
+        "single pass: expressions", lambda: CommonFilter.apply(
+            graph, node_where="type in (class, func) and id ~ 'pkg1*/**'", edge_where="type = use"))
+    measure(
+        "single pass: expressions with not/or", lambda: CommonFilter.apply(
+            graph, node_where="not type = file and (id ~ 'pkg1/**' or name = n1)", edge_where="type = use"))
+
+
+if __name__ == "__main__":
+    main()
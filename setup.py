@@ -19,6 +19,10 @@ setup(
 
     # Зависимости
     install_requires=parse_requirements("requirements.txt"),
+    # Необязательные зависимости
+    extras_require={
+        "numpy": ["numpy>=1.24"],
+    },
     python_requires=">=3.10",
 
     # Метаданные
@@ -0,0 +1,198 @@
+from fnmatch import fnmatch
+import json
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from core.graph.components import ComponentFinder
+from core.graph.impact import ImpactAnalyzer
+from core.models.edge import TypeEdge
+from core.models.graph import Graph
+from core.models.node import TypeNode
+from utils.hash import stable_files_hash
+from utils.paths import graph_files, sidecar_path
+
+logger = logging.getLogger(__name__)
+
+# Matched against file names, so test modules are found in any directory; helpers such as conftest.py are not tests
+DEFAULT_TEST_PATTERNS = ["test_*.py", "*_test.py"]
+DEFAULT_TRAVERSED_EDGE_TYPES = [TypeEdge.USE]
+INDEX_FILE_NAME = "tests_index.json"
+
+
+class AffectedTestsIndex:
+    """
+    Reverse-reachability index from files to the test files that transitively use their code.
+
+    Each file is mapped to a bit mask over the test files, so a selection is a union of a few
+    integers and doesn't touch the graph at all.
+    """
+    __slots__ = ('tests', 'files', 'key')
+
+    def __init__(self, tests: List[str], files: Dict[str, int], key: str = ""):
+        self.tests = tests
+        self.files = files
+        self.key = key
+
+    @staticmethod
+    def is_test_file(file_id: str, patterns: Iterable[str] = DEFAULT_TEST_PATTERNS) -> bool:
+        """
+        Checks whether a file is a test by its path.
+
+        Patterns with a slash are matched against the whole path, the rest against the file name only.
+        """
+        file_name = file_id.rsplit('/', 1)[-1]
+        return any(fnmatch(file_id if '/' in pattern else file_name, pattern) for pattern in patterns)
+
+    @staticmethod
+    def build(graph: Graph,
+              patterns: Iterable[str] = DEFAULT_TEST_PATTERNS,
+              edge_types: Iterable[str] = DEFAULT_TRAVERSED_EDGE_TYPES) -> 'AffectedTestsIndex':
+        """
+        Builds the index of a graph.
+
+        Test bits are propagated from users to used nodes over the condensation of the graph: strongly
+        connected components are visited in topological order, so each component is finished once all
+        its users are, and every edge is processed exactly once.
+
+        Args:
+            graph (Graph): The graph to index
+            patterns (Iterable[str]): Patterns of test file paths
+            edge_types (Iterable[str]): Edge types through which a change reaches its users
+
+        Returns:
+            AffectedTestsIndex: The index
+        """
+        patterns = list(patterns)
+        edge_types = set(edge_types)
+        tests = sorted(node_id for node_id, node in graph.nodes.items()
+                       if node.type == TypeNode.FILE and AffectedTestsIndex.is_test_file(node_id, patterns))
+
+        node_bits: Dict[str, int] = {}
+        for bit, test_id in enumerate(tests):
+            for node_id in ImpactAnalyzer.expand(graph, [test_id]):
+                node_bits[node_id] = node_bits.get(node_id, 0) | (1 << bit)
+
+        components = ComponentFinder.strongly_connected(graph, edge_types)
+        component_of = {node_id: number for number, component in enumerate(components) for node_id in component}
+        component_bits = [0] * len(components)
+        for number, component in enumerate(components):
+            for node_id in component:
+                component_bits[number] |= node_bits.get(node_id, 0)
+
+        # Components come in reverse topological order, so users are visited before the nodes they use
+        for number in range(len(components) - 1, -1, -1):
+            bits = component_bits[number]
+            if not bits:
+                continue
+            for node_id in components[number]:
+                for edge in graph.get_edges_out(node_id):
+                    if edge.type in edge_types and edge.dest in component_of:
+                        component_bits[component_of[edge.dest]] |= bits
+
+        files: Dict[str, int] = {}
+        for node_id, node in graph.nodes.items():
+            if node.type != TypeNode.FILE:
+                continue
+            bits = component_bits[component_of[node_id]]
+            for code_id in ImpactAnalyzer.expand(graph, [node_id]):
+                bits |= component_bits[component_of[code_id]]
+            if bits:
+                files[node_id] = bits
+
+        logger.info(f"Indexed {len(files)} files reaching {len(tests)} test files")
+        return AffectedTestsIndex(tests, files)
+
+    def select(self, changed_files: Iterable[str], patterns: Iterable[str] = DEFAULT_TEST_PATTERNS) -> List[str]:
+        """
+        Selects the test files affected by changed files.
+
+        Changed test files are always selected, even if they are not in the indexed graph yet.
+
+        Args:
+            changed_files (Iterable[str]): Paths of the changed files relative to the graph root
+            patterns (Iterable[str]): Patterns of test file paths
+
+        Returns:
+            List[str]: Sorted paths of the affected test files
+        """
+        patterns = list(patterns)
+        bits = 0
+        selected = set()
+        for file_id in changed_files:
+            bits |= self.files.get(file_id, 0)
+            if AffectedTestsIndex.is_test_file(file_id, patterns):
+                selected.add(file_id)
+
+        bit = 0
+        while bits:
+            if bits & 1:
+                selected.add(self.tests[bit])
+            bits >>= 1
+            bit += 1
+
+        return sorted(selected)
+
+    def save(self, path: str | Path):
+        files = {file_id: f"{bits:x}" for file_id, bits in self.files.items()}
+        data = {"key": self.key, "tests": self.tests, "files": files}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    @staticmethod
+    def load(path: str | Path) -> Optional['AffectedTestsIndex']:
+        """Reads a saved index, None if it is missing or damaged."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            files = {file_id: int(bits, 16) for file_id, bits in data["files"].items()}
+            return AffectedTestsIndex(data["tests"], files, data["key"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.info(f"Index {path} can't be read: {str(e)}")
+            return None
+
+    @staticmethod
+    def load_or_build(graph_path: str | Path,
+                      build_graph: Callable[[str | Path], Graph],
+                      patterns: Iterable[str] = DEFAULT_TEST_PATTERNS,
+                      edge_types: Iterable[str] = DEFAULT_TRAVERSED_EDGE_TYPES) -> 'AffectedTestsIndex':
+        """
+        Returns the index stored next to a graph, rebuilding it if the graph or the parameters changed.
+
+        The stored index is keyed by a digest of the graph files, so a valid index is used without
+        building the graph.
+
+        Args:
+            graph_path (str | Path): Path to the graph directory or JSONL file
+            build_graph (Callable[[str | Path], Graph]): Function building the graph from graph_path
+            patterns (Iterable[str]): Patterns of test file paths
+            edge_types (Iterable[str]): Edge types through which a change reaches its users
+
+        Returns:
+            AffectedTestsIndex: The index
+        """
+        patterns = list(patterns)
+        edge_types = sorted(set(edge_types))
+        key = AffectedTestsIndex._key(graph_path, patterns, edge_types)
+        index_path = AffectedTestsIndex.index_path(graph_path)
+
+        index = AffectedTestsIndex.load(index_path)
+        if index is not None and index.key == key:
+            logger.info(f"Using index {index_path}")
+            return index
+
+        index = AffectedTestsIndex.build(build_graph(graph_path), patterns, edge_types)
+        index.key = key
+        try:
+            index.save(index_path)
+        except OSError as e:
+            logger.warning(f"Index {index_path} is not saved: {str(e)}")
+        return index
+
+    @staticmethod
+    def index_path(graph_path: str | Path) -> Path:
+        return sidecar_path(graph_path, INDEX_FILE_NAME)
+
+    @staticmethod
+    def _key(graph_path: str | Path, patterns: List[str], edge_types: List[str]) -> str:
+        return stable_files_hash(graph_files(graph_path), json.dumps([patterns, edge_types]))
@@ -4,14 +4,18 @@ import csv
 import logging
 import os
 from collections import deque
+import json
+import sys
+from typing import Iterator, List
 
+from core.models.delta import GraphDelta
 from core.models.edge import Edge
 from core.models.node import Node, TypeNode, CODE_NODE_TYPES, STRUCTURE_NODE_TYPES, ADDITIONAL_NODE_TYPES
 from core.models.graph import Graph
 from core.models.common import TypeSource
 from core.models.edge import TypeEdge
 
-from core.graph.difference import DIFFERENCE_STATUS_FIELD
+from core.graph.difference import DIFFERENCE_STATUS_FIELD, MOVED_FROM_FIELD, TypeDiff
 from core.graph.hasher import Hasher
 
 logger = logging.getLogger(__name__)
@@ -98,7 +102,26 @@ class CSVGraphBuilder(IGraphBuilder):
             Graph: Graph object containing both code elements and manually added elements
         """
         graph = CSVGraphBuilder.build(graph_path)
+        return CSVGraphBuilder.add_additional(graph, additional_path)
 
+    @staticmethod
+    def add_additional(graph: Graph, additional_path: str) -> Graph:
+        f"""
+        Adds manually written elements to the graph in place and recalculates hashes.
+
+        All hashes are recalculated, which also repairs stale hashes of a graph read from a file.
+
+        Expects the following required files in the target directory:
+        - {additional_path}/{NODES_FILE_NAME}: List of graph nodes [id, name, type]
+        - {additional_path}/{EDGES_FILE_NAME}: List of edges between nodes [src, dest, type]
+
+        Args:
+            graph: Graph to extend
+            additional_path: Path to the directory with additional elements
+
+        Returns:
+            Graph: The same graph object containing both code elements and manually added elements
+        """
         nodes_path = os.path.join(additional_path, NODES_FILE_NAME)
         edges_path = os.path.join(additional_path, EDGES_FILE_NAME)
 
@@ -122,9 +145,11 @@ class CSVGraphBuilder(IGraphBuilder):
         Builds a difference graph between two project versions from CSV files in the specified directory.
 
         Expects the following two required files in the target directory:
-        - {NODES_FILE_NAME}: List of graph nodes [id, name, type, diff_status, source]
+        - {NODES_FILE_NAME}: List of graph nodes [id, name, type, diff_status, source, moved_from]
         - {EDGES_FILE_NAME}: List of edges between nodes [src, dest, type, diff_status, source]
 
+        The moved_from column is optional.
+
         Args:
             graph_path: Path to the graph directory
 
@@ -150,6 +175,40 @@ class CSVGraphBuilder(IGraphBuilder):
 
         return graph
 
+    @staticmethod
+    def build_delta(delta_path: str) -> GraphDelta:
+        f"""
+        Reads a graph delta from CSV files in the specified directory.
+
+        Expects the following two required files in the target directory:
+        - {NODES_FILE_NAME}: List of changed nodes [id, name, type, hash, diff_status, source]
+        - {EDGES_FILE_NAME}: List of changed edges [src, dest, type, diff_status, source]
+
+        Args:
+            delta_path: Path to the delta directory
+
+        Returns:
+            GraphDelta: Delta object
+        """
+        nodes_path = os.path.join(delta_path, NODES_FILE_NAME)
+        edges_path = os.path.join(delta_path, EDGES_FILE_NAME)
+
+        delta = GraphDelta()
+
+        try:
+            CSVGraphBuilder._process_delta_nodes(nodes_path, delta)
+            CSVGraphBuilder._process_delta_edges(edges_path, delta)
+        except FileNotFoundError as e:
+            text_error = f"File not found: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+        except csv.Error as e:
+            text_error = f"CSV error: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        return delta
+
     @staticmethod
     def init_additional_files(directory_path: str):
         f"""
@@ -236,6 +295,8 @@ class CSVGraphBuilder(IGraphBuilder):
                                 type=row['type'].strip(),
                                 source=row['source'].strip())
                     node.meta[DIFFERENCE_STATUS_FIELD] = row['diff_status'].strip()
+                    if (row.get('moved_from') or "").strip():
+                        node.meta[MOVED_FROM_FIELD] = row['moved_from'].strip()
 
                     if node.id in graph.nodes:
                         logger.info(f"Line {row_num}: Node {node.id} already exists - skipping")
@@ -320,6 +381,58 @@ class CSVGraphBuilder(IGraphBuilder):
                 except (KeyError, ValueError) as e:
                     logger.error(f"Line {row_num}: Edge parsing error - {str(e)}")
 
+    @staticmethod
+    def _process_delta_nodes(file_path: str, delta: GraphDelta) -> None:
+        nodes_by_status = {
+            TypeDiff.NEW: delta.added_nodes,
+            TypeDiff.DELETED: delta.removed_nodes,
+            TypeDiff.CHANGED: delta.changed_nodes,
+        }
+        with open(file_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row_num, row in enumerate(reader, 1):
+                try:
+                    node = Node(id=row['id'].strip(),
+                                name=row['name'].strip(),
+                                type=row['type'].strip(),
+                                hash=row['hash'].strip(),
+                                source=row['source'].strip())
+                    status = row['diff_status'].strip()
+
+                    if status not in nodes_by_status:
+                        logger.error(f"Line {row_num}: Unknown delta status {status} for node {node.id}")
+                        continue
+
+                    nodes_by_status[status][node.id] = node
+
+                except (KeyError, ValueError) as e:
+                    logger.error(f"Line {row_num}: Node parsing error - {str(e)}")
+
+    @staticmethod
+    def _process_delta_edges(file_path: str, delta: GraphDelta) -> None:
+        edges_by_status = {
+            TypeDiff.NEW: delta.added_edges,
+            TypeDiff.DELETED: delta.removed_edges,
+        }
+        with open(file_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row_num, row in enumerate(reader, 1):
+                try:
+                    edge = Edge(src=row['src'].strip(),
+                                dest=row['dest'].strip(),
+                                type=row['type'].strip(),
+                                source=row['source'].strip())
+                    status = row['diff_status'].strip()
+
+                    if status not in edges_by_status:
+                        logger.error(f"Line {row_num}: Unknown delta status {status} for edge {edge.src}->{edge.dest}")
+                        continue
+
+                    edges_by_status[status].add(edge)
+
+                except (KeyError, ValueError) as e:
+                    logger.error(f"Line {row_num}: Edge parsing error - {str(e)}")
+
     @staticmethod
     def _add_arc_edge(edge: Edge, graph: Graph) -> bool:
         dest_node = graph.get_node(edge.dest)
@@ -358,3 +471,111 @@ class CSVGraphBuilder(IGraphBuilder):
         else:
             logger.warning(f"Unknown destination node type: {dest_node.type}")
             return False
+
+
+class JSONLGraphBuilder(IGraphBuilder):
+    """
+    Reads graphs written by JSONLGraphExporter: one JSON object per line, either
+    {"kind": "node", "id", "name", "type", "hash", "source", "meta"} or
+    {"kind": "edge", "src", "dest", "type", "source", "meta"}.
+    The path '-' stands for the standard input.
+    """
+
+    @staticmethod
+    def build(graph_path: str) -> Graph:
+        """
+        Builds a graph from a JSON Lines file.
+
+        Edges that arrive before their nodes are kept until the end of the stream.
+
+        Args:
+            graph_path: Path to the file or '-' for the standard input
+
+        Returns:
+            Graph: Constructed dependency graph object
+        """
+        graph = Graph()
+        pending_edges: List[Edge] = []
+
+        for element in JSONLGraphBuilder.iter_elements(graph_path):
+            if isinstance(element, Node):
+                if not graph.add_node(element):
+                    logger.info(f"Node {element.id} already exists - skipping")
+            elif not graph.add_edge(element):
+                pending_edges.append(element)
+
+        for edge in pending_edges:
+            if not graph.add_edge(edge):
+                logger.error(f"Cannot add edge {edge.src}->{edge.dest} (nodes missing)")
+
+        return graph
+
+    @staticmethod
+    def union(graph_path: str, additional_path: str) -> Graph:
+        """
+        Creates a merged graph from a JSON Lines graph and the directory of additional manually
+        written elements (see CSVGraphBuilder.init_additional_files and CSVGraphBuilder.add_additional).
+        """
+        graph = JSONLGraphBuilder.build(graph_path)
+        return CSVGraphBuilder.add_additional(graph, additional_path)
+
+    @staticmethod
+    def build_diff(graph_path: str) -> Graph:
+        """
+        Builds a difference graph from a JSON Lines file.
+
+        The difference status is read from meta['difference_status'] of each record.
+        """
+        return JSONLGraphBuilder.build(graph_path)
+
+    @staticmethod
+    def init_additional_files(directory_path: str):
+        CSVGraphBuilder.init_additional_files(directory_path)
+
+    @staticmethod
+    def iter_elements(graph_path: str) -> Iterator[Node | Edge]:
+        """
+        Reads nodes and edges one by one without building a graph.
+
+        Args:
+            graph_path: Path to the file or '-' for the standard input
+
+        Yields:
+            Node | Edge: Elements in the order of the stream
+        """
+        try:
+            f = sys.stdin if graph_path == "-" else open(graph_path, 'r', encoding='utf-8')
+        except FileNotFoundError as e:
+            text_error = f"File not found: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        try:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield JSONLGraphBuilder.record_to_element(json.loads(line))
+                except (KeyError, ValueError, TypeError) as e:
+                    logger.error(f"Line {line_num}: Record parsing error - {str(e)}")
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+    @staticmethod
+    def record_to_element(record: dict) -> Node | Edge:
+        if record['kind'] == 'node':
+            return Node(id=record['id'],
+                        name=record['name'],
+                        type=record['type'],
+                        hash=record.get('hash', ""),
+                        source=record.get('source', TypeSource.CODE),
+                        meta=record.get('meta', {}))
+        if record['kind'] == 'edge':
+            return Edge(src=record['src'],
+                        dest=record['dest'],
+                        type=record['type'],
+                        source=record.get('source', TypeSource.CODE),
+                        meta=record.get('meta', {}))
+        raise ValueError(f"Unknown record kind {record['kind']}")
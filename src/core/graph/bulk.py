@@ -0,0 +1,305 @@
+from collections import deque
+from importlib.util import find_spec
+import logging
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.graph.query import DIRECTIONS, Direction
+from core.models.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+# NumPy is optional and takes a noticeable time to import, so it is imported by the code using it
+# rather than with the module, which the CLI loads for every command
+NUMPY_INSTALLED = find_spec("numpy") is not None
+
+# Sources processed by one sweep, a multiple of 64 since each source is a bit of a 64-bit word
+DEFAULT_BATCH_SIZE = 512
+# Rows of the visited matrix unpacked at once when results are read
+UNPACK_ROWS = 1 << 14
+# A level only gathers the edges leaving the frontier while they are this many times fewer than all edges
+PUSH_RATIO = 4
+
+
+class CSRAdjacency:
+    """
+    Adjacency of a graph in compressed sparse row form: the neighbours of the node with number i are
+    indices[indptr[i]:indptr[i + 1]]. Arrays are NumPy arrays if NumPy is installed, lists otherwise.
+    """
+    __slots__ = ('ids', 'index', 'indptr', 'indices')
+
+    def __init__(self, ids: List[str], indptr, indices):
+        self.ids = ids
+        self.index: Dict[str, int] = {node_id: number for number, node_id in enumerate(ids)}
+        self.indptr = indptr
+        self.indices = indices
+
+    @staticmethod
+    def build(graph: Graph,
+              edge_types: Optional[Iterable[str]] = None,
+              direction: str = Direction.OUT,
+              use_numpy: bool = True) -> 'CSRAdjacency':
+        """
+        Exports the graph to CSR adjacency.
+
+        Args:
+            graph (Graph): The graph to export
+            edge_types (Optional[Iterable[str]]): Edge types to include, all types if None
+            direction (str): 'out' for neighbours along edges, 'in' against them, 'both' for either
+            use_numpy (bool): Store arrays as NumPy arrays if NumPy is installed
+
+        Returns:
+            CSRAdjacency: The adjacency of all nodes of the graph
+        """
+        if direction not in DIRECTIONS:
+            text_error = f"Unknown direction {direction}, expected one of {DIRECTIONS}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        edge_types = set(edge_types) if edge_types is not None else None
+        ids = list(graph.nodes)
+        index = {node_id: number for number, node_id in enumerate(ids)}
+
+        srcs: List[int] = []
+        dests: List[int] = []
+        for edges in graph.edges.values():
+            for edge in edges:
+                if edge_types is not None and edge.type not in edge_types:
+                    continue
+                src, dest = index.get(edge.src), index.get(edge.dest)
+                if src is not None and dest is not None:
+                    srcs.append(src)
+                    dests.append(dest)
+        if direction == Direction.IN:
+            srcs, dests = dests, srcs
+        elif direction == Direction.BOTH:
+            srcs, dests = srcs + dests, dests + srcs
+
+        if use_numpy and NUMPY_INSTALLED:
+            import numpy as np
+            # Sorting the pairs by a combined key orders them by row and drops repeated edges
+            keys = np.sort(np.array(srcs, dtype=np.int64) * len(ids) + np.array(dests, dtype=np.int64))
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+            rows = keys // max(len(ids), 1)
+            indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=len(ids)), out=indptr[1:])
+            return CSRAdjacency(ids, indptr, keys % max(len(ids), 1))
+
+        neighbours: List[Set[int]] = [set() for _ in ids]
+        for src, dest in zip(srcs, dests):
+            neighbours[src].add(dest)
+        indptr = [0]
+        indices: List[int] = []
+        for node_neighbours in neighbours:
+            indices.extend(sorted(node_neighbours))
+            indptr.append(len(indices))
+        return CSRAdjacency(ids, indptr, indices)
+
+    def reversed(self) -> 'CSRAdjacency':
+        """Returns the adjacency with all edges reversed (NumPy arrays only)."""
+        import numpy as np
+        node_count = len(self.ids)
+        rows = np.repeat(np.arange(node_count, dtype=np.int64), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind='stable')
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=node_count), out=indptr[1:])
+        return CSRAdjacency(self.ids, indptr, rows[order])
+
+
+class BulkReachability:
+    """
+    Neighbourhoods and reachable set sizes of many nodes at once.
+
+    With NumPy every sweep processes a batch of sources together: the nodes reached from each source are
+    a bit column of a matrix with a row of 64-bit words per node, and one breadth-first level for the
+    whole batch is a gather of the frontier rows along the edges and an OR of the rows arriving at each
+    node. A small frontier pushes its rows along its own edges, a large one is pulled by every node over
+    all edges. Without NumPy a breadth-first search runs from every source separately.
+    """
+
+    @staticmethod
+    def reachable_counts(graph: Graph,
+                         sources: Optional[Iterable[str]] = None,
+                         hops: int = 0,
+                         edge_types: Optional[Iterable[str]] = None,
+                         direction: str = Direction.OUT,
+                         batch_size: int = DEFAULT_BATCH_SIZE,
+                         use_numpy: bool = True) -> Dict[str, int]:
+        """
+        Counts the nodes reachable from each source, for example the transitive fan-in of every file.
+
+        Args:
+            graph (Graph): The graph to analyze
+            sources (Optional[Iterable[str]]): IDs of the source nodes, all nodes if None
+            hops (int): Maximum number of hops from a source, 0 for no limit
+            edge_types (Optional[Iterable[str]]): Edge types to follow, all types if None
+            direction (str): 'out' to follow edges, 'in' to follow them backwards, 'both' for either
+            batch_size (int): Number of sources processed by one sweep
+            use_numpy (bool): Use NumPy if it is installed
+
+        Returns:
+            Dict[str, int]: Number of nodes reachable from each source, not counting the source itself
+        """
+        counts: Dict[str, int] = {}
+        for batch, reached in BulkReachability._sweeps(graph, sources, hops, edge_types, direction, batch_size,
+                                                       use_numpy):
+            for node_id, nodes in zip(batch, reached):
+                counts[node_id] = len(nodes) - 1 if isinstance(nodes, set) else int(nodes) - 1
+        return counts
+
+    @staticmethod
+    def neighbourhoods(graph: Graph,
+                       sources: Iterable[str],
+                       hops: int = 1,
+                       edge_types: Optional[Iterable[str]] = None,
+                       direction: str = Direction.OUT,
+                       batch_size: int = DEFAULT_BATCH_SIZE,
+                       use_numpy: bool = True) -> Dict[str, Set[str]]:
+        """
+        Collects the nodes within a number of hops from each source.
+
+        Args:
+            graph (Graph): The graph to analyze
+            sources (Iterable[str]): IDs of the source nodes
+            hops (int): Maximum number of hops from a source, 0 for no limit
+            edge_types (Optional[Iterable[str]]): Edge types to follow, all types if None
+            direction (str): 'out' to follow edges, 'in' to follow them backwards, 'both' for either
+            batch_size (int): Number of sources processed by one sweep
+            use_numpy (bool): Use NumPy if it is installed
+
+        Returns:
+            Dict[str, Set[str]]: IDs of the nodes reached from each source, not including the source itself
+        """
+        result: Dict[str, Set[str]] = {}
+        for batch, reached in BulkReachability._sweeps(graph,
+                                                       sources,
+                                                       hops,
+                                                       edge_types,
+                                                       direction,
+                                                       batch_size,
+                                                       use_numpy,
+                                                       collect=True):
+            for node_id, nodes in zip(batch, reached):
+                result[node_id] = nodes - {node_id}
+        return result
+
+    @staticmethod
+    def _sweeps(graph: Graph,
+                sources: Optional[Iterable[str]],
+                hops: int,
+                edge_types: Optional[Iterable[str]],
+                direction: str,
+                batch_size: int,
+                use_numpy: bool,
+                collect: bool = False) -> Iterator[Tuple[List[str], list]]:
+        # Yields batches of sources with, for each of them, the set of reached IDs or their number
+        start_time = time.perf_counter()
+        if sources is None:
+            sources = list(graph.nodes)
+        sources = list(dict.fromkeys(node_id for node_id in sources if node_id in graph.nodes))
+
+        if use_numpy and NUMPY_INSTALLED:
+            push = CSRAdjacency.build(graph, edge_types, direction)
+            pull = push.reversed()
+            batch_size = max(64, batch_size - batch_size % 64)
+            for start in range(0, len(sources), batch_size):
+                batch = sources[start:start + batch_size]
+                visited = BulkReachability._sweep(push, pull, [push.index[node_id] for node_id in batch], hops)
+                if collect:
+                    yield batch, BulkReachability._reached_sets(push.ids, visited, len(batch))
+                else:
+                    yield batch, BulkReachability._reached_counts(visited, len(batch))
+        else:
+            push = CSRAdjacency.build(graph, edge_types, direction, use_numpy=False)
+            for start in range(0, len(sources), batch_size):
+                batch = sources[start:start + batch_size]
+                reached = [BulkReachability._bfs(push, push.index[node_id], hops) for node_id in batch]
+                yield batch, [{push.ids[number] for number in numbers} for numbers in reached]
+
+        logger.info(f"Processed {len(sources)} sources in {time.perf_counter() - start_time:.3f}s "
+                    f"({'numpy' if use_numpy and NUMPY_INSTALLED else 'python'})")
+
+    @staticmethod
+    def _sweep(push: CSRAdjacency, pull: CSRAdjacency, batch: List[int], hops: int):
+        import numpy as np
+        words = (len(batch) + 63) // 64
+        visited = np.zeros((len(push.ids), words), dtype=np.uint64)
+        for column, number in enumerate(batch):
+            visited[number, column // 64] |= np.uint64(1 << (column % 64))
+        frontier = visited.copy()
+
+        push_degrees = np.diff(push.indptr)
+        pull_rows = np.flatnonzero(np.diff(pull.indptr))
+        pull_starts = pull.indptr[:-1][pull_rows]
+        level = 0
+        while hops == 0 or level < hops:
+            active = np.flatnonzero(frontier.any(axis=1))
+            active_degrees = push_degrees[active]
+            active_edges = int(active_degrees.sum())
+            if active_edges == 0:
+                break
+
+            reached = np.zeros_like(frontier)
+            if active_edges * PUSH_RATIO < len(push.indices):
+                # Small frontier: only the edges leaving it are gathered and grouped by their ends
+                positions = np.repeat(push.indptr[active] - np.cumsum(active_degrees) + active_degrees,
+                                      active_degrees) + np.arange(active_edges)
+                dests = push.indices[positions]
+                order = np.argsort(dests, kind='stable')
+                dests = dests[order]
+                values = frontier[np.repeat(active, active_degrees)][order]
+                rows, starts = np.unique(dests, return_index=True)
+                reached[rows] = np.bitwise_or.reduceat(values, starts, axis=0)
+            else:
+                # Large frontier: every node ORs the rows of the nodes it is reached from, consecutive
+                # starts delimit them since nodes without such neighbours are skipped
+                reached[pull_rows] = np.bitwise_or.reduceat(frontier[pull.indices], pull_starts, axis=0)
+
+            frontier = reached & ~visited
+            if not frontier.any():
+                break
+            visited |= frontier
+            level += 1
+        return visited
+
+    @staticmethod
+    def _unpacked(visited, column_count: int) -> Iterator[Tuple[object, object]]:
+        # Rows reached from any source with their bits unpacked, bit j of a row is the source j of the batch
+        import numpy as np
+        reached_rows = np.flatnonzero(visited.any(axis=1))
+        for start in range(0, len(reached_rows), UNPACK_ROWS):
+            rows = reached_rows[start:start + UNPACK_ROWS]
+            chunk = visited[rows].astype('<u8', copy=False)
+            yield rows, np.unpackbits(chunk.view(np.uint8), axis=1, bitorder='little')[:, :column_count]
+
+    @staticmethod
+    def _reached_counts(visited, column_count: int) -> List[int]:
+        import numpy as np
+        counts = np.zeros(column_count, dtype=np.int64)
+        for _, bits in BulkReachability._unpacked(visited, column_count):
+            counts += bits.sum(axis=0, dtype=np.int64)
+        return counts.tolist()
+
+    @staticmethod
+    def _reached_sets(ids: List[str], visited, column_count: int) -> List[Set[str]]:
+        import numpy as np
+        result: List[Set[str]] = [set() for _ in range(column_count)]
+        for rows, bits in BulkReachability._unpacked(visited, column_count):
+            positions, columns = np.nonzero(bits)
+            for row, column in zip(rows[positions].tolist(), columns.tolist()):
+                result[column].add(ids[row])
+        return result
+
+    @staticmethod
+    def _bfs(push: CSRAdjacency, start: int, hops: int) -> Set[int]:
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if hops and distances[current] >= hops:
+                continue
+            for neighbour in push.indices[push.indptr[current]:push.indptr[current + 1]]:
+                if neighbour not in distances:
+                    distances[neighbour] = distances[current] + 1
+                    queue.append(neighbour)
+        return set(distances)
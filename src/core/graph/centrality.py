@@ -0,0 +1,218 @@
+from collections import deque
+import logging
+import random
+import time
+from typing import Dict, Iterable, List
+
+from core.graph.bulk import NUMPY_INSTALLED, CSRAdjacency
+from core.graph.query import Direction
+from core.models.edge import TypeEdge
+from core.models.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CENTRALITY_EDGE_TYPES = [TypeEdge.USE]
+DEFAULT_DAMPING = 0.85
+# Iterations stop when the ranks change by less than this in total
+DEFAULT_TOLERANCE = 1e-6
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_BETWEENNESS_SAMPLES = 100
+
+
+class CentralityMetric:
+    PAGERANK = "pagerank"
+    BETWEENNESS = "betweenness"
+
+
+CENTRALITY_METRICS = [CentralityMetric.PAGERANK, CentralityMetric.BETWEENNESS]
+
+
+class Centrality:
+    """
+    Centrality of graph elements on array-backed adjacency (see CSRAdjacency). With NumPy every step is a
+    vectorized operation over all edges or over the edges of a breadth-first level, without NumPy the same
+    algorithms run as plain loops.
+    """
+
+    @staticmethod
+    def pagerank(graph: Graph,
+                 edge_types: Iterable[str] = DEFAULT_CENTRALITY_EDGE_TYPES,
+                 damping: float = DEFAULT_DAMPING,
+                 tolerance: float = DEFAULT_TOLERANCE,
+                 max_iterations: int = DEFAULT_MAX_ITERATIONS,
+                 use_numpy: bool = True) -> Dict[str, float]:
+        """
+        Computes PageRank by power iteration: an element is important if important elements use it.
+
+        The rank of elements without dependencies is spread evenly over all elements, so the ranks always
+        sum to one. Iterations stop when the total change of the ranks falls below the tolerance.
+
+        Args:
+            graph (Graph): The graph to analyze
+            edge_types (Iterable[str]): Edge types forming dependencies
+            damping (float): Probability to follow a dependency rather than jump to a random element
+            tolerance (float): Total change of the ranks at which iterations stop
+            max_iterations (int): Maximum number of iterations
+            use_numpy (bool): Use NumPy if it is installed
+
+        Returns:
+            Dict[str, float]: Rank of every element
+        """
+        adjacency = CSRAdjacency.build(graph, edge_types, Direction.OUT, use_numpy)
+        node_count = len(adjacency.ids)
+        if node_count == 0:
+            return {}
+
+        start_time = time.perf_counter()
+        if use_numpy and NUMPY_INSTALLED:
+            import numpy as np
+            out_degrees = np.diff(adjacency.indptr).astype(np.float64)
+            sources = np.repeat(np.arange(node_count), np.diff(adjacency.indptr))
+            dangling = out_degrees == 0
+            ranks = np.full(node_count, 1.0 / node_count)
+            for iteration in range(1, max_iterations + 1):
+                shares = np.divide(ranks, out_degrees, out=np.zeros(node_count), where=~dangling)
+                spread = (1.0 - damping + damping * ranks[dangling].sum()) / node_count
+                new_ranks = spread + damping * np.bincount(adjacency.indices, shares[sources], node_count)
+                change = float(np.abs(new_ranks - ranks).sum())
+                ranks = new_ranks
+                if change < tolerance:
+                    break
+            result = dict(zip(adjacency.ids, ranks.tolist()))
+        else:
+            ranks = [1.0 / node_count] * node_count
+            for iteration in range(1, max_iterations + 1):
+                dangling_rank = 0.0
+                new_ranks = [0.0] * node_count
+                for number in range(node_count):
+                    start, end = adjacency.indptr[number], adjacency.indptr[number + 1]
+                    if start == end:
+                        dangling_rank += ranks[number]
+                        continue
+                    share = ranks[number] / (end - start)
+                    for neighbour in adjacency.indices[start:end]:
+                        new_ranks[neighbour] += share
+                spread = (1.0 - damping + damping * dangling_rank) / node_count
+                new_ranks = [spread + damping * rank for rank in new_ranks]
+                change = sum(abs(new - old) for new, old in zip(new_ranks, ranks))
+                ranks = new_ranks
+                if change < tolerance:
+                    break
+            result = dict(zip(adjacency.ids, ranks))
+
+        logger.info(f"PageRank took {iteration} iterations, {time.perf_counter() - start_time:.3f}s")
+        return result
+
+    @staticmethod
+    def betweenness(graph: Graph,
+                    samples: int = DEFAULT_BETWEENNESS_SAMPLES,
+                    edge_types: Iterable[str] = DEFAULT_CENTRALITY_EDGE_TYPES,
+                    seed: int = 0,
+                    use_numpy: bool = True) -> Dict[str, float]:
+        """
+        Estimates betweenness centrality with Brandes' algorithm from a random sample of sources: an element
+        is central if many shortest dependency paths pass through it.
+
+        The dependencies accumulated from the sampled sources are scaled by the number of all elements
+        divided by the number of samples, which gives an unbiased estimate of the exact values. With as many
+        samples as elements the values are exact.
+
+        Args:
+            graph (Graph): The graph to analyze
+            samples (int): Number of sampled sources
+            edge_types (Iterable[str]): Edge types forming dependencies
+            seed (int): Seed of the sampling, so that the estimate is reproducible
+            use_numpy (bool): Use NumPy if it is installed
+
+        Returns:
+            Dict[str, float]: Estimated betweenness of every element
+        """
+        adjacency = CSRAdjacency.build(graph, edge_types, Direction.OUT, use_numpy)
+        node_count = len(adjacency.ids)
+        if node_count == 0:
+            return {}
+
+        start_time = time.perf_counter()
+        sources = sorted(random.Random(seed).sample(range(node_count), min(samples, node_count)))
+        scale = node_count / len(sources)
+        if use_numpy and NUMPY_INSTALLED:
+            import numpy as np
+            centrality = np.zeros(node_count)
+            for source in sources:
+                centrality += Centrality._dependencies_numpy(adjacency, source)
+            result = dict(zip(adjacency.ids, (centrality * scale).tolist()))
+        else:
+            centrality = [0.0] * node_count
+            for source in sources:
+                for number, dependency in enumerate(Centrality._dependencies(adjacency, source)):
+                    centrality[number] += dependency
+            result = {node_id: value * scale for node_id, value in zip(adjacency.ids, centrality)}
+
+        logger.info(f"Betweenness from {len(sources)} sources took {time.perf_counter() - start_time:.3f}s")
+        return result
+
+    @staticmethod
+    def _dependencies_numpy(adjacency: CSRAdjacency, source: int):
+        # Breadth-first levels over the edges leaving the frontier, then dependencies back from the last level
+        import numpy as np
+        node_count = len(adjacency.ids)
+        out_degrees = np.diff(adjacency.indptr)
+        distances = np.full(node_count, -1, dtype=np.int64)
+        paths = np.zeros(node_count)
+        distances[source] = 0
+        paths[source] = 1.0
+
+        frontier = np.array([source], dtype=np.int64)
+        level_edges = []
+        level = 0
+        while len(frontier):
+            degrees = out_degrees[frontier]
+            edge_count = int(degrees.sum())
+            if edge_count == 0:
+                break
+            positions = np.repeat(adjacency.indptr[frontier] - np.cumsum(degrees) + degrees,
+                                  degrees) + np.arange(edge_count)
+            srcs = np.repeat(frontier, degrees)
+            dests = adjacency.indices[positions]
+
+            discovered = dests[distances[dests] == -1]
+            distances[discovered] = level + 1
+            on_paths = distances[dests] == level + 1
+            srcs, dests = srcs[on_paths], dests[on_paths]
+            np.add.at(paths, dests, paths[srcs])
+            level_edges.append((srcs, dests))
+            frontier = np.unique(discovered)
+            level += 1
+
+        dependencies = np.zeros(node_count)
+        for srcs, dests in reversed(level_edges):
+            np.add.at(dependencies, srcs, paths[srcs] / paths[dests] * (1.0 + dependencies[dests]))
+        dependencies[source] = 0.0
+        return dependencies
+
+    @staticmethod
+    def _dependencies(adjacency: CSRAdjacency, source: int) -> List[float]:
+        node_count = len(adjacency.ids)
+        distances = [-1] * node_count
+        paths = [0.0] * node_count
+        distances[source] = 0
+        paths[source] = 1.0
+        order = []
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            order.append(current)
+            for neighbour in adjacency.indices[adjacency.indptr[current]:adjacency.indptr[current + 1]]:
+                if distances[neighbour] == -1:
+                    distances[neighbour] = distances[current] + 1
+                    queue.append(neighbour)
+                if distances[neighbour] == distances[current] + 1:
+                    paths[neighbour] += paths[current]
+
+        dependencies = [0.0] * node_count
+        for current in reversed(order):
+            for neighbour in adjacency.indices[adjacency.indptr[current]:adjacency.indptr[current + 1]]:
+                if distances[neighbour] == distances[current] + 1:
+                    dependencies[current] += paths[current] / paths[neighbour] * (1.0 + dependencies[neighbour])
+        dependencies[source] = 0.0
+        return dependencies
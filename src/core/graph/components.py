@@ -0,0 +1,133 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from core.models.common import TypeSource
+from core.models.edge import Edge, TypeEdge
+from core.models.graph import Graph
+from core.models.node import STRUCTURE_NODE_TYPES, TypeNode
+
+logger = logging.getLogger(__name__)
+
+
+class ComponentFinder:
+
+    @staticmethod
+    def strongly_connected(graph: Graph, edge_types: Optional[Iterable[str]] = None) -> List[List[str]]:
+        """
+        Finds strongly connected components of the graph with Tarjan's algorithm.
+
+        The search is iterative, so long dependency chains don't hit the recursion limit. Components are
+        returned in reverse topological order: a component comes after every component reachable from it.
+
+        Args:
+            graph (Graph): The graph to analyze
+            edge_types (Optional[Iterable[str]]): Edge types to follow, all edges if None
+
+        Returns:
+            List[List[str]]: Node IDs of each component
+        """
+        edge_types = set(edge_types) if edge_types is not None else None
+
+        def successors(node_id: str) -> Iterable[str]:
+            for edge in graph.get_edges_out(node_id):
+                if (edge_types is None or edge.type in edge_types) and edge.dest in graph.nodes:
+                    yield edge.dest
+
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+
+        for start_id in graph.nodes:
+            if start_id in index:
+                continue
+
+            index[start_id] = low[start_id] = len(index)
+            stack.append(start_id)
+            on_stack.add(start_id)
+            # Frame: node id and iterator over its successors
+            work = [(start_id, successors(start_id))]
+
+            while work:
+                node_id, children = work[-1]
+
+                for child_id in children:
+                    if child_id not in index:
+                        index[child_id] = low[child_id] = len(index)
+                        stack.append(child_id)
+                        on_stack.add(child_id)
+                        work.append((child_id, successors(child_id)))
+                        break
+                    if child_id in on_stack:
+                        low[node_id] = min(low[node_id], index[child_id])
+
+                else:
+                    work.pop()
+                    if work:
+                        parent_id = work[-1][0]
+                        low[parent_id] = min(low[parent_id], low[node_id])
+
+                    if low[node_id] == index[node_id]:
+                        component = []
+                        while True:
+                            member_id = stack.pop()
+                            on_stack.remove(member_id)
+                            component.append(member_id)
+                            if member_id == node_id:
+                                break
+                        components.append(component)
+
+        logger.info(f"Found {len(components)} strongly connected components")
+        return components
+
+    @staticmethod
+    def aggregate_by_file(graph: Graph, edge_types: Optional[Iterable[str]] = None) -> Graph:
+        """
+        Builds the graph of files: a file uses another one if any element it contains uses an element of the other.
+
+        Args:
+            graph (Graph): The source graph
+            edge_types (Optional[Iterable[str]]): Edge types to aggregate, all except contain if None
+
+        Returns:
+            Graph: File nodes with at most one edge of each type between two files
+        """
+        edge_types = set(edge_types) if edge_types is not None else None
+        owners = ComponentFinder._file_owners(graph)
+
+        file_graph = Graph()
+        for file_id in set(owners.values()):
+            file_graph.add_node(graph.nodes[file_id])
+
+        for node_id, file_id in owners.items():
+            for edge in graph.get_edges_out(node_id):
+                if edge_types is None and edge.type == TypeEdge.CONTAIN:
+                    continue
+                if edge_types is not None and edge.type not in edge_types:
+                    continue
+                dest_file_id = owners.get(edge.dest)
+                if dest_file_id is not None and dest_file_id != file_id:
+                    file_graph.add_edge(Edge(file_id, dest_file_id, edge.type, TypeSource.CODE))
+
+        logger.info(f"Aggregated {len(owners)} elements into {len(file_graph.nodes)} files")
+        return file_graph
+
+    @staticmethod
+    def _file_owners(graph: Graph) -> Dict[str, str]:
+        owners: Dict[str, str] = {}
+        for file_id, node in graph.nodes.items():
+            if node.type != TypeNode.FILE:
+                continue
+            owners[file_id] = file_id
+            stack = [file_id]
+            while stack:
+                current_id = stack.pop()
+                for edge in graph.get_edges_out(current_id):
+                    child = graph.get_node(edge.dest)
+                    if edge.type != TypeEdge.CONTAIN or child is None or child.type in STRUCTURE_NODE_TYPES:
+                        continue
+                    if edge.dest not in owners:
+                        owners[edge.dest] = file_id
+                        stack.append(edge.dest)
+        return owners
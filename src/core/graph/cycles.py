@@ -0,0 +1,187 @@
+from collections import deque
+import logging
+from typing import Dict, Iterable, List, Set, Tuple
+
+from core.graph.components import ComponentFinder
+from core.models.cycle import Cycle
+from core.models.edge import TypeEdge
+from core.models.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CYCLE_EDGE_TYPES = [TypeEdge.USE]
+
+
+class CycleLevel:
+    ENTITY = "entity"
+    FILE = "file"
+
+
+CYCLE_LEVELS = [CycleLevel.ENTITY, CycleLevel.FILE]
+
+
+class CycleDetector:
+
+    @staticmethod
+    def find(graph: Graph,
+             edge_types: Iterable[str] = DEFAULT_CYCLE_EDGE_TYPES,
+             level: str = CycleLevel.ENTITY) -> List[Cycle]:
+        """
+        Finds dependency cycles: strongly connected components of more than one element.
+
+        Every step is linear in the size of the component, so the whole search is linear in the size of the graph
+        (apart from sorting the dependencies of each element, which keeps the report reproducible).
+
+        Args:
+            graph (Graph): The graph to analyze
+            edge_types (Iterable[str]): Edge types forming dependencies
+            level (str): 'entity' for cycles between graph elements, 'file' for cycles between files
+
+        Returns:
+            List[Cycle]: Cycles from the largest, each with a representative cycle and edges to cut
+        """
+        if level not in CYCLE_LEVELS:
+            text_error = f"Unknown cycle level {level}, expected one of {CYCLE_LEVELS}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        edge_types = set(edge_types)
+        if level == CycleLevel.FILE:
+            graph = ComponentFinder.aggregate_by_file(graph, edge_types)
+
+        cycles = []
+        for component in ComponentFinder.strongly_connected(graph, edge_types):
+            if len(component) < 2:
+                continue
+            successors = CycleDetector._successors(graph, component, edge_types)
+            cycles.append(
+                Cycle(sorted(component), CycleDetector.shortest_cycle(successors),
+                      CycleDetector.feedback_edges(successors)))
+
+        cycles.sort(key=lambda cycle: (-len(cycle.nodes), cycle.nodes[0]))
+        logger.info(f"Found {len(cycles)} cycles")
+        return cycles
+
+    @staticmethod
+    def shortest_cycle(successors: Dict[str, List[str]]) -> List[str]:
+        """
+        Finds the shortest cycle through the element with the most dependencies inside the component.
+
+        Args:
+            successors (Dict[str, List[str]]): Sorted dependencies of each element of a strongly connected component
+
+        Returns:
+            List[str]: Elements of the cycle, the first one is repeated at the end
+        """
+        degrees: Dict[str, int] = {node_id: len(dests) for node_id, dests in successors.items()}
+        for dests in successors.values():
+            for dest in dests:
+                degrees[dest] += 1
+        start_id = min(successors, key=lambda node_id: (-degrees[node_id], node_id))
+
+        parents = {start_id: None}
+        queue = deque([start_id])
+        while queue:
+            current_id = queue.popleft()
+            for dest in successors[current_id]:
+                if dest == start_id:
+                    path = [start_id]
+                    while current_id is not None:
+                        path.append(current_id)
+                        current_id = parents[current_id]
+                    return path[::-1]
+                if dest not in parents:
+                    parents[dest] = current_id
+                    queue.append(dest)
+
+        return []
+
+    @staticmethod
+    def feedback_edges(successors: Dict[str, List[str]]) -> List[Tuple[str, str]]:
+        """
+        Suggests edges whose removal makes the component acyclic with the greedy heuristic of Eades, Lin and Smyth.
+
+        Sinks are moved to the end of an ordering, sources to its start, and otherwise the element with
+        the largest difference between outgoing and incoming edges goes to the start. The edges pointing
+        backwards in the ordering are the ones to cut. Elements are kept in buckets by that difference,
+        so the ordering is built in linear time.
+
+        Args:
+            successors (Dict[str, List[str]]): Sorted dependencies of each element of a strongly connected component
+
+        Returns:
+            List[Tuple[str, str]]: Sorted edges (src, dest) to cut
+        """
+        predecessors: Dict[str, List[str]] = {node_id: [] for node_id in successors}
+        for node_id, dests in successors.items():
+            for dest in dests:
+                predecessors[dest].append(node_id)
+
+        out_degrees = {node_id: len(dests) for node_id, dests in successors.items()}
+        in_degrees = {node_id: len(srcs) for node_id, srcs in predecessors.items()}
+        # Dictionaries keep insertion order, which makes the choice between equal elements reproducible
+        buckets: Dict[int, Dict[str, None]] = {}
+        for node_id in successors:
+            buckets.setdefault(out_degrees[node_id] - in_degrees[node_id], {})[node_id] = None
+        max_delta = max(buckets)
+
+        sources = deque(node_id for node_id in successors if in_degrees[node_id] == 0)
+        sinks = deque(node_id for node_id in successors if out_degrees[node_id] == 0)
+        removed: Set[str] = set()
+        head: List[str] = []
+        tail: List[str] = []
+
+        def remove(node_id: str):
+            nonlocal max_delta
+            removed.add(node_id)
+            buckets[out_degrees[node_id] - in_degrees[node_id]].pop(node_id)
+            for src in predecessors[node_id]:
+                if src in removed:
+                    continue
+                buckets[out_degrees[src] - in_degrees[src]].pop(src)
+                out_degrees[src] -= 1
+                buckets.setdefault(out_degrees[src] - in_degrees[src], {})[src] = None
+                if out_degrees[src] == 0:
+                    sinks.append(src)
+            for dest in successors[node_id]:
+                if dest in removed:
+                    continue
+                buckets[out_degrees[dest] - in_degrees[dest]].pop(dest)
+                in_degrees[dest] -= 1
+                delta = out_degrees[dest] - in_degrees[dest]
+                buckets.setdefault(delta, {})[dest] = None
+                max_delta = max(max_delta, delta)
+                if in_degrees[dest] == 0:
+                    sources.append(dest)
+
+        while len(removed) < len(successors):
+            if sinks:
+                node_id = sinks.popleft()
+                if node_id not in removed:
+                    remove(node_id)
+                    tail.append(node_id)
+                continue
+            if sources:
+                node_id = sources.popleft()
+                if node_id not in removed:
+                    remove(node_id)
+                    head.append(node_id)
+                continue
+            while not buckets.get(max_delta):
+                max_delta -= 1
+            node_id = next(iter(buckets[max_delta]))
+            remove(node_id)
+            head.append(node_id)
+
+        position = {node_id: number for number, node_id in enumerate(head + tail[::-1])}
+        return sorted((node_id, dest) for node_id, dests in successors.items() for dest in dests
+                      if position[dest] < position[node_id])
+
+    @staticmethod
+    def _successors(graph: Graph, component: List[str], edge_types: Set[str]) -> Dict[str, List[str]]:
+        members = set(component)
+        successors: Dict[str, List[str]] = {}
+        for node_id in sorted(component):
+            dests = {edge.dest for edge in graph.get_edges_out(node_id) if edge.type in edge_types}
+            successors[node_id] = sorted(dests & members)
+        return successors
@@ -0,0 +1,152 @@
+from dataclasses import replace
+import logging
+
+from core.models.delta import GraphDelta
+from core.models.edge import Edge
+from core.models.graph import Graph
+from core.models.node import Node
+
+logger = logging.getLogger(__name__)
+
+
+class DeltaCalculator:
+
+    @staticmethod
+    def compute(old_graph: Graph, new_graph: Graph) -> GraphDelta:
+        """
+        Computes the delta that turns old_graph into new_graph.
+
+        A node is considered changed when any of its stored fields (name, type, hash, source) differs.
+        Edges removed together with a deleted node are listed explicitly, so the delta can be applied
+        and composed without looking at the graphs it was computed from.
+
+        Args:
+            old_graph (Graph): The original graph
+            new_graph (Graph): The updated graph
+
+        Returns:
+            GraphDelta: Added, removed and changed nodes together with added and removed edges
+        """
+        delta = GraphDelta()
+
+        for node_id, new_node in new_graph.nodes.items():
+            old_node = old_graph.nodes.get(node_id)
+            if old_node is None:
+                delta.added_nodes[node_id] = new_node
+            elif not DeltaCalculator._same_content(old_node, new_node):
+                delta.changed_nodes[node_id] = new_node
+
+        for node_id, old_node in old_graph.nodes.items():
+            if node_id not in new_graph.nodes:
+                delta.removed_nodes[node_id] = old_node
+
+        old_edges = set(old_graph.get_all_edges())
+        new_edges = set(new_graph.get_all_edges())
+        delta.added_edges = new_edges - old_edges
+        delta.removed_edges = old_edges - new_edges
+
+        return delta
+
+    @staticmethod
+    def apply(graph: Graph, delta: GraphDelta) -> Graph:
+        """
+        Applies the delta to the graph in place.
+
+        Nodes and edges from the delta are copied, so the delta can be applied to several graphs.
+
+        Args:
+            graph (Graph): The graph the delta was computed against
+            delta (GraphDelta): Delta to apply
+
+        Returns:
+            Graph: The same graph object after the update
+        """
+        for edge in delta.removed_edges:
+            graph.remove_edge(edge)
+
+        for node_id in delta.removed_nodes:
+            if not graph.remove_node(node_id):
+                logger.warning(f"Node {node_id} to remove not found")
+
+        for node_id, node in delta.changed_nodes.items():
+            if node_id not in graph.nodes:
+                logger.warning(f"Node {node_id} to change not found")
+            graph.update_node(DeltaCalculator._copy_node(node))
+
+        for node in delta.added_nodes.values():
+            if not graph.add_node(DeltaCalculator._copy_node(node)):
+                logger.warning(f"Node {node.id} to add already exists")
+
+        for edge in delta.added_edges:
+            if not graph.add_edge(DeltaCalculator._copy_edge(edge)):
+                logger.warning(f"Cannot add edge {edge.src}->{edge.dest} (nodes missing)")
+
+        return graph
+
+    @staticmethod
+    def compose(first: GraphDelta, second: GraphDelta) -> GraphDelta:
+        """
+        Combines two consecutive deltas into one equivalent delta.
+
+        Applying the result has the same effect as applying first and then second. Nodes added and then
+        removed cancel out, nodes removed and then added again become changed unless their content is equal.
+
+        Args:
+            first (GraphDelta): Delta applied first
+            second (GraphDelta): Delta applied after the first one
+
+        Returns:
+            GraphDelta: Combined delta
+        """
+        result = GraphDelta(added_nodes=dict(first.added_nodes),
+                            removed_nodes=dict(first.removed_nodes),
+                            changed_nodes=dict(first.changed_nodes),
+                            added_edges=set(first.added_edges),
+                            removed_edges=set(first.removed_edges))
+
+        for node_id, node in second.removed_nodes.items():
+            if node_id in result.added_nodes:
+                del result.added_nodes[node_id]
+                continue
+            result.changed_nodes.pop(node_id, None)
+            result.removed_nodes[node_id] = node
+
+        for node_id, node in second.changed_nodes.items():
+            if node_id in result.added_nodes:
+                result.added_nodes[node_id] = node
+            else:
+                result.changed_nodes[node_id] = node
+
+        for node_id, node in second.added_nodes.items():
+            removed_node = result.removed_nodes.pop(node_id, None)
+            if removed_node is None:
+                result.added_nodes[node_id] = node
+            elif not DeltaCalculator._same_content(removed_node, node):
+                result.changed_nodes[node_id] = node
+
+        for edge in second.removed_edges:
+            if edge in result.added_edges:
+                result.added_edges.remove(edge)
+            else:
+                result.removed_edges.add(edge)
+
+        for edge in second.added_edges:
+            if edge in result.removed_edges:
+                result.removed_edges.remove(edge)
+            else:
+                result.added_edges.add(edge)
+
+        return result
+
+    @staticmethod
+    def _same_content(first: Node, second: Node) -> bool:
+        return (first.name, first.type, first.hash, first.source) == (second.name, second.type, second.hash,
+                                                                      second.source)
+
+    @staticmethod
+    def _copy_node(node: Node) -> Node:
+        return replace(node, meta=dict(node.meta))
+
+    @staticmethod
+    def _copy_edge(edge: Edge) -> Edge:
+        return replace(edge, meta=dict(edge.meta))
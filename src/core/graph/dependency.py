@@ -1,8 +1,7 @@
-from collections import deque
-from copy import deepcopy
 import logging
 from typing import Set
 
+from core.graph.query import Direction, Query, QueryEngine
 from core.models.graph import Graph
 
 logger = logging.getLogger(__name__)
@@ -17,6 +16,7 @@ class DependencyExtensions:
 
         This method performs a breadth-first search starting from the given code nodes and follows outgoing edges
         to find all nodes that are used by the specified nodes. The search can be limited by depth.
+        Nodes and edges of the new graph are shared with the source graph (see QueryEngine.run).
 
         Args:
             graph (Graph): The source graph to analyze
@@ -26,40 +26,7 @@ class DependencyExtensions:
         Returns:
             Graph: A new graph containing the used nodes and their edges
         """
-        new_graph = Graph()
-        visited: Set[str] = set()
-
-        for start_node_id in code_nodes:
-            if start_node_id not in graph.nodes:
-                logger.warning(f"{start_node_id} not found")
-                continue
-
-            if start_node_id in visited:
-                continue
-
-            start_node = graph.get_node(start_node_id)
-            new_graph.add_node(deepcopy(start_node))
-            visited.add(start_node_id)
-
-            queue = deque([(0, start_node_id)])
-
-            while queue:
-                cur_depth, current_id = queue.popleft()
-
-                for edge in graph.get_edges_out(current_id):
-                    if edge.dest not in graph.nodes:
-                        continue
-
-                    if edge.dest not in visited:
-                        dest_node = graph.get_node(edge.dest)
-                        new_graph.add_node(deepcopy(dest_node))
-                        visited.add(dest_node.id)
-                        if depth == 0 or cur_depth + 1 < depth:
-                            queue.append((cur_depth + 1, dest_node.id))
-
-                    new_graph.add_edge(deepcopy(edge))
-
-        return new_graph
+        return QueryEngine.subgraph(graph, Query(list(code_nodes), Direction.OUT, depth))
 
     @staticmethod
     def get_dependent_nodes(graph: Graph, code_nodes: Set[str], depth: int = 0) -> Graph:
@@ -68,6 +35,7 @@ class DependencyExtensions:
 
         This method performs a breadth-first search starting from the given code nodes and follows incoming edges
         to find all nodes that depend on the specified nodes. The search can be limited by depth.
+        Nodes and edges of the new graph are shared with the source graph (see QueryEngine.run).
 
         Args:
             graph (Graph): The source graph to analyze
@@ -77,37 +45,4 @@ class DependencyExtensions:
         Returns:
             Graph: A new graph containing the dependent nodes and their connections
         """
-        new_graph = Graph()
-        visited: Set[str] = set()
-
-        for start_node_id in code_nodes:
-            if start_node_id not in graph.nodes:
-                logger.warning(f"{start_node_id} not found")
-                continue
-
-            if start_node_id in visited:
-                continue
-
-            start_node = graph.get_node(start_node_id)
-            new_graph.add_node(deepcopy(start_node))
-            visited.add(start_node_id)
-
-            queue = deque([(0, start_node_id)])
-
-            while queue:
-                cur_depth, current_id = queue.popleft()
-
-                for edge in graph.get_edges_in(current_id):
-                    if edge.src not in graph.nodes:
-                        continue
-
-                    if edge.src not in visited:
-                        src_node = graph.get_node(edge.src)
-                        new_graph.add_node(deepcopy(src_node))
-                        visited.add(src_node.id)
-                        if depth == 0 or cur_depth + 1 < depth:
-                            queue.append((cur_depth + 1, src_node.id))
-
-                    new_graph.add_edge(deepcopy(edge))
-
-        return new_graph
\ No newline at end of file
+        return QueryEngine.subgraph(graph, Query(list(code_nodes), Direction.IN, depth))
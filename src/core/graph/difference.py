@@ -1,8 +1,19 @@
+from collections import defaultdict
 from copy import deepcopy
+from dataclasses import replace
+import logging
+from typing import Dict, Iterable, List, Set, Tuple, Union
 
+from core.graph.hasher import Hasher
+from core.models.delta import GraphDelta
+from core.models.edge import Edge, TypeEdge
 from core.models.graph import Graph
+from core.models.node import Node, ROOT_NODE_NAME
+
+logger = logging.getLogger(__name__)
 
 DIFFERENCE_STATUS_FIELD = 'difference_status'
+MOVED_FROM_FIELD = 'moved_from'
 
 
 class TypeDiff(str):
@@ -11,6 +22,7 @@ class TypeDiff(str):
 
     CHANGED = 'changed'
     UNCHACHGED = 'unchanged'
+    MOVED = 'moved'
 
 
 class GraphComparator:
@@ -110,3 +122,331 @@ class GraphComparator:
                 result_graph.add_edge(result_edge)
 
         return result_graph
+
+    @staticmethod
+    def get_difference_from_delta(new_graph: Graph, delta: GraphDelta) -> Graph:
+        """
+        Builds the same difference graph as get_difference, but from the new graph and the delta
+        that leads to it, without comparing every node and edge of the two versions.
+
+        Nodes listed as changed in the delta are marked 'changed' (the delta records any change
+        of stored node fields), nodes and edges absent from the delta are marked 'unchanged'.
+
+        Args:
+            new_graph (Graph): The updated graph
+            delta (GraphDelta): Delta from the original graph to new_graph
+
+        Returns:
+            Graph: Each element's meta['difference_status'] field indicates its status
+        """
+        result_graph = Graph()
+
+        for node_id, node in new_graph.nodes.items():
+            if node_id in delta.added_nodes:
+                status = TypeDiff.NEW
+            elif node_id in delta.changed_nodes:
+                status = TypeDiff.CHANGED
+            else:
+                status = TypeDiff.UNCHACHGED
+            result_graph.add_node(GraphComparator._with_status(node, status))
+
+        for node in delta.removed_nodes.values():
+            result_graph.add_node(GraphComparator._with_status(node, TypeDiff.DELETED))
+
+        for edge in new_graph.get_all_edges():
+            status = TypeDiff.NEW if edge in delta.added_edges else TypeDiff.UNCHACHGED
+            result_graph.add_edge(GraphComparator._with_status(edge, status))
+
+        for edge in delta.removed_edges:
+            result_graph.add_edge(GraphComparator._with_status(edge, TypeDiff.DELETED))
+
+        return result_graph
+
+    @staticmethod
+    def is_identical(old_graph: Graph, new_graph: Graph) -> bool:
+        """
+        Checks whether two graphs are identical by comparing their fingerprints
+        (root hash, hand-added nodes and edge set digests).
+
+        Args:
+            old_graph (Graph): The original graph
+            new_graph (Graph): The updated graph
+
+        Returns:
+            bool: True if the graphs are identical
+        """
+        return Hasher.fingerprint(old_graph) == Hasher.fingerprint(new_graph)
+
+    @staticmethod
+    def get_changed_nodes(old_graph: Graph, new_graph: Graph) -> Dict[str, str]:
+        """
+        Finds new, deleted and changed nodes using the Merkle hashes of the 'contain' hierarchy.
+
+        Both hierarchies are walked from the root together, a subtree is skipped as soon as its root
+        has the same hash in both graphs, so the work depends on the size of the change rather than
+        on the size of the graphs. Nodes added or deleted with a subtree are reported together with
+        all the nodes of the subtree. The nodes not covered by the root hash in either graph, such as
+        hand-added nodes or parsed nodes detached from the root by a filter, are compared directly.
+        Hashes of both graphs are expected to be up to date.
+
+        Args:
+            old_graph (Graph): The original graph to compare from
+            new_graph (Graph): The updated graph to compare to
+
+        Returns:
+            Dict[str, str]: Statuses ('new', 'deleted' or 'changed') of the differing nodes by their IDs
+        """
+        statuses: Dict[str, str] = {}
+        visited: Set[str] = set()
+
+        if ROOT_NODE_NAME in old_graph.nodes and ROOT_NODE_NAME in new_graph.nodes:
+            stack = [ROOT_NODE_NAME]
+            visited.add(ROOT_NODE_NAME)
+        else:
+            logger.warning(f"Node {ROOT_NODE_NAME} not found, all nodes are compared")
+            stack = [node_id for node_id in new_graph.nodes if node_id in old_graph.nodes]
+            visited.update(stack)
+            GraphComparator._mark_subtrees(new_graph, old_graph, new_graph.nodes, TypeDiff.NEW, statuses)
+            GraphComparator._mark_subtrees(old_graph, new_graph, old_graph.nodes, TypeDiff.DELETED, statuses)
+
+        while stack:
+            node_id = stack.pop()
+            old_node = old_graph.nodes[node_id]
+            new_node = new_graph.nodes[node_id]
+
+            if old_node.hash != new_node.hash:
+                statuses[node_id] = TypeDiff.CHANGED
+            elif new_node.hash:
+                continue
+
+            old_children = GraphComparator._contain_children(old_graph, node_id)
+            new_children = GraphComparator._contain_children(new_graph, node_id)
+            added = [child_id for child_id in new_children if child_id not in old_graph.nodes]
+            deleted = [child_id for child_id in old_children if child_id not in new_graph.nodes]
+
+            stack.extend(GraphComparator._mark_subtrees(new_graph, old_graph, added, TypeDiff.NEW, statuses, visited))
+            stack.extend(
+                GraphComparator._mark_subtrees(old_graph, new_graph, deleted, TypeDiff.DELETED, statuses, visited))
+
+            for child_id in old_children + new_children:
+                if child_id in old_graph.nodes and child_id in new_graph.nodes and child_id not in visited:
+                    visited.add(child_id)
+                    stack.append(child_id)
+
+        uncovered_ids = {node.id for node in Hasher.uncovered_nodes(new_graph)}
+        uncovered_ids.update(node.id for node in Hasher.uncovered_nodes(old_graph))
+        for node_id in uncovered_ids:
+            old_node = old_graph.get_node(node_id)
+            new_node = new_graph.get_node(node_id)
+            if old_node is None:
+                statuses[node_id] = TypeDiff.NEW
+            elif new_node is None:
+                statuses[node_id] = TypeDiff.DELETED
+            elif old_node.hash != new_node.hash:
+                statuses[node_id] = TypeDiff.CHANGED
+
+        return statuses
+
+    @staticmethod
+    def get_difference_hierarchical(old_graph: Graph, new_graph: Graph) -> Graph:
+        """
+        Builds the same difference graph as get_difference, using the Merkle hashes of the graphs.
+
+        Identical graphs are detected by their fingerprints and marked 'unchanged' without any comparison.
+        Otherwise node statuses are found by get_changed_nodes, which examines only the subtrees with
+        differing hashes. Edges can't be skipped the same way, since the hashes don't cover import
+        statements, so the out-edges of each node are compared, but a whole set is compared at once
+        and elements of equal sets are not compared one by one. Elements are copied shallowly.
+
+        Args:
+            old_graph (Graph): The original graph to compare from
+            new_graph (Graph): The updated graph to compare to
+
+        Returns:
+            Graph: Each element's meta['difference_status'] field indicates its status
+                   in the comparison between old_graph and new_graph.
+        """
+        result_graph = Graph()
+
+        if GraphComparator.is_identical(old_graph, new_graph):
+            logger.info("Graphs are identical")
+            for node in new_graph.nodes.values():
+                result_graph.add_node(GraphComparator._with_status(node, TypeDiff.UNCHACHGED))
+            for edge in new_graph.get_all_edges():
+                result_graph.add_edge(GraphComparator._with_status(edge, TypeDiff.UNCHACHGED))
+            return result_graph
+
+        statuses = GraphComparator.get_changed_nodes(old_graph, new_graph)
+        logger.info(f"{len(statuses)} nodes differ")
+
+        for node_id, node in new_graph.nodes.items():
+            result_graph.add_node(GraphComparator._with_status(node, statuses.get(node_id, TypeDiff.UNCHACHGED)))
+        for node_id, status in statuses.items():
+            if status == TypeDiff.DELETED:
+                result_graph.add_node(GraphComparator._with_status(old_graph.nodes[node_id], TypeDiff.DELETED))
+
+        for node_id in new_graph.nodes:
+            new_edges = new_graph.get_edges_out(node_id)
+            if statuses.get(node_id) == TypeDiff.NEW:
+                GraphComparator._add_edges(result_graph, new_edges, TypeDiff.NEW)
+                continue
+
+            old_edges = old_graph.get_edges_out(node_id)
+            if new_edges == old_edges:
+                GraphComparator._add_edges(result_graph, new_edges, TypeDiff.UNCHACHGED)
+                continue
+
+            old_edges = set(old_edges)
+            for edge in new_edges:
+                status = TypeDiff.UNCHACHGED if edge in old_edges else TypeDiff.NEW
+                result_graph.add_edge(GraphComparator._with_status(edge, status))
+            GraphComparator._add_edges(result_graph, old_edges.difference(new_edges), TypeDiff.DELETED)
+
+        for node_id, status in statuses.items():
+            if status == TypeDiff.DELETED:
+                GraphComparator._add_edges(result_graph, old_graph.get_edges_out(node_id), TypeDiff.DELETED)
+
+        return result_graph
+
+    @staticmethod
+    def detect_moves(difference_graph: Graph, match_names: bool = False) -> Dict[str, str]:
+        """
+        Finds moved and renamed elements in a difference graph and relabels them in place.
+
+        A deleted and a new node of the same type with equal non-empty hashes are paired: code nodes carry
+        the hashes of their source and structure hashes don't depend on the names of the elements themselves,
+        so a function moved to another file or a renamed file keeps its hash. Among several candidates with
+        equal hashes nodes with equal names are paired, otherwise only a single deleted and a single new node
+        are. With match_names a deleted and a new node of the same type and name, which are unique among
+        the unpaired ones, are paired as well (an element both moved and changed).
+
+        The new node of a pair gets the status 'moved' and meta['moved_from'] with the old ID, the deleted node
+        is removed. Its edges are remapped to the new IDs: an edge that exists after remapping gets the status
+        'moved', the others stay deleted. Only changed nodes and their edges are examined.
+
+        Args:
+            difference_graph (Graph): Result of a comparison, modified in place
+            match_names (bool): Also pair unique deleted and new nodes with equal names
+
+        Returns:
+            Dict[str, str]: New IDs of the moved nodes by their old IDs
+        """
+        deleted: Dict[Tuple[str, str], List[Node]] = defaultdict(list)
+        added: Dict[Tuple[str, str], List[Node]] = defaultdict(list)
+        for node in difference_graph.nodes.values():
+            status = node.meta.get(DIFFERENCE_STATUS_FIELD)
+            if status == TypeDiff.DELETED and node.hash:
+                deleted[(node.type, node.hash)].append(node)
+            elif status == TypeDiff.NEW and node.hash:
+                added[(node.type, node.hash)].append(node)
+
+        moves: Dict[str, str] = {}
+        for key, new_nodes in added.items():
+            GraphComparator._pair_nodes(deleted.get(key, []), new_nodes, moves)
+
+        if match_names:
+            deleted_by_name: Dict[Tuple[str, str], List[Node]] = defaultdict(list)
+            added_by_name: Dict[Tuple[str, str], List[Node]] = defaultdict(list)
+            for nodes in deleted.values():
+                for node in nodes:
+                    if node.id not in moves:
+                        deleted_by_name[(node.type, node.name)].append(node)
+            moved_ids = set(moves.values())
+            for nodes in added.values():
+                for node in nodes:
+                    if node.id not in moved_ids:
+                        added_by_name[(node.type, node.name)].append(node)
+            for key, new_nodes in added_by_name.items():
+                old_nodes = deleted_by_name.get(key, [])
+                if len(old_nodes) == 1 and len(new_nodes) == 1:
+                    moves[old_nodes[0].id] = new_nodes[0].id
+
+        for old_id, new_id in moves.items():
+            difference_graph.nodes[new_id].meta[DIFFERENCE_STATUS_FIELD] = TypeDiff.MOVED
+            difference_graph.nodes[new_id].meta[MOVED_FROM_FIELD] = old_id
+
+        old_edges: Set[Edge] = set()
+        for old_id in moves:
+            old_edges.update(difference_graph.get_edges_out(old_id))
+            old_edges.update(difference_graph.get_edges_in(old_id))
+        for old_id in moves:
+            difference_graph.remove_node(old_id)
+
+        for edge in old_edges:
+            remapped = replace(edge, src=moves.get(edge.src, edge.src), dest=moves.get(edge.dest, edge.dest))
+            existing = next(
+                (candidate for candidate in difference_graph.get_edges_out(remapped.src) if candidate == remapped),
+                None)
+            if existing is not None and existing.meta.get(DIFFERENCE_STATUS_FIELD) == TypeDiff.NEW:
+                existing.meta[DIFFERENCE_STATUS_FIELD] = TypeDiff.MOVED
+            elif existing is None:
+                difference_graph.add_edge(remapped)
+
+        logger.info(f"Detected {len(moves)} moved elements")
+        return moves
+
+    @staticmethod
+    def _pair_nodes(old_nodes: List[Node], new_nodes: List[Node], moves: Dict[str, str]):
+        """Pairs nodes with equal hashes: by equal names first, then a single remaining node with a single one."""
+        old_nodes = [node for node in old_nodes if node.id not in moves]
+        if not old_nodes:
+            return
+
+        old_by_name: Dict[str, List[Node]] = defaultdict(list)
+        for node in old_nodes:
+            old_by_name[node.name].append(node)
+
+        paired: Set[str] = set()
+        unpaired_new: List[Node] = []
+        for node in new_nodes:
+            candidates = old_by_name.get(node.name)
+            if candidates:
+                old_node = candidates.pop(0)
+                moves[old_node.id] = node.id
+                paired.add(old_node.id)
+            else:
+                unpaired_new.append(node)
+
+        unpaired_old = [node for node in old_nodes if node.id not in paired]
+        if len(unpaired_old) == 1 and len(unpaired_new) == 1:
+            moves[unpaired_old[0].id] = unpaired_new[0].id
+
+    @staticmethod
+    def _mark_subtrees(graph: Graph,
+                       other_graph: Graph,
+                       start_ids: Iterable[str],
+                       status: str,
+                       statuses: Dict[str, str],
+                       visited: Set[str] = None) -> List[str]:
+        """
+        Marks the nodes of graph reachable from start_ids over 'contain' edges and absent from other_graph
+        with status. Returns IDs of the reached nodes present in both graphs, which are not yet visited.
+        """
+        visited = visited if visited is not None else set()
+        common: List[str] = []
+        stack = list(start_ids)
+        while stack:
+            node_id = stack.pop()
+            if node_id in statuses and statuses[node_id] == status:
+                continue
+            if node_id in other_graph.nodes:
+                if node_id not in visited:
+                    visited.add(node_id)
+                    common.append(node_id)
+                continue
+            statuses[node_id] = status
+            stack.extend(GraphComparator._contain_children(graph, node_id))
+        return common
+
+    @staticmethod
+    def _contain_children(graph: Graph, node_id: str) -> List[str]:
+        return [edge.dest for edge in graph.get_edges_out(node_id) if edge.type == TypeEdge.CONTAIN]
+
+    @staticmethod
+    def _add_edges(graph: Graph, edges: Iterable[Edge], status: str):
+        for edge in edges:
+            graph.add_edge(GraphComparator._with_status(edge, status))
+
+    @staticmethod
+    def _with_status(element: Union[Node, Edge], status: str) -> Union[Node, Edge]:
+        return replace(element, meta={**element.meta, DIFFERENCE_STATUS_FIELD: status})
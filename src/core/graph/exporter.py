@@ -1,11 +1,19 @@
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 import csv
+from itertools import chain
+import json
 import os
 from pathlib import Path
 import logging
+import sys
+from typing import Iterable
 
+from core.models.delta import GraphDelta
+from core.models.edge import Edge
+from core.models.node import Node
 from core.models.graph import Graph
-from core.graph.difference import DIFFERENCE_STATUS_FIELD
+from core.graph.difference import DIFFERENCE_STATUS_FIELD, MOVED_FROM_FIELD, TypeDiff
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +33,7 @@ class IGraphExporter(ABC):
 class CSVGraphExporter(IGraphExporter):
 
     @staticmethod
-    def save(graph: Graph, directory_path: str) -> None:
+    def save(graph: Graph, directory_path: str, canonical: bool = False) -> None:
         """
         Exports the graph to CSV files in the specified directory.
 
@@ -35,12 +43,14 @@ class CSVGraphExporter(IGraphExporter):
                 (will be created if it doesn't exist). Files will be:
                 - nodes.csv: [id, name, type, hash, source]
                 - edges.csv: [src, dest, type, source]
+            canonical: Write nodes sorted by id and edges sorted by (src, dest, type, source),
+                so that the files can be merged without sorting (see StreamingComparator)
         """
         Path(directory_path).mkdir(parents=True, exist_ok=True)
         nodes_path = os.path.join(directory_path, "nodes.csv")
         edges_path = os.path.join(directory_path, "edges.csv")
-        CSVGraphExporter._save_nodes(graph, nodes_path)
-        CSVGraphExporter._save_edges(graph, edges_path)
+        CSVGraphExporter._save_nodes(graph, nodes_path, canonical)
+        CSVGraphExporter._save_edges(graph, edges_path, canonical)
 
     @staticmethod
     def save_diff(graph: Graph, directory_path: str) -> None:
@@ -51,8 +61,9 @@ class CSVGraphExporter(IGraphExporter):
             graph: Graph instance to export
             directory_path: Path to the directory where files will be saved
                 (will be created if it doesn't exist). Files will be:
-                - nodes.csv: [id, name, type, diff_status, source]
+                - nodes.csv: [id, name, type, diff_status, source, moved_from]
                 - edges.csv: [src, dest, type, diff_status, source]
+                moved_from is the old ID of a moved node and is empty for other nodes
         """
         Path(directory_path).mkdir(parents=True, exist_ok=True)
         nodes_path = os.path.join(directory_path, "nodes.csv")
@@ -61,7 +72,89 @@ class CSVGraphExporter(IGraphExporter):
         CSVGraphExporter._save_diff_edges(graph, edges_path)
 
     @staticmethod
-    def _save_nodes(graph: Graph, file_path: str) -> None:
+    def save_delta(delta: GraphDelta, directory_path: str) -> None:
+        """
+        Exports the graph delta to CSV files in the specified directory.
+
+        Args:
+            delta: GraphDelta instance to export
+            directory_path: Path to the directory where files will be saved
+                (will be created if it doesn't exist). Files will be:
+                - nodes.csv: [id, name, type, hash, diff_status, source]
+                - edges.csv: [src, dest, type, diff_status, source]
+                diff_status is 'new', 'deleted' or 'changed'
+        """
+        Path(directory_path).mkdir(parents=True, exist_ok=True)
+        nodes_path = os.path.join(directory_path, "nodes.csv")
+        edges_path = os.path.join(directory_path, "edges.csv")
+        CSVGraphExporter._save_delta_nodes(delta, nodes_path)
+        CSVGraphExporter._save_delta_edges(delta, edges_path)
+
+    @staticmethod
+    def save_elements(elements: Iterable[Node | Edge], directory_path: str,
+                      node_meta_fields: Iterable[str] = ()) -> None:
+        """
+        Writes nodes and edges to CSV files as they are produced, without collecting them into a graph.
+
+        Args:
+            elements: Nodes and edges to write
+            directory_path: Path to the directory where nodes.csv and edges.csv will be saved
+            node_meta_fields: Meta fields of nodes written as additional columns after the standard ones
+        """
+        node_meta_fields = list(node_meta_fields)
+        Path(directory_path).mkdir(parents=True, exist_ok=True)
+        nodes_path = os.path.join(directory_path, "nodes.csv")
+        edges_path = os.path.join(directory_path, "edges.csv")
+        node_count = 0
+        edge_count = 0
+
+        try:
+            with open(nodes_path, 'w', newline='', encoding='utf-8') as nodes_file, \
+                    open(edges_path, 'w', newline='', encoding='utf-8') as edges_file:
+                nodes_writer = csv.DictWriter(nodes_file,
+                                              fieldnames=['id', 'name', 'type', 'hash', 'source'] + node_meta_fields,
+                                              quoting=csv.QUOTE_MINIMAL)
+                edges_writer = csv.DictWriter(edges_file,
+                                              fieldnames=['src', 'dest', 'type', 'source'],
+                                              quoting=csv.QUOTE_MINIMAL)
+                nodes_writer.writeheader()
+                edges_writer.writeheader()
+
+                for element in elements:
+                    if isinstance(element, Node):
+                        row = {
+                            'id': element.id,
+                            'name': element.name,
+                            'type': element.type,
+                            'hash': element.hash,
+                            'source': element.source
+                        }
+                        for meta_field in node_meta_fields:
+                            row[meta_field] = element.meta.get(meta_field, "")
+                        nodes_writer.writerow(row)
+                        node_count += 1
+                    else:
+                        edges_writer.writerow({
+                            'src': element.src,
+                            'dest': element.dest,
+                            'type': element.type,
+                            'source': element.source
+                        })
+                        edge_count += 1
+
+            logger.info(f"Successfully saved {node_count} nodes and {edge_count} edges to {directory_path}")
+
+        except (IOError, PermissionError) as e:
+            text_error = f"Error writing graph files: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+    @staticmethod
+    def _save_nodes(graph: Graph, file_path: str, canonical: bool = False) -> None:
+        nodes = graph.get_all_nodes()
+        if canonical:
+            nodes.sort(key=lambda node: node.id)
+
         try:
             Path(file_path).parent.mkdir(parents=True, exist_ok=True)
 
@@ -71,7 +164,7 @@ class CSVGraphExporter(IGraphExporter):
                                         quoting=csv.QUOTE_MINIMAL)
                 writer.writeheader()
 
-                for node in graph.get_all_nodes():
+                for node in nodes:
                     writer.writerow({
                         'id': node.id,
                         'name': node.name,
@@ -88,7 +181,11 @@ class CSVGraphExporter(IGraphExporter):
             raise Exception(text_error)
 
     @staticmethod
-    def _save_edges(graph: Graph, file_path: str) -> None:
+    def _save_edges(graph: Graph, file_path: str, canonical: bool = False) -> None:
+        edges = graph.get_all_edges()
+        if canonical:
+            edges.sort(key=lambda edge: (edge.src, edge.dest, edge.type, edge.source))
+
         try:
             Path(file_path).parent.mkdir(parents=True, exist_ok=True)
 
@@ -97,7 +194,7 @@ class CSVGraphExporter(IGraphExporter):
                 writer.writeheader()
 
                 edge_count = 0
-                for edge in graph.get_all_edges():
+                for edge in edges:
                     writer.writerow({'src': edge.src, 'dest': edge.dest, 'type': edge.type, 'source': edge.source})
                     edge_count += 1
 
@@ -115,7 +212,7 @@ class CSVGraphExporter(IGraphExporter):
 
             with open(file_path, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.DictWriter(f,
-                                        fieldnames=['id', 'name', 'type', 'diff_status', 'source'],
+                                        fieldnames=['id', 'name', 'type', 'diff_status', 'source', 'moved_from'],
                                         quoting=csv.QUOTE_MINIMAL)
                 writer.writeheader()
 
@@ -128,7 +225,8 @@ class CSVGraphExporter(IGraphExporter):
                         'name': node.name,
                         'type': node.type,
                         'diff_status': node.meta[DIFFERENCE_STATUS_FIELD],
-                        'source': node.source
+                        'source': node.source,
+                        'moved_from': node.meta.get(MOVED_FROM_FIELD, "")
                     })
 
             logger.info(f"Successfully saved {len(graph.nodes)} nodes to {file_path}")
@@ -171,3 +269,155 @@ class CSVGraphExporter(IGraphExporter):
             text_error = f"Error writing edges file: {str(e)}"
             logger.critical(text_error)
             raise Exception(text_error)
+
+    @staticmethod
+    def _save_delta_nodes(delta: GraphDelta, file_path: str) -> None:
+        try:
+            Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f,
+                                        fieldnames=['id', 'name', 'type', 'hash', 'diff_status', 'source'],
+                                        quoting=csv.QUOTE_MINIMAL)
+                writer.writeheader()
+
+                node_count = 0
+                for status, nodes in ((TypeDiff.NEW, delta.added_nodes), (TypeDiff.DELETED, delta.removed_nodes),
+                                      (TypeDiff.CHANGED, delta.changed_nodes)):
+                    for node in nodes.values():
+                        writer.writerow({
+                            'id': node.id,
+                            'name': node.name,
+                            'type': node.type,
+                            'hash': node.hash,
+                            'diff_status': status,
+                            'source': node.source
+                        })
+                        node_count += 1
+
+            logger.info(f"Successfully saved {node_count} changed nodes to {file_path}")
+
+        except (IOError, PermissionError) as e:
+            text_error = f"Error writing nodes file: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+    @staticmethod
+    def _save_delta_edges(delta: GraphDelta, file_path: str) -> None:
+        try:
+            Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f,
+                                        fieldnames=['src', 'dest', 'type', 'diff_status', 'source'],
+                                        quoting=csv.QUOTE_MINIMAL)
+                writer.writeheader()
+
+                edge_count = 0
+                for status, edges in ((TypeDiff.NEW, delta.added_edges), (TypeDiff.DELETED, delta.removed_edges)):
+                    for edge in edges:
+                        writer.writerow({
+                            'src': edge.src,
+                            'dest': edge.dest,
+                            'type': edge.type,
+                            'diff_status': status,
+                            'source': edge.source
+                        })
+                        edge_count += 1
+
+            logger.info(f"Successfully saved {edge_count} changed edges to {file_path}")
+
+        except (IOError, PermissionError) as e:
+            text_error = f"Error writing edges file: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+
+class JSONLGraphExporter(IGraphExporter):
+    """
+    Writes graphs as JSON Lines: one JSON object per node or edge, nodes first.
+    The path '-' stands for the standard output.
+    """
+
+    @staticmethod
+    def save(graph: Graph, file_path: str) -> None:
+        """
+        Exports the graph to a JSON Lines file.
+
+        Args:
+            graph: Graph instance to export
+            file_path: Path to the file (parent directories will be created) or '-' for the standard output.
+                Records are:
+                - {"kind": "node", "id", "name", "type", "hash", "source", "meta"}
+                - {"kind": "edge", "src", "dest", "type", "source", "meta"}
+        """
+        JSONLGraphExporter.save_elements(chain(graph.get_all_nodes(), graph.get_all_edges()), file_path)
+
+    @staticmethod
+    def save_diff(graph: Graph, file_path: str) -> None:
+        """
+        Exports the graph with difference information to a JSON Lines file.
+
+        The record format is the same as in save, the difference status is kept in meta['difference_status'].
+        """
+        for node in graph.get_all_nodes():
+            if DIFFERENCE_STATUS_FIELD not in node.meta:
+                logger.warning(f"Node {node.id} does not contain {DIFFERENCE_STATUS_FIELD} field in meta data")
+        JSONLGraphExporter.save(graph, file_path)
+
+    @staticmethod
+    def save_elements(elements: Iterable[Node | Edge], file_path: str) -> None:
+        """
+        Writes nodes and edges as they are produced, without collecting them into a graph.
+
+        Args:
+            elements: Nodes and edges to write; nodes should precede the edges that reference them
+            file_path: Path to the file or '-' for the standard output
+        """
+        count = 0
+        try:
+            if file_path == "-":
+                context = nullcontext(sys.stdout)
+            else:
+                Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+                context = open(file_path, 'w', encoding='utf-8')
+
+            with context as f:
+                for element in elements:
+                    f.write(json.dumps(JSONLGraphExporter.to_record(element), ensure_ascii=False, default=str))
+                    f.write("\n")
+                    count += 1
+                f.flush()
+
+            logger.info(f"Successfully saved {count} records to {file_path}")
+
+        except BrokenPipeError:
+            # The reading side of the pipe was closed (e.g. `| head`), the rest of the output is not needed
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            logger.info(f"Output pipe closed after {count} records")
+
+        except (IOError, PermissionError) as e:
+            text_error = f"Error writing records file: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+    @staticmethod
+    def to_record(element: Node | Edge) -> dict:
+        if isinstance(element, Node):
+            return {
+                'kind': 'node',
+                'id': element.id,
+                'name': element.name,
+                'type': element.type,
+                'hash': element.hash,
+                'source': element.source,
+                'meta': element.meta
+            }
+        return {
+            'kind': 'edge',
+            'src': element.src,
+            'dest': element.dest,
+            'type': element.type,
+            'source': element.source,
+            'meta': element.meta
+        }
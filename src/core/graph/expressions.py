@@ -0,0 +1,204 @@
+import logging
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+from utils.glob import compile_glob
+
+logger = logging.getLogger(__name__)
+
+NODE_FIELDS = ["id", "name", "type", "source", "hash"]
+EDGE_FIELDS = ["src", "dest", "type", "source"]
+
+TOKEN_REGEX = re.compile(r"""\s*(?:(\(|\)|,|!=|=|~)|'([^']*)'|"([^"]*)"|([^\s(),=!~'"]+))""")
+
+# Comparison operators: equal, not equal, glob match, membership and (internal only) regular expression match
+OPERATORS = ["=", "!=", "~", "in"]
+REGEX_OPERATOR = "regex"
+
+# Expression tree: ("cmp", field, operator, value), ("and", left, right), ("or", left, right), ("not", operand)
+Expression = Tuple
+
+
+class FilterExpression:
+    """
+    Filter expressions over graph elements, for example:
+
+        type in (class, func) and not (id ~ 'tests/**' or name = main)
+
+    A predicate compares a field with '=', '!=', '~' (glob over the value, '**' crosses directories,
+    '*' and '?' do not) or 'in' (a parenthesized list). Predicates are combined with 'and', 'or', 'not'
+    and parentheses. Values with spaces or special characters are quoted.
+
+    An expression is compiled into a single Python function, so checking an element costs one call
+    regardless of the number of predicates.
+    """
+
+    @staticmethod
+    def parse(text: str, fields: List[str] = NODE_FIELDS) -> Expression:
+        """
+        Parses an expression into a tree.
+
+        Args:
+            text (str): The expression
+            fields (List[str]): Fields the expression may use
+
+        Returns:
+            Expression: The expression tree
+        """
+        parser = _Parser(FilterExpression._tokenize(text), fields, text)
+        expression = parser.parse_or()
+        if parser.position != len(parser.tokens):
+            parser.fail("unexpected text")
+        return expression
+
+    @staticmethod
+    def compile(expression: Expression) -> Callable[[Any], bool]:
+        """
+        Compiles an expression tree into a predicate over elements with the fields as attributes.
+
+        Args:
+            expression (Expression): The expression tree
+
+        Returns:
+            Callable[[Any], bool]: The predicate
+        """
+        constants: Dict[str, Any] = {}
+        source = FilterExpression._code(expression, constants)
+        # Only field names and generated names of constants reach the code, values are bound as constants
+        return eval(f"lambda element: {source}", {"__builtins__": {}, **constants})
+
+    @staticmethod
+    def conjunction(expressions: List[Expression]) -> Expression:
+        """Combines expressions with 'and', None if there are none."""
+        result = None
+        for expression in expressions:
+            result = expression if result is None else ("and", result, expression)
+        return result
+
+    @staticmethod
+    def _tokenize(text: str) -> List[Tuple[str, bool]]:
+        # Tokens with a flag telling quoted values from symbols and words
+        tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = TOKEN_REGEX.match(text, position)
+            if match is None:
+                text_error = f"invalid filter expression '{text}' at position {position}"
+                logger.critical(text_error)
+                raise Exception(text_error)
+            symbol, single_quoted, double_quoted, word = match.groups()
+            if single_quoted is not None or double_quoted is not None:
+                tokens.append((single_quoted if single_quoted is not None else double_quoted, True))
+            else:
+                tokens.append((symbol or word, False))
+            position = match.end()
+        return tokens
+
+    @staticmethod
+    def _code(expression: Expression, constants: Dict[str, Any]) -> str:
+        kind = expression[0]
+        if kind == "and" or kind == "or":
+            left = FilterExpression._code(expression[1], constants)
+            right = FilterExpression._code(expression[2], constants)
+            return f"({left} {kind} {right})"
+        if kind == "not":
+            return f"(not {FilterExpression._code(expression[1], constants)})"
+
+        _, field, operator, value = expression
+        name = f"_c{len(constants)}"
+        if operator == "in":
+            constants[name] = frozenset(value)
+            return f"(element.{field} in {name})"
+        if operator == "~":
+            constants[name] = compile_glob(value).fullmatch
+            return f"({name}(element.{field}) is not None)"
+        if operator == REGEX_OPERATOR:
+            constants[name] = re.compile(value).match
+            return f"({name}(element.{field}) is not None)"
+        constants[name] = value
+        return f"(element.{field} {'==' if operator == '=' else '!='} {name})"
+
+
+class _Parser:
+
+    def __init__(self, tokens: List[Tuple[str, bool]], fields: List[str], text: str):
+        self.tokens = tokens
+        self.fields = fields
+        self.text = text
+        self.position = 0
+
+    def fail(self, reason: str):
+        token = self.tokens[self.position][0] if self.position < len(self.tokens) else "end"
+        text_error = f"invalid filter expression '{self.text}': {reason} at '{token}'"
+        logger.critical(text_error)
+        raise Exception(text_error)
+
+    def peek_keyword(self, keyword: str) -> bool:
+        return self.position < len(self.tokens) and self.tokens[self.position] == (keyword, False)
+
+    def take(self) -> Tuple[str, bool]:
+        if self.position == len(self.tokens):
+            self.fail("unexpected end")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, symbol: str):
+        if not self.peek_keyword(symbol):
+            self.fail(f"expected '{symbol}'")
+        self.position += 1
+
+    def parse_or(self) -> Expression:
+        expression = self.parse_and()
+        while self.peek_keyword("or"):
+            self.position += 1
+            expression = ("or", expression, self.parse_and())
+        return expression
+
+    def parse_and(self) -> Expression:
+        expression = self.parse_not()
+        while self.peek_keyword("and"):
+            self.position += 1
+            expression = ("and", expression, self.parse_not())
+        return expression
+
+    def parse_not(self) -> Expression:
+        if self.peek_keyword("not"):
+            self.position += 1
+            return ("not", self.parse_not())
+        if self.peek_keyword("("):
+            self.position += 1
+            expression = self.parse_or()
+            self.expect(")")
+            return expression
+        return self.parse_predicate()
+
+    def parse_predicate(self) -> Expression:
+        field, quoted = self.take()
+        if quoted or field not in self.fields:
+            self.position -= 1
+            self.fail(f"unknown field, expected one of {self.fields}")
+
+        operator, quoted = self.take()
+        if quoted or operator not in OPERATORS:
+            self.position -= 1
+            self.fail(f"expected one of {OPERATORS}")
+
+        if operator != "in":
+            return ("cmp", field, operator, self.value())
+
+        self.expect("(")
+        values = [self.value()]
+        while self.peek_keyword(","):
+            self.position += 1
+            values.append(self.value())
+        self.expect(")")
+        return ("cmp", field, operator, values)
+
+    def value(self) -> str:
+        value, quoted = self.take()
+        if not quoted and value in ("(", ")", ",", "=", "!=", "~"):
+            self.position -= 1
+            self.fail("expected a value")
+        return value
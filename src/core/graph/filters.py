@@ -1,8 +1,10 @@
-from typing import Callable, List
+from typing import Callable, Iterable, List, Optional
 import logging
 import re
 
+from core.graph.expressions import EDGE_FIELDS, NODE_FIELDS, REGEX_OPERATOR, FilterExpression
 from core.models.graph import Graph
+from utils.glob import literal_prefix
 from core.models.node import Node, TYPE_NODES
 from core.models.edge import Edge, TYPE_EDGES
 
@@ -40,6 +42,31 @@ class FilterFunc:
 
         return result_graph
 
+    @staticmethod
+    def apply_filter(graph: Graph,
+                     nodes_filter: Optional[Callable[[Node], bool]] = None,
+                     edges_filter: Optional[Callable[[Edge], bool]] = None,
+                     node_ids: Optional[Iterable[str]] = None) -> Graph:
+        """
+        Keeps the nodes passing nodes_filter and the edges between them passing edges_filter in one pass.
+
+        The result shares the node and edge objects of the graph, nothing is copied. If node_ids are given,
+        only these nodes are considered instead of all nodes of the graph.
+        """
+        result_graph = Graph()
+        for node_id in graph.nodes if node_ids is None else node_ids:
+            node = graph.nodes[node_id]
+            if nodes_filter is None or nodes_filter(node):
+                result_graph.nodes[node_id] = node
+
+        kept_nodes = result_graph.nodes
+        for node_id in kept_nodes:
+            for edge in graph.get_edges_out(node_id):
+                if edge.dest in kept_nodes and (edges_filter is None or edges_filter(edge)):
+                    result_graph.add_edge(edge, with_check=False)
+
+        return result_graph
+
 
 class CommonFilter:
 
@@ -59,22 +86,62 @@ class CommonFilter:
         if not pattern:
             return True
 
-        # Convert pattern to regex
-        regex_pattern = pattern.replace('.', '.').replace('*', '.*')
-        return bool(re.match(f"^{regex_pattern}$", node_id))
+        return bool(CommonFilter._compile_pattern(pattern).match(node_id))
+
+    @staticmethod
+    def _pattern_regex(pattern: str) -> str:
+        # '.' is already the regex wildcard for one character, so only '*' is translated
+        return f"^{pattern.replace('*', '.*')}$"
+
+    @staticmethod
+    def _id_prefix(expression: tuple) -> str:
+        # Prefix every node ID passing the expression starts with, empty if there is none
+        kind = expression[0]
+        if kind == "and":
+            return max(CommonFilter._id_prefix(expression[1]), CommonFilter._id_prefix(expression[2]), key=len)
+        if kind != "cmp" or expression[1] != "id":
+            return ""
+        operator, value = expression[2], expression[3]
+        if operator == "=":
+            return value
+        if operator == "~":
+            return literal_prefix(value)
+        if operator == REGEX_OPERATOR:
+            return CommonFilter._pattern_prefix(value[1:])
+        return ""
+
+    @staticmethod
+    def _pattern_prefix(pattern: str) -> str:
+        # Every ID matching the pattern starts with its literal beginning
+        if "|" in pattern:
+            return ""
+        for position, char in enumerate(pattern):
+            if char in "?+{":
+                # The character before is optional or repeated
+                return pattern[:max(position - 1, 0)]
+            if char in "*.[]()^$\\":
+                return pattern[:position]
+        return pattern
+
+    @staticmethod
+    def _compile_pattern(pattern: str) -> re.Pattern:
+        return re.compile(CommonFilter._pattern_regex(pattern))
 
     @staticmethod
     def apply(graph: Graph,
               nodes_types: List[str] = [],
               edges_types: List[str] = [],
               node_reg: str = "",
-              inv_flag: bool = False) -> Graph:
-        """Filter a graph based on specified node and edge types and node ID pattern.
+              inv_flag: bool = False,
+              node_where: str = "",
+              edge_where: str = "") -> Graph:
+        """Filter a graph based on specified node and edge types, node ID pattern and filter expressions.
 
         This method applies filtering to the input graph by keeping only nodes and edges
         of the specified types and nodes matching the given ID pattern. If no types are 
         specified for either nodes or edges, all nodes or edges of that category are kept.
-        If no node_reg pattern is specified, all nodes are kept.
+        If no node_reg pattern is specified, all nodes are kept. All criteria are compiled
+        into one predicate for nodes and one for edges, and the graph is filtered in one pass.
 
         Args:
             graph (Graph): The input graph to be filtered
@@ -84,7 +151,11 @@ class CommonFilter:
                 * - matches any number of characters
                 . - matches exactly one character
                 Defaults to empty string (no filtering).
-            inv_flag (bool, optional): If True, invert the filtering logic. Defaults to False.
+            inv_flag (bool, optional): If True, invert the filtering logic of types and pattern. Defaults to False.
+            node_where (str, optional): Filter expression over node fields (see FilterExpression),
+                for example "type in (class, func) and not id ~ 'tests/**'". Defaults to empty string.
+            edge_where (str, optional): Filter expression over edge fields (src, dest, type, source).
+                Defaults to empty string.
 
         Returns:
             Graph: A new filtered graph containing only the specified node and edge types
@@ -99,24 +170,30 @@ class CommonFilter:
             logger.warning(f"Invalid edge types found: {invalid_edge_types}. Valid types are: {TYPE_EDGES}")
             edges_types = [t for t in edges_types if t in TYPE_EDGES]
 
+        node_criteria = []
         if len(nodes_types) > 0:
-            if inv_flag:
-                graph = FilterFunc.apply_nodes_filter(graph, lambda node: node.type not in nodes_types)
-            else:
-                graph = FilterFunc.apply_nodes_filter(graph, lambda node: node.type in nodes_types)
-
+            node_criteria.append(("cmp", "type", "in", nodes_types))
         if node_reg:
-            if inv_flag:
-                graph = FilterFunc.apply_nodes_filter(graph,
-                                                      lambda node: not CommonFilter._matches_pattern(node.id, node_reg))
-            else:
-                graph = FilterFunc.apply_nodes_filter(graph,
-                                                      lambda node: CommonFilter._matches_pattern(node.id, node_reg))
-
+            node_criteria.append(("cmp", "id", REGEX_OPERATOR, CommonFilter._pattern_regex(node_reg)))
+        edge_criteria = []
         if len(edges_types) > 0:
-            if inv_flag:
-                graph = FilterFunc.apply_edges_filter(graph, lambda edge: edge.type not in edges_types)
-            else:
-                graph = FilterFunc.apply_edges_filter(graph, lambda edge: edge.type in edges_types)
-
-        return graph
+            edge_criteria.append(("cmp", "type", "in", edges_types))
+
+        if inv_flag:
+            node_criteria = [("not", criterion) for criterion in node_criteria]
+            edge_criteria = [("not", criterion) for criterion in edge_criteria]
+
+        if node_where:
+            node_criteria.append(FilterExpression.parse(node_where, NODE_FIELDS))
+        if edge_where:
+            edge_criteria.append(FilterExpression.parse(edge_where, EDGE_FIELDS))
+
+        node_expression = FilterExpression.conjunction(node_criteria)
+        edge_expression = FilterExpression.conjunction(edge_criteria)
+
+        # Only the nodes with IDs starting with the required prefix can pass, they are found in the sorted ID index
+        prefix = CommonFilter._id_prefix(node_expression) if node_expression else ""
+        node_ids = graph.find_by_prefix(prefix) if prefix else None
+        return FilterFunc.apply_filter(graph,
+                                       FilterExpression.compile(node_expression) if node_expression else None,
+                                       FilterExpression.compile(edge_expression) if edge_expression else None, node_ids)
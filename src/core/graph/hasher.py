@@ -1,7 +1,20 @@
+from collections import deque
+import logging
+from typing import Dict, Iterable, List, Set
+
+from core.models.common import TypeSource
 from core.models.edge import TypeEdge
 from core.models.graph import Graph
-from core.models.node import ADDITIONAL_NODE_TYPES, CODE_NODE_TYPES, ROOT_NODE_NAME
-from utils.hash import stable_hash_from_hashes
+from core.models.node import ADDITIONAL_NODE_TYPES, CODE_NODE_TYPES, ROOT_NODE_NAME, Node
+from utils.hash import stable_hash_from_hashes, stable_multiset_hash
+
+logger = logging.getLogger(__name__)
+
+# Version of the way hashes are calculated, increased whenever the hashes of the same graph change.
+# Stored results that depend on hashes record it and are not used with another version.
+# 2: child hashes are combined together with child names
+# 3: fingerprints cover the parsed nodes not contained by the root
+HASH_FORMAT_VERSION = 3
 
 
 class Hasher:
@@ -10,63 +23,234 @@ class Hasher:
     def recalculate(graph: Graph) -> Graph:
         """
         Recalculates hashes for all nodes in the graph.
-        
+
         This function performs a two-phase hash recalculation:
-        1. First phase: Calculates structure hashes for non-code nodes
+        1. First phase: Calculates structure hashes for non-code nodes reachable from the root
         2. Second phase: Calculates additional hashes for nodes with additional types
-        
-        The function uses recursive traversal to compute hashes based on the graph structure
-        and node relationships.
-        
+
+        The hash of a node is combined from the names and hashes of the nodes it contains, code nodes
+        keep the hashes of their source. Since ids of parsed elements are derived from the names,
+        equal hashes of a node in two graphs mean that its whole subtree is the same. Nodes are visited
+        iteratively in post-order over 'contain' edges, so deep hierarchies don't hit the recursion
+        limit. A node contained by several parents is hashed once and contributes its hash to each
+        of them. A 'contain' edge that closes a cycle is ignored (with a warning), so the nodes of
+        the cycle are hashed as if it were cut there.
+
         Args:
             graph (Graph): The graph object containing nodes and edges to recalculate hashes for
-            
+
         Returns:
             Graph: The same graph object with updated hashes for all nodes
         """
+        for node in graph.get_all_nodes():
+            if node.type not in CODE_NODE_TYPES:
+                node.hash = ""
 
-        def recursive_structure_hash(cur_id: str = ROOT_NODE_NAME) -> str:
-            cur_node = graph.get_node(cur_id)
+        hashed: Set[str] = set()
 
-            if cur_node.type in CODE_NODE_TYPES:
-                return cur_node.hash
+        if ROOT_NODE_NAME in graph.nodes:
+            Hasher._hash_subtrees(graph, [ROOT_NODE_NAME], set(CODE_NODE_TYPES), False, hashed)
+        else:
+            logger.warning(f"Node {ROOT_NODE_NAME} not found, structure hashes are not calculated")
 
-            hashes = []
-            contain_edges = graph.get_edges_out(cur_id)
-            for edge in contain_edges:
-                if edge.type != TypeEdge.CONTAIN:
-                    continue
-                hash_node_id = recursive_structure_hash(edge.dest)
-                hashes.append(hash_node_id)
+        additional_ids = [node.id for node in graph.get_all_nodes() if node.type in ADDITIONAL_NODE_TYPES]
+        Hasher._hash_subtrees(graph, additional_ids, set(ADDITIONAL_NODE_TYPES), True, hashed)
+
+        return graph
 
-            cur_node.hash = stable_hash_from_hashes(hashes)
-            return cur_node.hash
+    @staticmethod
+    def update(graph: Graph, changed_ids: Iterable[str]) -> Graph:
+        """
+        Incrementally updates hashes after a local change of the graph.
 
-        def recursive_additional_hash(cur_id: str = ROOT_NODE_NAME) -> str:
-            cur_node = graph.get_node(cur_id)
+        Instead of rehashing the whole graph, only the marked nodes and their 'contain' ancestors
+        (found through inverse edges) are considered. Nodes are processed children first; an ancestor
+        is rehashed only if one of its children got a new hash, so propagation stops as soon as
+        a recomputed hash equals the old one.
 
-            if cur_node.type not in ADDITIONAL_NODE_TYPES or cur_node.hash != "":
-                return cur_node.hash
+        Callers mark:
+        - code nodes whose hash was changed (their hash is taken as is)
+        - added nodes
+        - nodes whose set of contained nodes changed (e.g. the parent of a removed node)
+
+        Args:
+            graph (Graph): The graph with up-to-date hashes except for the marked changes
+            changed_ids (Iterable[str]): IDs of the changed nodes
 
-            hashes = []
-            contain_edges = graph.get_edges_out(cur_id)
-            for edge in contain_edges:
-                if edge.type != TypeEdge.CONTAIN:
+        Returns:
+            Graph: The same graph object with updated hashes
+        """
+        nodes = graph.nodes
+        marked = set(node_id for node_id in changed_ids if node_id in nodes)
+
+        affected = set(marked)
+        queue = deque(marked)
+        while queue:
+            node_id = queue.popleft()
+            for edge in graph.get_edges_in(node_id):
+                parent = nodes.get(edge.src)
+                if edge.type != TypeEdge.CONTAIN or parent is None or parent.type in CODE_NODE_TYPES:
                     continue
-                hash_node_id = recursive_additional_hash(edge.dest)
-                hashes.append(hash_node_id)
+                if edge.src not in affected:
+                    affected.add(edge.src)
+                    queue.append(edge.src)
 
-            cur_node.hash = stable_hash_from_hashes(hashes)
-            return cur_node.hash
+        pending: Dict[str, int] = {node_id: 0 for node_id in affected}
+        for node_id in affected:
+            for child_id in Hasher._contain_children(graph, node_id):
+                if child_id in affected:
+                    pending[node_id] += 1
 
-        for node in graph.get_all_nodes():
-            if node.type not in CODE_NODE_TYPES:
-                node.hash = ""
+        changed: Set[str] = set()
+        processed: Set[str] = set()
+        ready = deque(node_id for node_id, count in pending.items() if count == 0)
+        remaining = iter(list(affected))
 
-        recursive_structure_hash()
+        while True:
+            if ready:
+                node_id = ready.popleft()
+            else:
+                # The rest of the nodes lie on 'contain' cycles, they are processed in arbitrary order
+                node_id = next((node_id for node_id in remaining if node_id not in processed), None)
+                if node_id is None:
+                    break
+                logger.warning(f"Contain cycle detected through {node_id}, hash propagation order is not defined")
 
-        for node in graph.get_all_nodes():
-            if node.type in ADDITIONAL_NODE_TYPES:
-                recursive_additional_hash(node.id)
+            if node_id in processed:
+                continue
+            processed.add(node_id)
+
+            node = nodes[node_id]
+            children = [child_id for child_id in Hasher._contain_children(graph, node_id) if child_id in nodes]
+            if node.type in CODE_NODE_TYPES:
+                if node_id in marked:
+                    changed.add(node_id)
+            elif node_id in marked or any(child_id in changed for child_id in children):
+                node_hash = stable_hash_from_hashes([Hasher._child_key(nodes[child_id]) for child_id in children])
+                if node_hash != node.hash:
+                    node.hash = node_hash
+                    changed.add(node_id)
 
+            for edge in graph.get_edges_in(node_id):
+                if edge.type == TypeEdge.CONTAIN and edge.src in pending and edge.src not in processed:
+                    pending[edge.src] -= 1
+                    if pending[edge.src] == 0:
+                        ready.append(edge.src)
+
+        logger.info(f"Rehashed {len(affected)} affected nodes, {len(changed)} hashes changed")
         return graph
+
+    @staticmethod
+    def edges_digest(graph: Graph) -> str:
+        """
+        Calculates an order-independent digest of all edges of the graph.
+
+        Args:
+            graph (Graph): The graph to calculate the digest for
+
+        Returns:
+            str: Digest of the edge set
+        """
+        return stable_multiset_hash(f"{edge.src}\0{edge.dest}\0{edge.type}\0{edge.source}"
+                                    for edges in graph.edges.values() for edge in edges)
+
+    @staticmethod
+    def fingerprint(graph: Graph) -> str:
+        """
+        Calculates a fingerprint of the graph: two graphs with equal fingerprints are considered identical.
+
+        The fingerprint consists of the root hash, which covers the parsed hierarchy, a digest of the
+        nodes the root hash doesn't cover (see uncovered_nodes) and the edge set digest.
+        A graph without the root, such as a query result, gets a digest of all its nodes instead.
+        Hashes of the graph are expected to be up to date.
+
+        Args:
+            graph (Graph): The graph to calculate the fingerprint for
+
+        Returns:
+            str: Fingerprint of the graph
+        """
+        root = graph.get_node(ROOT_NODE_NAME)
+        root_hash = root.hash if root is not None else ""
+        nodes_digest = stable_multiset_hash(f"{node.id}\0{node.name}\0{node.type}\0{node.hash}"
+                                            for node in Hasher.uncovered_nodes(graph))
+        return f"{root_hash}-{nodes_digest}-{Hasher.edges_digest(graph)}"
+
+    @staticmethod
+    def uncovered_nodes(graph: Graph) -> List[Node]:
+        """
+        Finds the nodes whose changes are not covered by the root hash: the hand-added nodes and
+        the parsed nodes not reachable from the root over 'contain' edges, e.g. the functions
+        left without their files by a filter. All nodes of a graph without the root are uncovered.
+
+        Args:
+            graph (Graph): The graph to find the nodes in
+
+        Returns:
+            List[Node]: Nodes not covered by the root hash
+        """
+        contained: Set[str] = set()
+        if ROOT_NODE_NAME in graph.nodes:
+            stack = [ROOT_NODE_NAME]
+            contained.add(ROOT_NODE_NAME)
+            while stack:
+                for child_id in Hasher._contain_children(graph, stack.pop()):
+                    if child_id in graph.nodes and child_id not in contained:
+                        contained.add(child_id)
+                        stack.append(child_id)
+        return [node for node in graph.nodes.values() if node.source != TypeSource.CODE or node.id not in contained]
+
+    @staticmethod
+    def _hash_subtrees(graph: Graph, start_ids: Iterable[str], types: Set[str], expand_types: bool, hashed: Set[str]):
+        """
+        Hashes the nodes reachable from start_ids over 'contain' edges in post-order.
+
+        A node is descended into and rehashed when (its type is in types) == expand_types,
+        the other nodes contribute their current hash. Nodes from hashed are not visited again,
+        newly hashed nodes are added to it.
+        """
+        nodes = graph.nodes
+        on_stack: Set[str] = set()
+
+        for start_id in start_ids:
+            if start_id in hashed:
+                continue
+
+            on_stack.add(start_id)
+            # Frame: node id, iterator over its 'contain' children, hashes of the processed children
+            stack = [(start_id, iter(Hasher._contain_children(graph, start_id)), [])]
+
+            while stack:
+                node_id, children, hashes = stack[-1]
+
+                for child_id in children:
+                    child = nodes.get(child_id)
+                    if child is None:
+                        continue
+                    if (child.type in types) != expand_types or child_id in hashed:
+                        hashes.append(Hasher._child_key(child))
+                        continue
+                    if child_id in on_stack:
+                        logger.warning(f"Contain cycle detected: edge {node_id}->{child_id} is ignored for hashing")
+                        continue
+
+                    on_stack.add(child_id)
+                    stack.append((child_id, iter(Hasher._contain_children(graph, child_id)), []))
+                    break
+
+                else:
+                    stack.pop()
+                    on_stack.remove(node_id)
+                    node = nodes[node_id]
+                    node.hash = stable_hash_from_hashes(hashes)
+                    hashed.add(node_id)
+                    if stack:
+                        stack[-1][2].append(Hasher._child_key(node))
+
+    @staticmethod
+    def _child_key(child: Node) -> str:
+        return f"{child.name}:{child.hash}"
+
+    @staticmethod
+    def _contain_children(graph: Graph, node_id: str) -> List[str]:
+        return [edge.dest for edge in graph.get_edges_out(node_id) if edge.type == TypeEdge.CONTAIN]
@@ -0,0 +1,172 @@
+from collections import defaultdict, deque
+import logging
+from typing import Dict, Iterable, List, Set
+
+from core.graph.difference import GraphComparator, TypeDiff
+from core.models.edge import TypeEdge
+from core.models.graph import Graph
+from core.models.impact import ImpactResult
+from core.models.node import CODE_NODE_TYPES, STRUCTURE_NODE_TYPES, TypeNode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STOP_EDGE_TYPES = [TypeEdge.CONTAIN]
+
+
+class ImpactAnalyzer:
+
+    @staticmethod
+    def changed_nodes(old_graph: Graph,
+                      new_graph: Graph,
+                      stop_edge_types: Iterable[str] = DEFAULT_STOP_EDGE_TYPES) -> Set[str]:
+        """
+        Finds the code nodes of new_graph affected directly by the changes between two versions.
+
+        New and changed code nodes are taken as is. A deleted node is not in new_graph, so its direct
+        dependents in old_graph (over edges not in stop_edge_types) that still exist are taken instead.
+
+        Args:
+            old_graph (Graph): The original graph
+            new_graph (Graph): The updated graph
+            stop_edge_types (Iterable[str]): Edge types that don't propagate changes
+
+        Returns:
+            Set[str]: IDs of the changed nodes in new_graph
+        """
+        stop_edge_types = set(stop_edge_types)
+        changed: Set[str] = set()
+
+        for node_id, status in GraphComparator.get_changed_nodes(old_graph, new_graph).items():
+            if status == TypeDiff.DELETED:
+                for edge in old_graph.get_edges_in(node_id):
+                    if edge.type not in stop_edge_types and edge.src in new_graph.nodes:
+                        changed.add(edge.src)
+            elif new_graph.nodes[node_id].type in CODE_NODE_TYPES:
+                changed.add(node_id)
+
+        return changed
+
+    @staticmethod
+    def expand(graph: Graph, node_ids: Iterable[str]) -> Set[str]:
+        """
+        Replaces directories and files with the code nodes they contain, other nodes are kept.
+
+        Args:
+            graph (Graph): The graph the IDs belong to
+            node_ids (Iterable[str]): IDs of nodes, files or directories
+
+        Returns:
+            Set[str]: IDs of the nodes
+        """
+        result: Set[str] = set()
+        stack = []
+        for node_id in node_ids:
+            node = graph.get_node(node_id)
+            if node is None:
+                logger.warning(f"{node_id} not found")
+            elif node.type in STRUCTURE_NODE_TYPES:
+                stack.append(node_id)
+            else:
+                result.add(node_id)
+
+        visited: Set[str] = set(stack)
+        while stack:
+            node_id = stack.pop()
+            for edge in graph.get_edges_out(node_id):
+                child = graph.get_node(edge.dest)
+                if edge.type != TypeEdge.CONTAIN or child is None or edge.dest in visited:
+                    continue
+                visited.add(edge.dest)
+                if child.type in STRUCTURE_NODE_TYPES:
+                    stack.append(edge.dest)
+                else:
+                    result.add(edge.dest)
+
+        return result
+
+    @staticmethod
+    def analyze(graph: Graph,
+                changed: Iterable[str],
+                stop_edge_types: Iterable[str] = DEFAULT_STOP_EDGE_TYPES) -> ImpactResult:
+        """
+        Finds all nodes that transitively depend on the changed nodes.
+
+        A single breadth-first search over incoming edges is started from all changed nodes at once,
+        so every node is visited once however many changed nodes it depends on, and the first visit
+        gives the shortest path to one of them.
+
+        Args:
+            graph (Graph): The graph to analyze
+            changed (Iterable[str]): IDs of the changed nodes
+            stop_edge_types (Iterable[str]): Edge types that are not followed
+
+        Returns:
+            ImpactResult: Changed and impacted nodes with the shortest explaining paths
+        """
+        stop_edge_types = set(stop_edge_types)
+        result = ImpactResult()
+
+        for node_id in changed:
+            if node_id not in graph.nodes:
+                logger.warning(f"{node_id} not found")
+                continue
+            result.changed.add(node_id)
+            result.parents[node_id] = None
+            result.distances[node_id] = 0
+
+        queue = deque(result.changed)
+        while queue:
+            current_id = queue.popleft()
+            distance = result.distances[current_id] + 1
+            for edge in graph.get_edges_in(current_id):
+                if edge.type in stop_edge_types or edge.src in result.parents or edge.src not in graph.nodes:
+                    continue
+                result.parents[edge.src] = current_id
+                result.distances[edge.src] = distance
+                queue.append(edge.src)
+
+        logger.info(f"{len(result.parents) - len(result.changed)} nodes impacted by {len(result.changed)} changes")
+        return result
+
+    @staticmethod
+    def group_by_file(graph: Graph, node_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Groups nodes by the files containing them (files are grouped under themselves).
+
+        Returns:
+            Dict[str, List[str]]: Sorted node IDs by file ID
+        """
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for node_id in node_ids:
+            node = graph.get_node(node_id)
+            if node is not None and node.type == TypeNode.FILE:
+                groups[node_id].append(node_id)
+                continue
+            for file_id in ImpactAnalyzer._containers(graph, node_id, TypeNode.FILE):
+                groups[file_id].append(node_id)
+        return {file_id: sorted(groups[file_id]) for file_id in sorted(groups)}
+
+    @staticmethod
+    def group_by_arc_element(graph: Graph, node_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Groups nodes by the architectural elements containing them or their files.
+
+        Returns:
+            Dict[str, List[str]]: Sorted node IDs by architectural element ID
+        """
+        groups: Dict[str, Set[str]] = defaultdict(set)
+        for node_id in node_ids:
+            holders = [node_id] + ImpactAnalyzer._containers(graph, node_id, TypeNode.FILE)
+            for holder_id in holders:
+                for element_id in ImpactAnalyzer._containers(graph, holder_id, TypeNode.ARC_ELEMENT):
+                    groups[element_id].add(node_id)
+        return {element_id: sorted(groups[element_id]) for element_id in sorted(groups)}
+
+    @staticmethod
+    def _containers(graph: Graph, node_id: str, node_type: str) -> List[str]:
+        result = []
+        for edge in graph.get_edges_in(node_id):
+            container = graph.get_node(edge.src)
+            if edge.type == TypeEdge.CONTAIN and container is not None and container.type == node_type:
+                result.append(edge.src)
+        return result
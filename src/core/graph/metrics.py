@@ -0,0 +1,193 @@
+from collections import deque
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from core.models.edge import TypeEdge
+from core.models.graph import Graph
+from core.models.metrics import CouplingMetrics
+from core.models.node import ADDITIONAL_NODE_TYPES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_EDGE_TYPES = [TypeEdge.USE]
+
+
+class ContainmentTree:
+    """
+    The 'contain' hierarchy of parsed elements with the preorder, depths and parents needed to roll values
+    up to every container in one pass. A node contained by several parents is kept under the first one,
+    a 'contain' edge closing a cycle is ignored. Architectural elements and use cases are roots without
+    children, since they group parts of the hierarchy that may overlap.
+    """
+    __slots__ = ('parent', 'depth', 'order', 'position')
+
+    def __init__(self, graph: Graph):
+        candidates: Dict[str, str] = {}
+        children: Dict[str, List[str]] = {}
+        for node_id, node in graph.nodes.items():
+            if node.type in ADDITIONAL_NODE_TYPES:
+                continue
+            for edge in graph.get_edges_out(node_id):
+                child = graph.nodes.get(edge.dest)
+                if edge.type != TypeEdge.CONTAIN or child is None or child.type in ADDITIONAL_NODE_TYPES:
+                    continue
+                if edge.dest not in candidates:
+                    candidates[edge.dest] = node_id
+                    children.setdefault(node_id, []).append(edge.dest)
+
+        self.parent: Dict[str, Optional[str]] = {}
+        self.depth: Dict[str, int] = {}
+        self.order: List[str] = []
+        roots = [node_id for node_id in graph.nodes if node_id not in candidates]
+        # Nodes on a 'contain' cycle are not reached from the roots and become roots themselves
+        for root_id in roots + [node_id for node_id in candidates]:
+            if root_id in self.depth:
+                continue
+            self.parent[root_id] = None
+            self.depth[root_id] = 0
+            stack = [root_id]
+            while stack:
+                current_id = stack.pop()
+                self.order.append(current_id)
+                for child_id in reversed(children.get(current_id, [])):
+                    if child_id not in self.depth:
+                        self.parent[child_id] = current_id
+                        self.depth[child_id] = self.depth[current_id] + 1
+                        stack.append(child_id)
+        self.position: Dict[str, int] = {node_id: number for number, node_id in enumerate(self.order)}
+
+    def lca(self, first_id: str, second_id: str) -> Optional[str]:
+        """Returns the lowest common container of two nodes (a node contains itself), None if there is none."""
+        while self.depth[first_id] > self.depth[second_id]:
+            first_id = self.parent[first_id]
+        while self.depth[second_id] > self.depth[first_id]:
+            second_id = self.parent[second_id]
+        while first_id != second_id:
+            first_id, second_id = self.parent[first_id], self.parent[second_id]
+            if first_id is None or second_id is None:
+                return None
+        return first_id
+
+    def roll_up(self, deltas: Dict[str, int]) -> Dict[str, int]:
+        """Sums the values of every subtree, children are visited before their parents in reverse preorder."""
+        totals = {node_id: deltas.get(node_id, 0) for node_id in self.order}
+        for node_id in reversed(self.order):
+            parent_id = self.parent[node_id]
+            if parent_id is not None:
+                totals[parent_id] += totals[node_id]
+        return totals
+
+
+class CouplingAnalyzer:
+
+    @staticmethod
+    def compute(graph: Graph, edge_types: Iterable[str] = DEFAULT_METRICS_EDGE_TYPES) -> Dict[str, CouplingMetrics]:
+        """
+        Computes fan-in, fan-out, afferent and efferent coupling of every element, where the element of a
+        container is everything it contains and only edges crossing its boundary are counted.
+
+        Nothing is traversed per container. Every edge adds to its end and subtracts at the lowest common
+        container of its ends, so the sum over a subtree counts exactly the edges with one end inside.
+        Distinct outside elements are counted the same way: the users of an element are sorted in preorder,
+        and the common containers of neighbours and of the element itself are subtracted. One roll-up over
+        the containment tree then gives the values of all containers. Architectural elements and use cases
+        may overlap the hierarchy, so their contents are collected explicitly.
+
+        Args:
+            graph (Graph): The graph to analyze
+            edge_types (Iterable[str]): Edge types forming dependencies
+
+        Returns:
+            Dict[str, CouplingMetrics]: Metrics of every element
+        """
+        edge_types = set(edge_types)
+        tree = ContainmentTree(graph)
+
+        fan_in: Dict[str, int] = {}
+        fan_out: Dict[str, int] = {}
+        users: Dict[str, Set[str]] = {}
+        used: Dict[str, Set[str]] = {}
+        # Deepest common container of an element and any of its users (or used elements)
+        deepest_with_users: Dict[str, str] = {}
+        deepest_with_used: Dict[str, str] = {}
+        for edges in graph.edges.values():
+            for edge in edges:
+                if edge.type not in edge_types or edge.src not in graph.nodes or edge.dest not in graph.nodes:
+                    continue
+                fan_out[edge.src] = fan_out.get(edge.src, 0) + 1
+                fan_in[edge.dest] = fan_in.get(edge.dest, 0) + 1
+                users.setdefault(edge.dest, set()).add(edge.src)
+                used.setdefault(edge.src, set()).add(edge.dest)
+
+                common_id = tree.lca(edge.src, edge.dest)
+                if common_id is None:
+                    continue
+                fan_out[common_id] = fan_out.get(common_id, 0) - 1
+                fan_in[common_id] = fan_in.get(common_id, 0) - 1
+                for node_id, deepest in ((edge.dest, deepest_with_users), (edge.src, deepest_with_used)):
+                    if node_id not in deepest or tree.depth[common_id] > tree.depth[deepest[node_id]]:
+                        deepest[node_id] = common_id
+
+        fan_in_totals = tree.roll_up(fan_in)
+        fan_out_totals = tree.roll_up(fan_out)
+        afferent_totals = tree.roll_up(CouplingAnalyzer._distinct_deltas(tree, used, deepest_with_used))
+        efferent_totals = tree.roll_up(CouplingAnalyzer._distinct_deltas(tree, users, deepest_with_users))
+
+        result = {
+            node_id:
+            CouplingMetrics(fan_in_totals[node_id], fan_out_totals[node_id], afferent_totals[node_id],
+                            efferent_totals[node_id])
+            for node_id in graph.nodes
+        }
+
+        for node_id, node in graph.nodes.items():
+            if node.type in ADDITIONAL_NODE_TYPES:
+                result[node_id] = CouplingAnalyzer._group_metrics(graph, node_id, edge_types)
+
+        logger.info(f"Computed coupling metrics of {len(result)} elements")
+        return result
+
+    @staticmethod
+    def _distinct_deltas(tree: ContainmentTree, neighbours: Dict[str, Set[str]], deepest: Dict[str,
+                                                                                               str]) -> Dict[str, int]:
+        # For every element: its neighbours mark the containers that hold any of them, once each,
+        # and the containers holding the element itself are taken away
+        deltas: Dict[str, int] = {}
+        for node_id, node_neighbours in neighbours.items():
+            ordered = sorted(node_neighbours, key=tree.position.__getitem__)
+            for number, neighbour_id in enumerate(ordered):
+                deltas[neighbour_id] = deltas.get(neighbour_id, 0) + 1
+                if number > 0:
+                    common_id = tree.lca(ordered[number - 1], neighbour_id)
+                    if common_id is not None:
+                        deltas[common_id] = deltas.get(common_id, 0) - 1
+            if node_id in deepest:
+                deltas[deepest[node_id]] = deltas.get(deepest[node_id], 0) - 1
+        return deltas
+
+    @staticmethod
+    def _group_metrics(graph: Graph, group_id: str, edge_types: Set[str]) -> CouplingMetrics:
+        members = {group_id}
+        queue = deque([group_id])
+        while queue:
+            current_id = queue.popleft()
+            for edge in graph.get_edges_out(current_id):
+                if edge.type == TypeEdge.CONTAIN and edge.dest in graph.nodes and edge.dest not in members:
+                    members.add(edge.dest)
+                    queue.append(edge.dest)
+
+        metrics = CouplingMetrics()
+        afferent: Set[str] = set()
+        efferent: Set[str] = set()
+        for member_id in members:
+            for edge in graph.get_edges_out(member_id):
+                if edge.type in edge_types and edge.dest not in members and edge.dest in graph.nodes:
+                    metrics.fan_out += 1
+                    efferent.add(edge.dest)
+            for edge in graph.get_edges_in(member_id):
+                if edge.type in edge_types and edge.src not in members and edge.src in graph.nodes:
+                    metrics.fan_in += 1
+                    afferent.add(edge.src)
+        metrics.afferent = len(afferent)
+        metrics.efferent = len(efferent)
+        return metrics
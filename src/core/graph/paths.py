@@ -0,0 +1,166 @@
+import heapq
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.models.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+
+class PathFinder:
+
+    @staticmethod
+    def shortest_paths(graph: Graph,
+                       src: str,
+                       dest: str,
+                       k: int = 1,
+                       edge_types: Optional[Iterable[str]] = None,
+                       excluded: Iterable[str] = ()) -> List[List[str]]:
+        """
+        Finds up to k shortest paths from src to dest without repeated elements.
+
+        The first path is found by bidirectional breadth-first search, which expands the smaller of the two
+        frontiers at every step and stops as soon as they meet, so only a small neighbourhood of both ends is
+        visited. The next paths are found by Yen's algorithm: every prefix of the previous path is fixed, its
+        next edges used by the paths already found are removed, and the rest is searched again.
+
+        Args:
+            graph (Graph): The graph to search
+            src (str): ID of the first element
+            dest (str): ID of the last element
+            k (int): Maximum number of paths
+            edge_types (Optional[Iterable[str]]): Edge types forming paths, all types if None
+            excluded (Iterable[str]): IDs of elements the paths must not pass through
+
+        Returns:
+            List[List[str]]: Paths from the shortest, each is a list of element IDs from src to dest
+        """
+        for node_id in (src, dest):
+            if node_id not in graph.nodes:
+                text_error = f"{node_id} not found in graph"
+                logger.critical(text_error)
+                raise Exception(text_error)
+
+        edge_types = set(edge_types) if edge_types is not None else None
+        excluded = set(excluded) - {src, dest}
+
+        first_path = PathFinder._bidirectional(graph, src, dest, edge_types, excluded, set())
+        if not first_path:
+            return []
+
+        paths = [first_path]
+        candidates: List[Tuple[int, List[str]]] = []
+        known = {tuple(first_path)}
+        while len(paths) < k:
+            previous_path = paths[-1]
+            for number in range(len(previous_path) - 1):
+                root = previous_path[:number + 1]
+                removed_edges = {(path[number], path[number + 1]) for path in paths if path[:number + 1] == root}
+                spur_path = PathFinder._bidirectional(graph, root[-1], dest, edge_types, excluded | set(root[:-1]),
+                                                      removed_edges)
+                if not spur_path:
+                    continue
+                path = root[:-1] + spur_path
+                if tuple(path) not in known:
+                    known.add(tuple(path))
+                    heapq.heappush(candidates, (len(path), path))
+            if not candidates:
+                break
+            paths.append(heapq.heappop(candidates)[1])
+
+        return paths
+
+    @staticmethod
+    def subgraph(graph: Graph, paths: List[List[str]], edge_types: Optional[Iterable[str]] = None) -> Graph:
+        """
+        Collects the elements of paths and the edges between their consecutive elements into a new graph.
+
+        Args:
+            graph (Graph): The searched graph
+            paths (List[List[str]]): Paths found in the graph
+            edge_types (Optional[Iterable[str]]): Edge types forming paths, all types if None
+
+        Returns:
+            Graph: Graph of the paths
+        """
+        edge_types = set(edge_types) if edge_types is not None else None
+        result = Graph()
+        for path in paths:
+            for node_id in path:
+                if node_id not in result.nodes:
+                    result.add_node(graph.nodes[node_id])
+            for src, dest in zip(path, path[1:]):
+                for edge in graph.get_edges_out(src):
+                    if edge.dest == dest and (edge_types is None or edge.type in edge_types):
+                        result.add_edge(edge)
+        return result
+
+    @staticmethod
+    def _bidirectional(graph: Graph, src: str, dest: str, edge_types: Optional[Set[str]], excluded: Set[str],
+                       excluded_edges: Set[Tuple[str, str]]) -> List[str]:
+        if src == dest:
+            return [src]
+
+        # Parent and number of hops of every visited element, from src forwards and from dest backwards
+        forward: Dict[str, Tuple[Optional[str], int]] = {src: (None, 0)}
+        backward: Dict[str, Tuple[Optional[str], int]] = {dest: (None, 0)}
+        forward_frontier = [src]
+        backward_frontier = [dest]
+
+        while forward_frontier and backward_frontier:
+            is_forward = len(forward_frontier) <= len(backward_frontier)
+            frontier = forward_frontier if is_forward else backward_frontier
+            visited, other = (forward, backward) if is_forward else (backward, forward)
+
+            next_frontier = []
+            best: Optional[Tuple[int, str, str]] = None
+            for current_id in frontier:
+                hops = visited[current_id][1] + 1
+                for neighbour_id in PathFinder._neighbours(graph, current_id, is_forward, edge_types, excluded,
+                                                           excluded_edges):
+                    if neighbour_id in other:
+                        length = hops + other[neighbour_id][1]
+                        if best is None or length < best[0]:
+                            best = (length, current_id, neighbour_id)
+                    if neighbour_id not in visited:
+                        visited[neighbour_id] = (current_id, hops)
+                        next_frontier.append(neighbour_id)
+
+            # All meetings of one level are compared, the first one found is not necessarily the shortest
+            if best is not None:
+                logger.info(f"Path from {src} to {dest} found after visiting {len(forward) + len(backward)} elements")
+                _, current_id, neighbour_id = best
+                if is_forward:
+                    return PathFinder._chain(forward, current_id)[::-1] + PathFinder._chain(backward, neighbour_id)
+                return PathFinder._chain(forward, neighbour_id)[::-1] + PathFinder._chain(backward, current_id)
+
+            if is_forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        return []
+
+    @staticmethod
+    def _neighbours(graph: Graph, node_id: str, is_forward: bool, edge_types: Optional[Set[str]], excluded: Set[str],
+                    excluded_edges: Set[Tuple[str, str]]) -> List[str]:
+        edges = graph.get_edges_out(node_id) if is_forward else graph.get_edges_in(node_id)
+        neighbours = set()
+        for edge in edges:
+            if edge_types is not None and edge.type not in edge_types:
+                continue
+            if (edge.src, edge.dest) in excluded_edges:
+                continue
+            neighbour_id = edge.dest if is_forward else edge.src
+            if neighbour_id not in excluded and neighbour_id in graph.nodes:
+                neighbours.add(neighbour_id)
+        # Edges are stored in sets, sorting makes the choice between paths of equal length reproducible
+        return sorted(neighbours)
+
+    @staticmethod
+    def _chain(visited: Dict[str, Tuple[Optional[str], int]], node_id: Optional[str]) -> List[str]:
+        chain = []
+        while node_id is not None:
+            chain.append(node_id)
+            node_id = visited[node_id][0]
+        return chain
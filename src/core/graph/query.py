@@ -0,0 +1,134 @@
+from collections import deque
+from dataclasses import dataclass, field, replace
+import logging
+from typing import Iterable, Iterator, List, Optional
+
+from core.models.edge import Edge
+from core.models.graph import Graph
+from core.models.node import Node
+
+logger = logging.getLogger(__name__)
+
+DISTANCE_FIELD = 'distance'
+
+
+class Direction:
+    OUT = "out"
+    IN = "in"
+    BOTH = "both"
+
+
+DIRECTIONS = [Direction.OUT, Direction.IN, Direction.BOTH]
+
+
+@dataclass
+class Query:
+    start: List[str]
+    direction: str = Direction.OUT
+    # Maximum number of hops from the start nodes, 0 for no limit
+    depth: int = 0
+    # Edge types to traverse, all types if None
+    edge_types: Optional[List[str]] = None
+    # Nodes of these types are included but not traversed further
+    stop_node_types: List[str] = field(default_factory=list)
+    # Store the number of hops from the nearest start node in meta[DISTANCE_FIELD]
+    distance: bool = False
+
+
+class QueryEngine:
+
+    @staticmethod
+    def run(graph: Graph, query: Query) -> Iterator[Node | Edge]:
+        """
+        Runs a query as one breadth-first search from all start nodes at once.
+
+        Elements are produced as they are reached, every node before the edges referencing it,
+        so they can be written by an exporter without collecting a subgraph. Nodes and edges are
+        yielded as is (copies only when distances are added) and must not be modified.
+
+        An edge is produced when it is traversed from a node whose neighbours are explored: a node at
+        the depth limit or of a stop type is included, but its other edges are not.
+
+        Args:
+            graph (Graph): The graph to query
+            query (Query): Start nodes and traversal conditions
+
+        Returns:
+            Iterator[Node | Edge]: Reached nodes and traversed edges
+        """
+        if query.direction not in DIRECTIONS:
+            text_error = f"Unknown direction {query.direction}, expected one of {DIRECTIONS}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        edge_types = set(query.edge_types) if query.edge_types is not None else None
+        stop_node_types = set(query.stop_node_types)
+        follow_out = query.direction in (Direction.OUT, Direction.BOTH)
+        follow_in = query.direction in (Direction.IN, Direction.BOTH)
+
+        distances = {}
+        queue = deque()
+        for node_id in query.start:
+            if node_id not in graph.nodes:
+                logger.warning(f"{node_id} not found")
+                continue
+            if node_id in distances:
+                continue
+            distances[node_id] = 0
+            queue.append(node_id)
+            yield QueryEngine._output_node(graph.nodes[node_id], 0, query.distance)
+
+        # Both directions reach an edge from its two ends
+        emitted_edges = set() if follow_out and follow_in else None
+
+        while queue:
+            current_id = queue.popleft()
+            if distances[current_id] > 0 and graph.nodes[current_id].type in stop_node_types:
+                continue
+            distance = distances[current_id] + 1
+
+            for edge, neighbour_id in QueryEngine._neighbours(graph, current_id, follow_out, follow_in):
+                if edge_types is not None and edge.type not in edge_types:
+                    continue
+                if neighbour_id not in graph.nodes:
+                    continue
+
+                if neighbour_id not in distances:
+                    distances[neighbour_id] = distance
+                    if query.depth == 0 or distance < query.depth:
+                        queue.append(neighbour_id)
+                    yield QueryEngine._output_node(graph.nodes[neighbour_id], distance, query.distance)
+
+                if emitted_edges is not None:
+                    if edge in emitted_edges:
+                        continue
+                    emitted_edges.add(edge)
+                yield edge
+
+        logger.info(f"Query reached {len(distances)} nodes from {len(query.start)} start nodes")
+
+    @staticmethod
+    def subgraph(graph: Graph, query: Query) -> Graph:
+        """Collects the result of a query into a new graph."""
+        result = Graph()
+        for element in QueryEngine.run(graph, query):
+            if isinstance(element, Node):
+                result.add_node(element)
+            else:
+                result.add_edge(element)
+        return result
+
+    @staticmethod
+    def _neighbours(graph: Graph, node_id: str, follow_out: bool, follow_in: bool) -> Iterable[tuple]:
+        if follow_out:
+            for edge in graph.get_edges_out(node_id):
+                yield edge, edge.dest
+        if follow_in:
+            for edge in graph.get_edges_in(node_id):
+                yield edge, edge.src
+
+    @staticmethod
+    def _output_node(node: Node, distance: int, with_distance: bool) -> Node:
+        if not with_distance:
+            return node
+        return replace(node, meta={**node.meta, DISTANCE_FIELD: distance})
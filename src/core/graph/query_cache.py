@@ -0,0 +1,280 @@
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import weakref
+
+from core.graph.builder import JSONLGraphBuilder
+from core.graph.dependency import DependencyExtensions
+from core.graph.exporter import JSONLGraphExporter
+from core.graph.filters import CommonFilter
+from core.graph.hasher import HASH_FORMAT_VERSION, Hasher
+from core.models.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+# Total number of nodes and edges of the results kept in memory
+DEFAULT_MAX_ELEMENTS = 5_000_000
+# Seconds an unused result is kept
+DEFAULT_MAX_AGE = 3600.0
+DEFAULT_MAX_DISK_BYTES = 1 << 30
+QUERY_CACHE_DIR_NAME = "queries"
+RESULT_SUFFIX = ".jsonl"
+
+
+class CacheEntry:
+    __slots__ = ('graph', 'size', 'last_used')
+
+    def __init__(self, graph: Graph, size: int, last_used: float):
+        self.graph = graph
+        self.size = size
+        self.last_used = last_used
+
+
+class QueryCache:
+    """
+    Results of dependency queries and filters, keyed by the fingerprint of the queried graph and the
+    normalized query parameters.
+
+    Results are kept in memory and, if a directory is given, on disk as JSONL files, both evicted in
+    least recently used order when they exceed their size or were not used for max_age seconds. A graph
+    whose fingerprint changed gets new keys, so stale results are never returned and just age out.
+
+    The fingerprint of a graph object is calculated once and remembered while the graph is alive and its
+    numbers of nodes and edges and the hashes of its nodes stay the same, so adding or removing elements
+    and rehashing with Hasher.update are noticed. Other modifications in place, such as replacing an edge
+    with another one, are not: graphs are expected not to be modified that way while they are queried.
+    Cached result graphs are shared between callers and must not be modified either.
+    """
+    __slots__ = ('cache_dir', 'max_entries', 'max_elements', 'max_age', 'max_disk_bytes', 'entries', 'size',
+                 'fingerprints', 'lock', 'hits', 'disk_hits', 'misses', 'evictions')
+
+    def __init__(self,
+                 cache_dir: Optional[str | Path] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_elements: int = DEFAULT_MAX_ELEMENTS,
+                 max_age: float = DEFAULT_MAX_AGE,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self.max_elements = max_elements
+        self.max_age = max_age
+        self.max_disk_bytes = max_disk_bytes
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.size = 0
+        # Graph -> numbers of nodes and edges, checksum of node hashes, fingerprint. The graphs are not kept alive
+        self.fingerprints: weakref.WeakKeyDictionary[Graph, Tuple[int, int, int, str]] = weakref.WeakKeyDictionary()
+        # Queries of a server run in several threads
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_used_nodes(self, graph: Graph, code_nodes: Set[str], depth: int = 0) -> Graph:
+        """Cached DependencyExtensions.get_used_nodes."""
+        return self.cached(graph, "get_used", {
+            "nodes": code_nodes,
+            "depth": depth
+        }, lambda: DependencyExtensions.get_used_nodes(graph, code_nodes, depth))
+
+    def get_dependent_nodes(self, graph: Graph, code_nodes: Set[str], depth: int = 0) -> Graph:
+        """Cached DependencyExtensions.get_dependent_nodes."""
+        return self.cached(graph, "get_dependent", {
+            "nodes": code_nodes,
+            "depth": depth
+        }, lambda: DependencyExtensions.get_dependent_nodes(graph, code_nodes, depth))
+
+    def filter(self,
+               graph: Graph,
+               nodes_types: List[str] = [],
+               edges_types: List[str] = [],
+               node_reg: str = "",
+               inv_flag: bool = False,
+               node_where: str = "",
+               edge_where: str = "") -> Graph:
+        """Cached CommonFilter.apply."""
+        params = {
+            "nodes_types": nodes_types,
+            "edges_types": edges_types,
+            "node_reg": node_reg,
+            "inv": inv_flag,
+            "where": node_where,
+            "edge_where": edge_where
+        }
+        return self.cached(
+            graph, "filter", params,
+            lambda: CommonFilter.apply(graph, nodes_types, edges_types, node_reg, inv_flag, node_where, edge_where))
+
+    def cached(self, graph: Graph, operation: str, params: Dict[str, Any], compute: Callable[[], Graph]) -> Graph:
+        """
+        Returns the stored result of an operation on the graph or computes and stores it.
+
+        Args:
+            graph (Graph): The queried graph
+            operation (str): Name of the operation
+            params (Dict[str, Any]): Parameters of the operation, lists and sets are compared regardless of order
+            compute (Callable[[], Graph]): Function computing the result
+
+        Returns:
+            Graph: Result of the operation
+        """
+        key = QueryCache.key(self.fingerprint(graph), operation, params)
+        now = time.time()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry.last_used > self.max_age:
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                entry.last_used = now
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry.graph
+
+        result = self._load(key, now)
+        if result is None:
+            with self.lock:
+                self.misses += 1
+            result = compute()
+            self._save(key, result)
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            entry = CacheEntry(result, len(result.nodes) + QueryCache._edge_count(result), now)
+            self.entries[key] = entry
+            self.size += entry.size
+            self._evict()
+        return result
+
+    def fingerprint(self, graph: Graph) -> str:
+        """Returns the fingerprint of a graph, calculated once for a graph object that is not modified."""
+        state = (len(graph.nodes), QueryCache._edge_count(graph), QueryCache._hashes_checksum(graph))
+        with self.lock:
+            memo = self.fingerprints.get(graph)
+            if memo is not None and memo[:3] == state:
+                return memo[3]
+
+        fingerprint = Hasher.fingerprint(graph)
+        with self.lock:
+            self.fingerprints[graph] = state + (fingerprint, )
+        return fingerprint
+
+    @staticmethod
+    def key(fingerprint: str, operation: str, params: Dict[str, Any]) -> str:
+        """Builds the key of a query from the graph fingerprint, the hash format and the normalized parameters."""
+        normalized = {}
+        for name, value in params.items():
+            if isinstance(value, (list, tuple, set)):
+                value = sorted(set(value))
+            normalized[name] = value
+        data = json.dumps([fingerprint, HASH_FORMAT_VERSION, operation, normalized], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Reports how well the cache works.
+
+        Returns:
+            Dict[str, float]: Counts of hits (in memory and on disk), misses and evictions, the hit rate
+                and the number of entries and elements in memory
+        """
+        with self.lock:
+            requests = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / requests, 3) if requests else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "elements": self.size,
+            }
+
+    def clear(self):
+        """Drops the results kept in memory, results on disk stay."""
+        with self.lock:
+            self.entries.clear()
+            self.fingerprints.clear()
+            self.size = 0
+
+    def _remove(self, key: str):
+        self.size -= self.entries.pop(key).size
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_elements):
+            key = next(iter(self.entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _result_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{RESULT_SUFFIX}"
+
+    def _load(self, key: str, now: float) -> Optional[Graph]:
+        if self.cache_dir is None:
+            return None
+        path = self._result_path(key)
+        try:
+            if now - path.stat().st_mtime > self.max_age:
+                return None
+            result = JSONLGraphBuilder.build(str(path))
+            # Modification time marks the last use of a result on disk
+            os.utime(path, (now, now))
+        except Exception as e:
+            if path.exists():
+                logger.info(f"Cached result {path} can't be read: {str(e)}")
+            return None
+
+        with self.lock:
+            self.disk_hits += 1
+        return result
+
+    def _save(self, key: str, result: Graph):
+        if self.cache_dir is None:
+            return
+        path = self._result_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            JSONLGraphExporter.save(result, str(tmp_path))
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Result {path} is not saved: {str(e)}")
+
+    def _evict_disk(self):
+        now = time.time()
+        files = []
+        for path in self.cache_dir.glob(f"*{RESULT_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if total <= self.max_disk_bytes and now - mtime <= self.max_age:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self.lock:
+                self.evictions += 1
+
+    @staticmethod
+    def _edge_count(graph: Graph) -> int:
+        return sum(len(edges) for edges in graph.edges.values())
+
+    @staticmethod
+    def _hashes_checksum(graph: Graph) -> int:
+        # Hashes of strings are cached by Python, so this is much cheaper than the fingerprint itself
+        return sum(hash(node.hash) for node in graph.nodes.values())
@@ -0,0 +1,226 @@
+import json
+import logging
+from pathlib import Path
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.graph.components import ComponentFinder
+from core.models.edge import TypeEdge
+from core.models.graph import Graph
+from utils.hash import stable_files_hash
+from utils.paths import graph_files, sidecar_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REACHABILITY_EDGE_TYPES = [TypeEdge.USE]
+REACHABILITY_FILE_NAME = "reachability_index.json"
+
+# Lowest component number and the bit mask of components shifted by it
+Label = Tuple[int, int]
+
+
+class ReachabilityIndex:
+    """
+    Transitive closure of a graph over its condensation into strongly connected components.
+
+    Every component is labeled with bit masks of the components it reaches and that reach it, so
+    reachability of two nodes is a single bit test and descendant or ancestor sets are read from
+    the labels without a traversal. Nodes of one component reach each other and themselves.
+
+    Components are numbered in depth-first postorder, so the components reachable from one are mostly
+    numbered just before it. A label is stored as the lowest component number it contains and the mask
+    shifted by it, which keeps its size close to the span of the reachable components instead of
+    the number of all components.
+    """
+    __slots__ = ('components', 'component_of', 'descendant_bits', 'ancestor_bits', 'edge_count', 'build_seconds', 'key')
+
+    def __init__(self,
+                 components: List[List[str]],
+                 descendant_bits: List[Label],
+                 ancestor_bits: List[Label],
+                 edge_count: int = 0,
+                 key: str = ""):
+        self.components = components
+        self.component_of: Dict[str, int] = {
+            node_id: number
+            for number, component in enumerate(components)
+            for node_id in component
+        }
+        self.descendant_bits = descendant_bits
+        self.ancestor_bits = ancestor_bits
+        self.edge_count = edge_count
+        self.build_seconds = 0.0
+        self.key = key
+
+    @staticmethod
+    def build(graph: Graph, edge_types: Iterable[str] = DEFAULT_REACHABILITY_EDGE_TYPES) -> 'ReachabilityIndex':
+        """
+        Builds the index of a graph.
+
+        Components are found by Tarjan's algorithm in reverse topological order, so the descendants of
+        a component are complete before any component using it, and the ancestors are collected in the
+        opposite order. Each edge of the condensation is processed once per direction.
+
+        Args:
+            graph (Graph): The graph to index
+            edge_types (Iterable[str]): Edge types to follow
+
+        Returns:
+            ReachabilityIndex: The index
+        """
+        start_time = time.perf_counter()
+        edge_types = set(edge_types)
+        components = ComponentFinder.strongly_connected(graph, edge_types)
+        component_of = {node_id: number for number, component in enumerate(components) for node_id in component}
+
+        successors: List[Set[int]] = [set() for _ in components]
+        predecessors: List[Set[int]] = [set() for _ in components]
+        edge_count = 0
+        for number, component in enumerate(components):
+            for node_id in component:
+                for edge in graph.get_edges_out(node_id):
+                    if edge.type in edge_types and edge.dest in component_of:
+                        edge_count += 1
+                        if component_of[edge.dest] != number:
+                            successors[number].add(component_of[edge.dest])
+                            predecessors[component_of[edge.dest]].add(number)
+
+        descendant_bits: List[Label] = []
+        for number in range(len(components)):
+            descendant_bits.append(ReachabilityIndex._union(number, [descendant_bits[s] for s in successors[number]]))
+
+        ancestor_bits: List[Optional[Label]] = [None] * len(components)
+        for number in range(len(components) - 1, -1, -1):
+            ancestor_bits[number] = ReachabilityIndex._union(number, [ancestor_bits[p] for p in predecessors[number]])
+
+        index = ReachabilityIndex(components, descendant_bits, ancestor_bits, edge_count)
+        index.build_seconds = time.perf_counter() - start_time
+        logger.info(f"Built reachability index of {len(components)} components in {index.build_seconds:.3f}s")
+        return index
+
+    def reaches(self, src: str, dest: str) -> bool:
+        """
+        Checks whether there is a path from src to dest.
+
+        Raises:
+            Exception: If one of the nodes is not indexed
+        """
+        offset, bits = self.descendant_bits[self._component(src)]
+        position = self._component(dest) - offset
+        return position >= 0 and bool((bits >> position) & 1)
+
+    def descendants(self, node_id: str) -> Set[str]:
+        """Returns the nodes reachable from the node, including the node itself."""
+        return self._members(self.descendant_bits[self._component(node_id)])
+
+    def ancestors(self, node_id: str) -> Set[str]:
+        """Returns the nodes the node is reachable from, including the node itself."""
+        return self._members(self.ancestor_bits[self._component(node_id)])
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Reports the size of the index against the size of the indexed graph.
+
+        Returns:
+            Dict[str, float]: Counts of nodes, edges and components, bytes of the labels and build time
+        """
+        label_bytes = sum((bits.bit_length() + 7) // 8 for _, bits in self.descendant_bits)
+        label_bytes += sum((bits.bit_length() + 7) // 8 for _, bits in self.ancestor_bits)
+        return {
+            "nodes": len(self.component_of),
+            "edges": self.edge_count,
+            "components": len(self.components),
+            "label_bytes": label_bytes,
+            "build_seconds": round(self.build_seconds, 3),
+        }
+
+    def save(self, path: str | Path):
+        data = {
+            "key": self.key,
+            "edge_count": self.edge_count,
+            "build_seconds": self.build_seconds,
+            "components": self.components,
+            "descendants": [[offset, f"{bits:x}"] for offset, bits in self.descendant_bits],
+            "ancestors": [[offset, f"{bits:x}"] for offset, bits in self.ancestor_bits],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    @staticmethod
+    def load(path: str | Path) -> Optional['ReachabilityIndex']:
+        """Reads a saved index, None if it is missing or damaged."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            index = ReachabilityIndex(data["components"], [(offset, int(bits, 16))
+                                                           for offset, bits in data["descendants"]],
+                                      [(offset, int(bits, 16)) for offset, bits in data["ancestors"]],
+                                      data["edge_count"], data["key"])
+            index.build_seconds = data["build_seconds"]
+            return index
+        except (OSError, ValueError, KeyError) as e:
+            logger.info(f"Index {path} can't be read: {str(e)}")
+            return None
+
+    @staticmethod
+    def load_or_build(graph_path: str | Path,
+                      build_graph: Callable[[str | Path], Graph],
+                      edge_types: Iterable[str] = DEFAULT_REACHABILITY_EDGE_TYPES) -> 'ReachabilityIndex':
+        """
+        Returns the index stored next to a graph, rebuilding it if the graph or the edge types changed.
+
+        Args:
+            graph_path (str | Path): Path to the graph directory or JSONL file
+            build_graph (Callable[[str | Path], Graph]): Function building the graph from graph_path
+            edge_types (Iterable[str]): Edge types to follow
+
+        Returns:
+            ReachabilityIndex: The index
+        """
+        edge_types = sorted(set(edge_types))
+        key = stable_files_hash(graph_files(graph_path), json.dumps(edge_types))
+        index_path = sidecar_path(graph_path, REACHABILITY_FILE_NAME)
+
+        index = ReachabilityIndex.load(index_path)
+        if index is not None and index.key == key:
+            logger.info(f"Using index {index_path}")
+            return index
+
+        index = ReachabilityIndex.build(build_graph(graph_path), edge_types)
+        index.key = key
+        try:
+            index.save(index_path)
+        except OSError as e:
+            logger.warning(f"Index {index_path} is not saved: {str(e)}")
+        return index
+
+    def _component(self, node_id: str) -> int:
+        if node_id not in self.component_of:
+            text_error = f"{node_id} not found in reachability index"
+            logger.critical(text_error)
+            raise Exception(text_error)
+        return self.component_of[node_id]
+
+    def _members(self, label: Label) -> Set[str]:
+        offset, bits = label
+        result: Set[str] = set()
+        for position in ReachabilityIndex._bit_positions(bits):
+            result.update(self.components[offset + position])
+        return result
+
+    @staticmethod
+    def _union(number: int, labels: List[Label]) -> Label:
+        offset = min([number] + [label_offset for label_offset, _ in labels])
+        bits = 1 << (number - offset)
+        for label_offset, label_bits in labels:
+            bits |= label_bits << (label_offset - offset)
+        return offset, bits
+
+    @staticmethod
+    def _bit_positions(bits: int) -> Iterator[int]:
+        # Scanning the binary string is linear in the mask length, clearing bits one by one is quadratic
+        digits = f"{bits:b}"[::-1]
+        position = digits.find("1")
+        while position != -1:
+            yield position
+            position = digits.find("1", position + 1)
@@ -0,0 +1,219 @@
+import csv
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from core.models.delta import GraphDelta
+from core.models.graph import Graph
+
+from core.graph.builder import CSVGraphBuilder
+from core.graph.delta import DeltaCalculator
+from core.graph.difference import GraphComparator
+from core.graph.exporter import CSVGraphExporter
+
+logger = logging.getLogger(__name__)
+
+LOG_FILE_NAME = "log.csv"
+VERSIONS_DIR_NAME = "versions"
+SNAPSHOT_DIR_NAME = "snapshot"
+DELTA_DIR_NAME = "delta"
+
+DEFAULT_KEYFRAME_INTERVAL = 10
+
+LOG_FIELDS = ['version', 'parent', 'keyframe', 'created', 'message', 'changes']
+
+
+@dataclass
+class GraphVersion:
+    version: str
+    parent: str
+    keyframe: bool
+    created: str
+    message: str = ""
+    changes: int = 0
+
+
+class GraphRepository:
+    """
+    Versioned storage of graphs.
+
+    Every version except the first one stores the delta to its parent. Every keyframe_interval-th version
+    additionally stores a full snapshot, so reconstructing a version loads one snapshot and applies
+    at most keyframe_interval - 1 deltas. Storage grows with the churn between versions rather than
+    with the graph size.
+
+    Layout:
+        log.csv: [version, parent, keyframe, created, message, changes]
+        versions/<version>/delta/: delta to the parent version (see CSVGraphExporter.save_delta)
+        versions/<version>/snapshot/: full graph for keyframes (see CSVGraphExporter.save)
+    """
+    __slots__ = ('repo_path', 'keyframe_interval')
+
+    def __init__(self, repo_path: str | Path, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        self.repo_path = Path(repo_path)
+        self.keyframe_interval = max(1, keyframe_interval)
+
+    def log(self) -> List[GraphVersion]:
+        log_path = self.repo_path / LOG_FILE_NAME
+        if not log_path.exists():
+            return []
+
+        versions = []
+        with open(log_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                versions.append(
+                    GraphVersion(version=row['version'],
+                                 parent=row['parent'],
+                                 keyframe=row['keyframe'] == 'true',
+                                 created=row['created'],
+                                 message=row['message'],
+                                 changes=int(row['changes'] or 0)))
+        return versions
+
+    def add(self, graph: Graph, message: str = "") -> GraphVersion:
+        """
+        Stores the graph as a new version on top of the latest one.
+
+        Args:
+            graph (Graph): Graph to store
+            message (str, optional): Description of the version
+
+        Returns:
+            GraphVersion: Log entry of the stored version
+        """
+        versions = self.log()
+        parent = versions[-1] if versions else None
+        version_id = str(len(versions) + 1)
+        version_path = self._version_path(version_id)
+
+        since_keyframe = 0
+        for entry in reversed(versions):
+            if entry.keyframe:
+                break
+            since_keyframe += 1
+        keyframe = parent is None or since_keyframe + 1 >= self.keyframe_interval
+
+        changes = len(graph.nodes) + len(graph.get_all_edges())
+        if parent is not None:
+            delta = DeltaCalculator.compute(self.checkout(parent.version), graph)
+            CSVGraphExporter.save_delta(delta, version_path / DELTA_DIR_NAME)
+            changes = delta.size()
+
+        if keyframe:
+            CSVGraphExporter.save(graph, version_path / SNAPSHOT_DIR_NAME)
+
+        entry = GraphVersion(version=version_id,
+                             parent=parent.version if parent else "",
+                             keyframe=keyframe,
+                             created=datetime.now().isoformat(timespec='seconds'),
+                             message=message,
+                             changes=changes)
+        self._append_log(entry)
+
+        logger.info(f"Stored version {version_id} ({'keyframe' if keyframe else 'delta'}, {changes} changes)")
+        return entry
+
+    def checkout(self, version: str) -> Graph:
+        """
+        Reconstructs the graph of the given version from the nearest keyframe and the following deltas.
+
+        Args:
+            version (str): Version identifier
+
+        Returns:
+            Graph: Graph of the version
+        """
+        chain = self._chain(version)
+
+        keyframe_index = len(chain) - 1
+        while not chain[keyframe_index].keyframe:
+            keyframe_index -= 1
+
+        graph = CSVGraphBuilder.build(self._version_path(chain[keyframe_index].version) / SNAPSHOT_DIR_NAME)
+        for entry in chain[keyframe_index + 1:]:
+            DeltaCalculator.apply(graph, self.get_delta(entry.version))
+
+        return graph
+
+    def get_delta(self, version: str) -> GraphDelta:
+        """Returns the delta from the parent of the version to the version itself."""
+        delta_path = self._version_path(version) / DELTA_DIR_NAME
+        if not delta_path.exists():
+            return GraphDelta()
+        return CSVGraphBuilder.build_delta(delta_path)
+
+    def get_delta_between(self, from_version: str, to_version: str) -> GraphDelta:
+        """
+        Composes the stored deltas between two versions.
+
+        Args:
+            from_version (str): Ancestor version
+            to_version (str): Descendant version
+
+        Returns:
+            GraphDelta: Delta that turns from_version into to_version
+        """
+        chain = self._chain(to_version)
+        versions = [entry.version for entry in chain]
+        if from_version not in versions:
+            raise Exception(f"Version {from_version} is not an ancestor of {to_version}")
+
+        delta = GraphDelta()
+        for version in versions[versions.index(from_version) + 1:]:
+            delta = DeltaCalculator.compose(delta, self.get_delta(version))
+        return delta
+
+    def diff(self, from_version: str, to_version: str) -> Graph:
+        """
+        Builds the difference graph between two versions from their stored deltas.
+
+        Only the target version is reconstructed; the statuses are taken from the composed deltas.
+        If from_version is newer than to_version both versions are reconstructed and compared.
+
+        Returns:
+            Graph: Difference graph in the format of GraphComparator.get_difference
+        """
+        to_graph = self.checkout(to_version)
+        if from_version in [entry.version for entry in self._chain(to_version)]:
+            delta = self.get_delta_between(from_version, to_version)
+            return GraphComparator.get_difference_from_delta(to_graph, delta)
+
+        return GraphComparator.get_difference(self.checkout(from_version), to_graph)
+
+    def _chain(self, version: str) -> List[GraphVersion]:
+        versions = {entry.version: entry for entry in self.log()}
+        if version not in versions:
+            raise Exception(f"Version {version} not found in repository {self.repo_path}")
+
+        chain = []
+        current: Optional[GraphVersion] = versions[version]
+        while current is not None:
+            chain.append(current)
+            current = versions.get(current.parent)
+        chain.reverse()
+        return chain
+
+    def _version_path(self, version: str) -> Path:
+        return self.repo_path / VERSIONS_DIR_NAME / version
+
+    def _append_log(self, entry: GraphVersion):
+        self.repo_path.mkdir(parents=True, exist_ok=True)
+        log_path = self.repo_path / LOG_FILE_NAME
+        is_new = not os.path.exists(log_path)
+
+        with open(log_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=LOG_FIELDS, quoting=csv.QUOTE_MINIMAL)
+            if is_new:
+                writer.writeheader()
+            writer.writerow({
+                'version': entry.version,
+                'parent': entry.parent,
+                'keyframe': 'true' if entry.keyframe else 'false',
+                'created': entry.created,
+                'message': entry.message,
+                'changes': entry.changes
+            })
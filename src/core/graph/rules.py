@@ -0,0 +1,176 @@
+from collections import deque
+import logging
+from pathlib import Path
+import time
+from typing import Callable, Dict, List, Set, Tuple
+
+from core.models.edge import TYPE_EDGES, TypeEdge
+from core.models.graph import Graph
+from core.models.rule import RULE_ACTIONS, Rule, RuleAction, Violation
+from utils.glob import GlobTrie
+
+logger = logging.getLogger(__name__)
+
+# Lines starting with it are comments, element ids may contain it elsewhere
+COMMENT_PREFIX = "#"
+ARROW = "->"
+# Prefix of a pattern standing for an additional element and everything it contains
+GROUP_PREFIX = "@"
+# Separator of a file and the entities defined in it within element ids
+ENTITY_SEPARATOR = "#"
+
+
+class RuleParser:
+
+    @staticmethod
+    def parse(text: str) -> List[Rule]:
+        """
+        Parses architecture rules, one per line: '<allow|deny> <source> -> <target> [<edge type>,...]'.
+
+        Source and target are globs over element ids ('**' crosses directories, '*' and '?' do not)
+        or '@<id>' for an architectural element or use case with everything it contains. Edge types
+        default to 'use'. Empty lines and lines starting with '#' are skipped.
+
+        Args:
+            text (str): Contents of the rules file
+
+        Returns:
+            List[Rule]: Rules in file order
+        """
+        rules = []
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            line = line.strip()
+            if not line or line.startswith(COMMENT_PREFIX):
+                continue
+
+            parts = line.split()
+            if len(parts) not in (4, 5) or parts[2] != ARROW or parts[0] not in RULE_ACTIONS:
+                text_error = f"invalid rule at line {line_number}: '{line}', " \
+                             f"expected '<{'|'.join(RULE_ACTIONS)}> <source> {ARROW} <target> [<edge types>]'"
+                logger.critical(text_error)
+                raise Exception(text_error)
+
+            edge_types = parts[4].split(",") if len(parts) == 5 else [TypeEdge.USE]
+            invalid_edge_types = [edge_type for edge_type in edge_types if edge_type not in TYPE_EDGES]
+            if invalid_edge_types:
+                text_error = f"invalid edge types at line {line_number}: {invalid_edge_types}, " \
+                             f"valid types are: {TYPE_EDGES}"
+                logger.critical(text_error)
+                raise Exception(text_error)
+
+            rules.append(Rule(parts[0], parts[1], parts[3], edge_types, line_number))
+        return rules
+
+    @staticmethod
+    def load(path: str | Path) -> List[Rule]:
+        """Reads and parses a rules file, see parse."""
+        return RuleParser.parse(Path(path).read_text(encoding="utf-8"))
+
+
+class RuleChecker:
+    """
+    Architecture rules compiled for checking many edges. For every edge the first rule matching its ends
+    and type decides: a 'deny' rule makes the edge a violation, an 'allow' rule exempts it from the rules
+    below, edges matching no rule are allowed.
+
+    All source globs and all target globs are compiled into one trie each, so the rules matching an element
+    are found by a single walk along its id. They are kept as a bit mask with a bit per rule, computed once
+    per element, so checking an edge is an AND of the masks of its ends and of its type.
+    """
+    __slots__ = ('rules', '_sources', '_targets', '_source_groups', '_target_groups', '_type_masks')
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self._sources: GlobTrie[int] = GlobTrie()
+        self._targets: GlobTrie[int] = GlobTrie()
+        # Bit masks of rules referring to additional elements, by the id of the element
+        self._source_groups: Dict[str, int] = {}
+        self._target_groups: Dict[str, int] = {}
+        self._type_masks: Dict[str, int] = {}
+
+        for number, rule in enumerate(rules):
+            bit = 1 << number
+            for pattern, trie, groups in ((rule.source, self._sources, self._source_groups),
+                                          (rule.target, self._targets, self._target_groups)):
+                if pattern.startswith(GROUP_PREFIX):
+                    group_id = pattern[len(GROUP_PREFIX):]
+                    groups[group_id] = groups.get(group_id, 0) | bit
+                else:
+                    trie.add(pattern, bit)
+            for edge_type in rule.edge_types:
+                self._type_masks[edge_type] = self._type_masks.get(edge_type, 0) | bit
+
+    def check(self, graph: Graph) -> List[Violation]:
+        """
+        Checks all edges of the graph against the rules in one pass.
+
+        Args:
+            graph (Graph): The graph to check
+
+        Returns:
+            List[Violation]: Edges denied by the rules, sorted by their ends
+        """
+        start_time = time.perf_counter()
+        source_masks = self._masks(graph, self._sources, self._source_groups)
+        target_masks = self._masks(graph, self._targets, self._target_groups)
+
+        violations = []
+        type_masks = self._type_masks
+        for src_id, edges in graph.edges.items():
+            source_mask = source_masks.get(src_id, 0)
+            if not source_mask:
+                continue
+            for edge in edges:
+                mask = source_mask & type_masks.get(edge.type, 0) & target_masks.get(edge.dest, 0)
+                if not mask:
+                    continue
+                # The lowest set bit is the first matching rule
+                rule = self.rules[(mask & -mask).bit_length() - 1]
+                if rule.action == RuleAction.DENY:
+                    violations.append(Violation(edge.src, edge.dest, edge.type, rule))
+
+        violations.sort(key=lambda violation: (violation.src, violation.dest, violation.type))
+        logger.info(f"Checked {len(self.rules)} rules, found {len(violations)} violations "
+                    f"in {time.perf_counter() - start_time:.3f}s")
+        return violations
+
+    @staticmethod
+    def _masks(graph: Graph, trie: GlobTrie[int], groups: Dict[str, int]) -> Dict[str, int]:
+        # Entities of a file share the walk along the file id, and are matched by the globs of the file as well
+        file_matchers: Dict[str, Tuple[int, Callable[[str], List[int]]]] = {}
+        masks: Dict[str, int] = {}
+        for node_id in graph.nodes:
+            file_id, separator, _ = node_id.partition(ENTITY_SEPARATOR)
+            if file_id not in file_matchers:
+                file_matchers[file_id] = (RuleChecker._mask(trie.match(file_id)), trie.matcher(file_id))
+            file_mask, entity_matcher = file_matchers[file_id]
+            mask = file_mask | RuleChecker._mask(entity_matcher(node_id)) if separator else file_mask
+            if mask:
+                masks[node_id] = mask
+
+        for group_id, bits in groups.items():
+            if group_id not in graph.nodes:
+                logger.warning(f"Element {group_id} of the rules is not in the graph")
+                continue
+            for member_id in RuleChecker._members(graph, group_id):
+                masks[member_id] = masks.get(member_id, 0) | bits
+        return masks
+
+    @staticmethod
+    def _mask(bits: List[int]) -> int:
+        mask = 0
+        for bit in bits:
+            mask |= bit
+        return mask
+
+    @staticmethod
+    def _members(graph: Graph, group_id: str) -> Set[str]:
+        members = {group_id}
+        queue = deque([group_id])
+        while queue:
+            current_id = queue.popleft()
+            for edge in graph.get_edges_out(current_id):
+                if edge.type == TypeEdge.CONTAIN and edge.dest in graph.nodes and edge.dest not in members:
+                    members.add(edge.dest)
+                    queue.append(edge.dest)
+        return members
@@ -0,0 +1,208 @@
+from collections import defaultdict, deque
+from itertools import chain
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from core.graph.builder import CSVGraphBuilder
+from core.graph.delta import DeltaCalculator
+from core.graph.difference import GraphComparator
+from core.graph.exporter import CSVGraphExporter
+from core.graph.hasher import HASH_FORMAT_VERSION, Hasher
+from core.models.delta import GraphDelta
+from core.models.edge import Edge
+from core.models.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+BASE_FILE_NAME = "base.json"
+DEFAULT_CONTEXT_DEPTH = 1
+
+
+class SparseDiff:
+
+    @staticmethod
+    def save(old_graph: Graph, new_graph: Graph, base_path: str, directory_path: str) -> GraphDelta:
+        f"""
+        Saves the difference between two graphs in the sparse format: only new, deleted and changed
+        elements are stored (in the format of CSVGraphExporter.save_delta) together with a reference
+        to the base graph in {BASE_FILE_NAME}. The reference keeps the path of the base graph relative to
+        directory_path, its fingerprint and the hash format the fingerprint was calculated with, so unchanged
+        elements can be taken from the base graph when they are needed, also after both directories are
+        moved together.
+
+        Args:
+            old_graph: The original graph, stored in base_path
+            new_graph: The updated graph
+            base_path: Path to the CSV directory of old_graph
+            directory_path: Path to the directory where the sparse difference will be saved
+
+        Returns:
+            GraphDelta: The saved delta
+        """
+        delta = DeltaCalculator.compute(old_graph, new_graph)
+        CSVGraphExporter.save_delta(delta, directory_path)
+
+        base_path = str(Path(base_path).resolve())
+        try:
+            base_path = os.path.relpath(base_path, Path(directory_path).resolve())
+        except ValueError:
+            # Paths on different drives on Windows have no relative path
+            pass
+        base = {"path": base_path, "fingerprint": Hasher.fingerprint(old_graph), "hash_format": HASH_FORMAT_VERSION}
+        try:
+            with open(os.path.join(directory_path, BASE_FILE_NAME), "w", encoding="utf-8") as f:
+                json.dump(base, f, indent=2)
+        except (IOError, PermissionError) as e:
+            text_error = f"Error writing base reference file: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        logger.info(f"Saved sparse difference with {delta.size()} changes to {directory_path}")
+        return delta
+
+    @staticmethod
+    def is_sparse(directory_path: str) -> bool:
+        return os.path.isfile(os.path.join(directory_path, BASE_FILE_NAME))
+
+    @staticmethod
+    def load(directory_path: str) -> Tuple[GraphDelta, str]:
+        """
+        Reads the sparse difference without touching the base graph.
+
+        Args:
+            directory_path: Path to the sparse difference directory
+
+        Returns:
+            Tuple[GraphDelta, str]: The delta and the path of the base graph
+        """
+        return CSVGraphBuilder.build_delta(directory_path), SparseDiff._read_base(directory_path)["path"]
+
+    @staticmethod
+    def apply(directory_path: str, base_path: str = "") -> Graph:
+        """
+        Applies the sparse difference as a patch to its base graph and returns the updated graph.
+
+        Args:
+            directory_path: Path to the sparse difference directory
+            base_path: Path to the base graph, if it was moved after the difference was saved
+
+        Returns:
+            Graph: The updated graph
+        """
+        delta, _ = SparseDiff.load(directory_path)
+        base_graph = SparseDiff._load_base(directory_path, base_path)
+        return DeltaCalculator.apply(base_graph, delta)
+
+    @staticmethod
+    def load_context(directory_path: str, depth: int = DEFAULT_CONTEXT_DEPTH, base_path: str = "") -> Graph:
+        """
+        Builds a difference graph (as GraphComparator.get_difference) restricted to the changed elements
+        and their unchanged context: the nodes within depth edges (in any direction) from a changed
+        node and the ends of changed edges.
+
+        The delta is not applied to the whole base graph: the context is found by walking the base graph
+        from the changed elements, with the changes of the delta laid over it, and only the elements found
+        get a difference status.
+
+        Args:
+            directory_path: Path to the sparse difference directory
+            depth: Number of edges to walk from the changed elements
+            base_path: Path to the base graph, if it was moved after the difference was saved
+
+        Returns:
+            Graph: Difference graph of the changed elements and their context
+        """
+        delta, _ = SparseDiff.load(directory_path)
+        base_graph = SparseDiff._load_base(directory_path, base_path)
+
+        # Changed edges by both of their ends, to walk over them from either end
+        changed_edges: Dict[str, List[Edge]] = defaultdict(list)
+        for edge in delta.added_edges | delta.removed_edges:
+            changed_edges[edge.src].append(edge)
+            changed_edges[edge.dest].append(edge)
+
+        def exists(node_id: str) -> bool:
+            return node_id in base_graph.nodes or node_id in delta.added_nodes or node_id in delta.removed_nodes
+
+        def neighbours(node_id: str) -> Iterable[str]:
+            for edge in chain(base_graph.get_edges_out(node_id), base_graph.get_edges_in(node_id)):
+                # Edges of deleted nodes disappear with them unless the delta lists them as deleted
+                if edge not in delta.removed_edges and edge.src not in delta.removed_nodes \
+                        and edge.dest not in delta.removed_nodes:
+                    yield edge.dest if edge.src == node_id else edge.src
+            for edge in changed_edges.get(node_id, []):
+                yield edge.dest if edge.src == node_id else edge.src
+
+        changed: Set[str] = set(delta.added_nodes) | set(delta.removed_nodes) | set(delta.changed_nodes)
+        selected: Set[str] = set(node_id for node_id in changed if exists(node_id))
+        queue = deque((node_id, 0) for node_id in selected)
+        for edge in delta.added_edges | delta.removed_edges:
+            selected.update(node_id for node_id in (edge.src, edge.dest) if exists(node_id))
+
+        while queue:
+            node_id, distance = queue.popleft()
+            if distance >= depth:
+                continue
+            for neighbour in neighbours(node_id):
+                if neighbour not in selected and exists(neighbour):
+                    selected.add(neighbour)
+                    queue.append((neighbour, distance + 1))
+
+        # The selected part of the new graph and of the delta leading to it
+        new_graph = Graph()
+        for node_id in selected:
+            node = delta.added_nodes.get(node_id) or delta.changed_nodes.get(node_id) or base_graph.nodes.get(node_id)
+            if node is not None and node_id not in delta.removed_nodes:
+                new_graph.add_node(node)
+        for node_id in selected:
+            for edge in base_graph.get_edges_out(node_id):
+                if edge.dest in selected and edge not in delta.removed_edges:
+                    new_graph.add_edge(edge)
+        local_delta = GraphDelta()
+        for nodes, local_nodes in zip((delta.added_nodes, delta.removed_nodes, delta.changed_nodes),
+                                      (local_delta.added_nodes, local_delta.removed_nodes, local_delta.changed_nodes)):
+            local_nodes.update((node_id, node) for node_id, node in nodes.items() if node_id in selected)
+        local_delta.added_edges = {edge for edge in delta.added_edges if {edge.src, edge.dest} <= selected}
+        local_delta.removed_edges = {edge for edge in delta.removed_edges if {edge.src, edge.dest} <= selected}
+        for edge in local_delta.added_edges:
+            new_graph.add_edge(edge)
+
+        logger.info(f"Loaded {len(selected)} nodes around {len(changed)} changed nodes")
+        return GraphComparator.get_difference_from_delta(new_graph, local_delta)
+
+    @staticmethod
+    def _read_base(directory_path: str) -> dict:
+        base_file = os.path.join(directory_path, BASE_FILE_NAME)
+        try:
+            with open(base_file, "r", encoding="utf-8") as f:
+                base = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            text_error = f"Error reading base reference file {base_file}: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        # Fingerprints calculated with another hash format never match, the difference has to be saved again
+        if base.get("hash_format") != HASH_FORMAT_VERSION:
+            text_error = f"Difference {directory_path} was saved with another hash format " \
+                         f"({base.get('hash_format')}) than the current one ({HASH_FORMAT_VERSION}), save it again"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        # Relative paths are relative to the sparse difference directory, absolute ones are kept as they are
+        base["path"] = os.path.normpath(os.path.join(directory_path, base["path"]))
+        return base
+
+    @staticmethod
+    def _load_base(directory_path: str, base_path: str = "") -> Graph:
+        base = SparseDiff._read_base(directory_path)
+        base_graph = CSVGraphBuilder.build(base_path or base["path"])
+
+        if Hasher.fingerprint(base_graph) != base["fingerprint"]:
+            text_error = f"Base graph {base_path or base['path']} differs from the one the difference was saved for"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        return base_graph
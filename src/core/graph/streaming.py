@@ -0,0 +1,229 @@
+import csv
+import heapq
+import logging
+import os
+from operator import itemgetter
+from pathlib import Path
+import tempfile
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from core.graph.builder import EDGES_FILE_NAME, NODES_FILE_NAME
+from core.graph.difference import TypeDiff
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 100000
+
+NODE_FIELDS = ['id', 'name', 'type', 'hash', 'source']
+EDGE_FIELDS = ['src', 'dest', 'type', 'source']
+# Same columns as CSVGraphExporter.save_diff, moves are not detected here so moved_from stays empty
+DIFF_NODE_FIELDS = ['id', 'name', 'type', 'diff_status', 'source', 'moved_from']
+DIFF_EDGE_FIELDS = ['src', 'dest', 'type', 'diff_status', 'source']
+
+_node_key = itemgetter(0)
+_edge_key = itemgetter(0, 1, 2, 3)
+
+
+class StreamingComparator:
+
+    @staticmethod
+    def save_difference(old_path: str,
+                        new_path: str,
+                        directory_path: str,
+                        buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        f"""
+        Compares two graphs stored as CSV files and writes the difference in the format of
+        CSVGraphExporter.save_diff, without loading the graphs into memory.
+
+        Nodes are merged by id and edges by (src, dest, type, source), so both streams are read
+        once and the difference is written as soon as each key is processed. Files written with
+        CSVGraphExporter.save(..., canonical=True) are merged directly, other files are sorted
+        externally first: chunks of buffer_size rows are sorted in memory, stored in temporary
+        files and merged. Statuses are the same as in GraphComparator.get_difference; unlike
+        CSVGraphBuilder, edges referencing missing nodes are not dropped, since node sets are not kept.
+
+        Args:
+            old_path: Path to the original graph directory ({NODES_FILE_NAME}, {EDGES_FILE_NAME})
+            new_path: Path to the updated graph directory
+            directory_path: Path to the directory where the difference will be saved
+            buffer_size: Maximum number of rows kept in memory while sorting
+        """
+        if buffer_size < 1:
+            text_error = f"Buffer size must be positive: {buffer_size}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        Path(directory_path).mkdir(parents=True, exist_ok=True)
+
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                node_count = StreamingComparator._save_nodes_difference(os.path.join(old_path, NODES_FILE_NAME),
+                                                                        os.path.join(new_path, NODES_FILE_NAME),
+                                                                        os.path.join(directory_path, NODES_FILE_NAME),
+                                                                        buffer_size, tmp_dir)
+                edge_count = StreamingComparator._save_edges_difference(os.path.join(old_path, EDGES_FILE_NAME),
+                                                                        os.path.join(new_path, EDGES_FILE_NAME),
+                                                                        os.path.join(directory_path, EDGES_FILE_NAME),
+                                                                        buffer_size, tmp_dir)
+        except FileNotFoundError as e:
+            text_error = f"File not found: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+        except csv.Error as e:
+            text_error = f"CSV error: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+        except (IOError, PermissionError) as e:
+            text_error = f"Error writing difference files: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        logger.info(f"Successfully saved {node_count} nodes and {edge_count} edges to {directory_path}")
+
+    @staticmethod
+    def _save_nodes_difference(old_file: str, new_file: str, output_file: str, buffer_size: int, tmp_dir: str) -> int:
+        old_rows = StreamingComparator._sorted_rows(old_file, NODE_FIELDS, _node_key, buffer_size, tmp_dir)
+        new_rows = StreamingComparator._sorted_rows(new_file, NODE_FIELDS, _node_key, buffer_size, tmp_dir)
+
+        count = 0
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(DIFF_NODE_FIELDS)
+
+            for old_row, new_row in StreamingComparator._merge_join(old_rows, new_rows, _node_key):
+                if new_row is None:
+                    node_id, name, node_type, _, source = old_row
+                    status = TypeDiff.DELETED
+                else:
+                    node_id, name, node_type, node_hash, source = new_row
+                    if old_row is None:
+                        status = TypeDiff.NEW
+                    else:
+                        status = TypeDiff.CHANGED if old_row[3] != node_hash else TypeDiff.UNCHACHGED
+                writer.writerow([node_id, name, node_type, status, source, ""])
+                count += 1
+
+        return count
+
+    @staticmethod
+    def _save_edges_difference(old_file: str, new_file: str, output_file: str, buffer_size: int, tmp_dir: str) -> int:
+        old_rows = StreamingComparator._sorted_rows(old_file, EDGE_FIELDS, _edge_key, buffer_size, tmp_dir)
+        new_rows = StreamingComparator._sorted_rows(new_file, EDGE_FIELDS, _edge_key, buffer_size, tmp_dir)
+
+        count = 0
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(DIFF_EDGE_FIELDS)
+
+            for old_row, new_row in StreamingComparator._merge_join(old_rows, new_rows, _edge_key):
+                if new_row is None:
+                    src, dest, edge_type, source = old_row
+                    status = TypeDiff.DELETED
+                else:
+                    src, dest, edge_type, source = new_row
+                    status = TypeDiff.NEW if old_row is None else TypeDiff.UNCHACHGED
+                # Graph.add_edge ignores loops, so they never take part in a difference
+                if src == dest:
+                    continue
+                writer.writerow([src, dest, edge_type, status, source])
+                count += 1
+
+        return count
+
+    @staticmethod
+    def _merge_join(old_rows: Iterator[tuple], new_rows: Iterator[tuple],
+                    key: Callable) -> Iterator[Tuple[Optional[tuple], Optional[tuple]]]:
+        """
+        Merges two streams sorted by key into pairs (old_row, new_row), one pair per key.
+        A row missing in one of the streams is None. Only the first row of repeated keys is used.
+        """
+        old_rows = StreamingComparator._unique(old_rows, key)
+        new_rows = StreamingComparator._unique(new_rows, key)
+        old_row = next(old_rows, None)
+        new_row = next(new_rows, None)
+
+        while old_row is not None or new_row is not None:
+            if new_row is None or (old_row is not None and key(old_row) < key(new_row)):
+                yield old_row, None
+                old_row = next(old_rows, None)
+            elif old_row is None or key(new_row) < key(old_row):
+                yield None, new_row
+                new_row = next(new_rows, None)
+            else:
+                yield old_row, new_row
+                old_row = next(old_rows, None)
+                new_row = next(new_rows, None)
+
+    @staticmethod
+    def _unique(rows: Iterator[tuple], key: Callable) -> Iterator[tuple]:
+        previous = None
+        for row in rows:
+            row_key = key(row)
+            if row_key == previous:
+                logger.info(f"Element {row_key} already exists - skipping")
+                continue
+            previous = row_key
+            yield row
+
+    @staticmethod
+    def _sorted_rows(file_path: str, fields: List[str], key: Callable, buffer_size: int,
+                     tmp_dir: str) -> Iterator[tuple]:
+        """
+        Returns rows of the CSV file sorted by key. A sorted file is streamed as is, otherwise it is
+        sorted externally with at most buffer_size rows in memory. The sort is stable, so the first
+        of the rows with equal keys stays first.
+        """
+        if StreamingComparator._is_sorted(file_path, fields, key):
+            return StreamingComparator._read_rows(file_path, fields)
+
+        logger.info(f"{file_path} is not sorted, sorting externally")
+        runs: List[str] = []
+        chunk: List[tuple] = []
+        for row in StreamingComparator._read_rows(file_path, fields):
+            chunk.append(row)
+            if len(chunk) >= buffer_size:
+                runs.append(StreamingComparator._save_run(chunk, key, tmp_dir))
+                chunk = []
+
+        if not runs:
+            chunk.sort(key=key)
+            return iter(chunk)
+        if chunk:
+            runs.append(StreamingComparator._save_run(chunk, key, tmp_dir))
+
+        logger.info(f"Merging {len(runs)} sorted runs of {file_path}")
+        return heapq.merge(*(StreamingComparator._read_run(run) for run in runs), key=key)
+
+    @staticmethod
+    def _is_sorted(file_path: str, fields: List[str], key: Callable) -> bool:
+        previous = None
+        for row in StreamingComparator._read_rows(file_path, fields):
+            row_key = key(row)
+            if previous is not None and row_key < previous:
+                return False
+            previous = row_key
+        return True
+
+    @staticmethod
+    def _read_rows(file_path: str, fields: List[str]) -> Iterator[tuple]:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row_num, row in enumerate(reader, 1):
+                try:
+                    yield tuple(row[field].strip() for field in fields)
+                except (KeyError, AttributeError) as e:
+                    logger.error(f"Line {row_num}: Row parsing error - {str(e)}")
+
+    @staticmethod
+    def _save_run(chunk: List[tuple], key: Callable, tmp_dir: str) -> str:
+        chunk.sort(key=key)
+        fd, run_path = tempfile.mkstemp(suffix=".csv", dir=tmp_dir)
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(chunk)
+        return run_path
+
+    @staticmethod
+    def _read_run(run_path: str) -> Iterator[tuple]:
+        with open(run_path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                yield tuple(row)
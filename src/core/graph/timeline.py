@@ -0,0 +1,223 @@
+import csv
+from dataclasses import dataclass, field
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.graph.difference import TypeDiff
+from core.models.edge import Edge
+from core.models.graph import Graph
+from core.models.node import Node
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_NODES_FILE_NAME = "timeline_nodes.csv"
+TIMELINE_EDGES_FILE_NAME = "timeline_edges.csv"
+SUMMARY_FILE_NAME = "summary.csv"
+
+NODE_ELEMENT = "node"
+EDGE_ELEMENT = "edge"
+SUMMARY_STATUSES = [TypeDiff.NEW, TypeDiff.DELETED, TypeDiff.CHANGED, TypeDiff.UNCHACHGED]
+
+
+@dataclass
+class PairSummary:
+    first: str
+    second: str
+    element: str
+    counts: Dict[str, int] = field(default_factory=lambda: {status: 0 for status in SUMMARY_STATUSES})
+
+
+class VersionComparator:
+    __slots__ = ('labels', 'node_hashes', 'nodes', 'edge_presence')
+
+    def __init__(self):
+        self.labels: List[str] = []
+        # Hash of each node in every version it is present in, None for the versions it is absent from
+        self.node_hashes: Dict[str, List[Optional[str]]] = {}
+        # The latest seen state of each node, used for its name and type
+        self.nodes: Dict[str, Node] = {}
+        # Bit i is set if the edge is present in version i
+        self.edge_presence: Dict[Edge, int] = {}
+
+    def add_version(self, label: str, graph: Graph) -> None:
+        """
+        Indexes the next version. Only the hashes of nodes and the presence of edges are kept,
+        so the graph itself can be released afterwards.
+
+        Args:
+            label: Name of the version used in the output
+            graph: Graph of the version
+        """
+        index = len(self.labels)
+        self.labels.append(label)
+        bit = 1 << index
+
+        for node_id, node in graph.nodes.items():
+            hashes = self.node_hashes.get(node_id)
+            if hashes is None:
+                hashes = []
+                self.node_hashes[node_id] = hashes
+            if len(hashes) < index:
+                hashes.extend([None] * (index - len(hashes)))
+            hashes.append(node.hash)
+            self.nodes[node_id] = node
+
+        for edges in graph.edges.values():
+            for edge in edges:
+                self.edge_presence[edge] = self.edge_presence.get(edge, 0) | bit
+
+        logger.info(f"Indexed version {label}: {len(graph.nodes)} nodes")
+
+    def node_statuses(self, node_id: str) -> List[Optional[str]]:
+        """
+        Returns the status of the node in each version relative to the previous one
+        (None where the node is absent in both). The status in the first version is relative to an empty graph.
+        """
+        hashes = self._hashes(node_id)
+        return [VersionComparator._node_status(hashes[i - 1] if i else None, hashes[i]) for i in range(len(hashes))]
+
+    def edge_statuses(self, edge: Edge) -> List[Optional[str]]:
+        """Returns the status of the edge in each version relative to the previous one."""
+        presence = self.edge_presence[edge]
+        return [
+            VersionComparator._edge_status(i > 0 and bool(presence >> (i - 1) & 1), bool(presence >> i & 1))
+            for i in range(len(self.labels))
+        ]
+
+    def history(self, statuses: List[Optional[str]]) -> Tuple[str, str, str]:
+        """
+        Summarizes the statuses of an element over all versions.
+
+        Returns:
+            Tuple[str, str, str]: Labels of the version it first appeared in, the version it was last changed in
+                and the version it was removed in (if it is absent in the last version), empty when not applicable
+        """
+        first_seen = last_changed = removed_in = ""
+        for label, status in zip(self.labels, statuses):
+            if status == TypeDiff.NEW and not first_seen:
+                first_seen = label
+            elif status == TypeDiff.CHANGED:
+                last_changed = label
+            if status == TypeDiff.DELETED:
+                removed_in = label
+            elif status is not None:
+                removed_in = ""
+        return first_seen, last_changed, removed_in
+
+    def summary(self, reference: int = 0, all_pairs: bool = False) -> List[PairSummary]:
+        """
+        Counts new, deleted, changed and unchanged elements for pairs of versions.
+
+        By default every version is compared with the reference one, so the cost is linear in the total
+        number of elements. With all_pairs every pair of versions is compared, which is quadratic in the
+        number of versions.
+
+        Args:
+            reference: Index of the reference version
+            all_pairs: Compare every pair of versions instead of the reference with the others
+
+        Returns:
+            List[PairSummary]: Counts for nodes and edges of every compared pair
+        """
+        if all_pairs:
+            pairs = [(i, j) for i in range(len(self.labels)) for j in range(i + 1, len(self.labels))]
+        else:
+            pairs = [(reference, i) for i in range(len(self.labels)) if i != reference]
+
+        node_summaries = [PairSummary(self.labels[i], self.labels[j], NODE_ELEMENT) for i, j in pairs]
+        edge_summaries = [PairSummary(self.labels[i], self.labels[j], EDGE_ELEMENT) for i, j in pairs]
+
+        for node_id in self.node_hashes:
+            hashes = self._hashes(node_id)
+            for (i, j), pair_summary in zip(pairs, node_summaries):
+                status = VersionComparator._node_status(hashes[i], hashes[j])
+                if status is not None:
+                    pair_summary.counts[status] += 1
+
+        for presence in self.edge_presence.values():
+            for (i, j), pair_summary in zip(pairs, edge_summaries):
+                status = VersionComparator._edge_status(bool(presence >> i & 1), bool(presence >> j & 1))
+                if status is not None:
+                    pair_summary.counts[status] += 1
+
+        return node_summaries + edge_summaries
+
+    def save(self, directory_path: str, reference: int = 0, all_pairs: bool = False) -> List[PairSummary]:
+        f"""
+        Saves the timeline of every element and the pairwise summary to CSV files in the specified directory:
+        - {TIMELINE_NODES_FILE_NAME}: [id, name, type, first_seen, last_changed, removed_in, <status in each version>]
+        - {TIMELINE_EDGES_FILE_NAME}: [src, dest, type, source, first_seen, removed_in, <status in each version>]
+        - {SUMMARY_FILE_NAME}: [first, second, element, new, deleted, changed, unchanged]
+
+        Args:
+            directory_path: Path to the output directory
+            reference: Index of the reference version for the summary
+            all_pairs: Summarize every pair of versions
+
+        Returns:
+            List[PairSummary]: The saved summary
+        """
+        Path(directory_path).mkdir(parents=True, exist_ok=True)
+        summaries = self.summary(reference, all_pairs)
+
+        try:
+            self._write(os.path.join(directory_path, TIMELINE_NODES_FILE_NAME),
+                        ['id', 'name', 'type', 'first_seen', 'last_changed', 'removed_in'] + self.labels,
+                        self._node_rows())
+            self._write(os.path.join(directory_path, TIMELINE_EDGES_FILE_NAME),
+                        ['src', 'dest', 'type', 'source', 'first_seen', 'removed_in'] + self.labels, self._edge_rows())
+            self._write(os.path.join(directory_path, SUMMARY_FILE_NAME),
+                        ['first', 'second', 'element'] + SUMMARY_STATUSES, self._summary_rows(summaries))
+        except (IOError, PermissionError) as e:
+            text_error = f"Error writing timeline files: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        logger.info(f"Saved timeline of {len(self.node_hashes)} nodes and {len(self.edge_presence)} edges "
+                    f"over {len(self.labels)} versions to {directory_path}")
+        return summaries
+
+    def _node_rows(self) -> Iterator[list]:
+        for node_id, node in self.nodes.items():
+            statuses = self.node_statuses(node_id)
+            yield [node_id, node.name, node.type, *self.history(statuses)] + [status or "" for status in statuses]
+
+    def _edge_rows(self) -> Iterator[list]:
+        for edge in self.edge_presence:
+            statuses = self.edge_statuses(edge)
+            first_seen, _, removed_in = self.history(statuses)
+            statuses_row = [status or "" for status in statuses]
+            yield [edge.src, edge.dest, edge.type, edge.source, first_seen, removed_in] + statuses_row
+
+    @staticmethod
+    def _summary_rows(summaries: List[PairSummary]) -> Iterator[list]:
+        for summary in summaries:
+            counts = [summary.counts[status] for status in SUMMARY_STATUSES]
+            yield [summary.first, summary.second, summary.element] + counts
+
+    def _hashes(self, node_id: str) -> List[Optional[str]]:
+        hashes = self.node_hashes[node_id]
+        return hashes + [None] * (len(self.labels) - len(hashes))
+
+    @staticmethod
+    def _write(file_path: str, header: List[str], rows) -> None:
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    @staticmethod
+    def _node_status(old_hash: Optional[str], new_hash: Optional[str]) -> Optional[str]:
+        if old_hash is None:
+            return None if new_hash is None else TypeDiff.NEW
+        if new_hash is None:
+            return TypeDiff.DELETED
+        return TypeDiff.CHANGED if old_hash != new_hash else TypeDiff.UNCHACHGED
+
+    @staticmethod
+    def _edge_status(old_present: bool, new_present: bool) -> Optional[str]:
+        if not old_present:
+            return TypeDiff.NEW if new_present else None
+        return TypeDiff.UNCHACHGED if new_present else TypeDiff.DELETED
@@ -0,0 +1,114 @@
+from collections import deque
+import logging
+from typing import Dict, Iterable, List, Set
+
+from core.graph.impact import ImpactAnalyzer
+from core.models.edge import TypeEdge
+from core.models.graph import Graph
+from core.models.node import CODE_NODE_TYPES, TypeNode
+from core.models.unused import UnusedFile
+from utils.glob import GlobTrie
+
+logger = logging.getLogger(__name__)
+
+# Test modules, package exports and CLI mains
+DEFAULT_ENTRY_PATTERNS = [
+    "**/tests/**",
+    "**/test_*.py",
+    "**/*_test.py",
+    "**/conftest.py",
+    "**/__init__.py",
+    "**/__main__.py",
+    "**#main",
+]
+DEFAULT_UNUSED_EDGE_TYPES = [TypeEdge.USE]
+
+
+class UnusedCodeFinder:
+
+    @staticmethod
+    def entries(graph: Graph, patterns: Iterable[str] = DEFAULT_ENTRY_PATTERNS) -> Set[str]:
+        """
+        Finds the entry points: code nodes matching any of the globs, and the code of matching files
+        and directories.
+
+        Args:
+            graph (Graph): The graph to analyze
+            patterns (Iterable[str]): Globs over element ids ('**' crosses directories, '*' and '?' do not)
+
+        Returns:
+            Set[str]: IDs of the entry code nodes
+        """
+        trie: GlobTrie[bool] = GlobTrie()
+        for pattern in patterns:
+            trie.add(pattern, True)
+        matched = [node_id for node_id in graph.nodes if trie.match(node_id)]
+        expanded = ImpactAnalyzer.expand(graph, matched)
+        return {node_id for node_id in expanded if graph.nodes[node_id].type in CODE_NODE_TYPES}
+
+    @staticmethod
+    def find(graph: Graph, entries: Iterable[str], edge_types: Iterable[str] = DEFAULT_UNUSED_EDGE_TYPES) -> Set[str]:
+        """
+        Finds code nodes (classes, functions, module bodies) not reachable from the entry points.
+
+        A single breadth-first search is started from all entry points at once, the unused nodes are
+        the code nodes it has not visited. Using anything defined in a module imports it, so reaching
+        an element of a file reaches the body of the file as well.
+
+        Args:
+            graph (Graph): The graph to analyze
+            entries (Iterable[str]): IDs of the entry code nodes
+            edge_types (Iterable[str]): Edge types that are followed
+
+        Returns:
+            Set[str]: IDs of the unused code nodes
+        """
+        edge_types = set(edge_types)
+        bodies = UnusedCodeFinder._file_bodies(graph)
+
+        reached = {node_id for node_id in entries if node_id in graph.nodes}
+        queue = deque(reached)
+        while queue:
+            current_id = queue.popleft()
+            neighbours = [edge.dest for edge in graph.get_edges_out(current_id) if edge.type in edge_types]
+            for neighbour_id in neighbours + bodies.get(current_id, []):
+                if neighbour_id not in reached and neighbour_id in graph.nodes:
+                    reached.add(neighbour_id)
+                    queue.append(neighbour_id)
+
+        code = {node_id for node_id, node in graph.nodes.items() if node.type in CODE_NODE_TYPES}
+        unused = code - reached
+        logger.info(f"{len(unused)} of {len(code)} code elements are unreachable from {len(entries)} entry points")
+        return unused
+
+    @staticmethod
+    def group_by_file(graph: Graph, unused: Iterable[str]) -> List[UnusedFile]:
+        """
+        Groups unused nodes by the files containing them.
+
+        Returns:
+            List[UnusedFile]: Files with unused code, those with the most unused elements first
+        """
+        files: Dict[str, UnusedFile] = {}
+        for file_id, node_ids in ImpactAnalyzer.group_by_file(graph, unused).items():
+            total = sum(1 for edge in graph.get_edges_out(file_id) if edge.type == TypeEdge.CONTAIN
+                        and edge.dest in graph.nodes and graph.nodes[edge.dest].type in CODE_NODE_TYPES)
+            files[file_id] = UnusedFile(file_id, node_ids, total)
+        return sorted(files.values(), key=lambda file: (-len(file.unused), file.id))
+
+    @staticmethod
+    def _file_bodies(graph: Graph) -> Dict[str, List[str]]:
+        # Bodies of the file of every code node
+        result: Dict[str, List[str]] = {}
+        for file_id, node in graph.nodes.items():
+            if node.type != TypeNode.FILE:
+                continue
+            children = [
+                edge.dest for edge in graph.get_edges_out(file_id) if edge.type == TypeEdge.CONTAIN
+                and edge.dest in graph.nodes and graph.nodes[edge.dest].type in CODE_NODE_TYPES
+            ]
+            bodies = [child_id for child_id in children if graph.nodes[child_id].type == TypeNode.BODY]
+            if bodies:
+                for child_id in children:
+                    result[child_id] = bodies
+        return result
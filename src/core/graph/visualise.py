@@ -75,6 +75,7 @@ class HtmlGraphVisualizer(IGraphVisualizer):
         - Deleted: Pink
         - Changed: Yellow
         - Unchanged: Grey
+        - Moved: Purple
         - Unknown: Blue
 
         Args:
@@ -90,6 +91,7 @@ class HtmlGraphVisualizer(IGraphVisualizer):
             TypeDiff.DELETED: PINK,
             TypeDiff.CHANGED: YELLOW,
             TypeDiff.UNCHACHGED: GREY,
+            TypeDiff.MOVED: PURPLE,
             UNKNOWN: BLUE
         }
         for node in dif_graph.get_all_nodes():
@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+
+@dataclass
+class Cycle:
+    # Elements of the strongly connected component
+    nodes: List[str]
+    # Shortest cycle through the most connected element, the first element is repeated at the end
+    path: List[str] = field(default_factory=list)
+    # Edges (src, dest) whose removal breaks all cycles of the component
+    cut: List[Tuple[str, str]] = field(default_factory=list)
@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+from typing import Dict, Set
+
+from core.models.edge import Edge
+from core.models.node import Node
+
+
+@dataclass
+class GraphDelta:
+    added_nodes: Dict[str, Node] = field(default_factory=dict)
+    removed_nodes: Dict[str, Node] = field(default_factory=dict)
+    changed_nodes: Dict[str, Node] = field(default_factory=dict)
+    added_edges: Set[Edge] = field(default_factory=set)
+    removed_edges: Set[Edge] = field(default_factory=set)
+
+    def is_empty(self) -> bool:
+        return not (self.added_nodes or self.removed_nodes or self.changed_nodes or self.added_edges
+                    or self.removed_edges)
+
+    def size(self) -> int:
+        return (len(self.added_nodes) + len(self.removed_nodes) + len(self.changed_nodes) + len(self.added_edges) +
+                len(self.removed_edges))
@@ -1,20 +1,24 @@
 import logging
+from bisect import bisect_left
 from collections import defaultdict
-from typing import Dict, Optional, Set, List
+from typing import Dict, Iterable, Optional, Set, List
 
 from core.models.edge import Edge
 from core.models.node import Node
+from utils.glob import compile_glob, literal_prefix
 
 logger = logging.getLogger(__name__)
 
 
 class Graph:
-    __slots__ = ('nodes', 'edges', 'inv_edges')
+    __slots__ = ('nodes', 'edges', 'inv_edges', '_id_index', '__weakref__')
 
     def __init__(self):
         self.nodes: Dict[str, Node] = {}
         self.edges: Dict[str, Set[Edge]] = defaultdict(set)
         self.inv_edges: Dict[str, Set[Edge]] = defaultdict(set)
+        # Sorted node IDs, built on the first lookup by prefix and dropped when nodes are added or removed
+        self._id_index: Optional[List[str]] = None
 
     def add_node(self, node: Node) -> bool:
         if node is None:
@@ -24,6 +28,7 @@ class Graph:
             return False
 
         self.nodes[node.id] = node
+        self._id_index = None
         return True
 
     def get_node(self, node_id: str) -> Optional[Node]:
@@ -43,6 +48,7 @@ class Graph:
             self.remove_edge(edge)
 
         del self.nodes[node_id]
+        self._id_index = None
         return True
 
     def add_edge(self, edge: Edge, with_check: bool = True) -> bool:
@@ -80,3 +86,45 @@ class Graph:
 
     def get_all_edges(self):
         return [edge for edges in self.edges.values() for edge in edges]
+
+    def find_by_prefix(self, prefix: str) -> List[str]:
+        """
+        Returns the sorted IDs of nodes starting with the prefix, e.g. everything under 'core/graph/'.
+
+        IDs are found by binary search in the sorted index of IDs, in O(log n + k) for k results.
+        """
+        ids = self._sorted_ids()
+        result = []
+        for position in range(bisect_left(ids, prefix), len(ids)):
+            if not ids[position].startswith(prefix):
+                break
+            result.append(ids[position])
+        return result
+
+    def find_by_glob(self, pattern: str) -> List[str]:
+        """
+        Returns the sorted IDs of nodes matching a glob ('**' crosses directories, '*' and '?' do not).
+
+        Only the IDs starting with the part of the glob before its first wildcard are tested.
+        """
+        regex = compile_glob(pattern)
+        return [node_id for node_id in self.find_by_prefix(literal_prefix(pattern)) if regex.fullmatch(node_id)]
+
+    def resolve_ids(self, patterns: Iterable[str]) -> List[str]:
+        """Replaces globs among node IDs with the IDs of the matching nodes, other IDs are kept as they are."""
+        result = []
+        for pattern in patterns:
+            if pattern in self.nodes or pattern == literal_prefix(pattern):
+                result.append(pattern)
+                continue
+            matched = self.find_by_glob(pattern)
+            if not matched:
+                logger.warning(f"No nodes match {pattern}")
+            result.extend(matched)
+        return result
+
+    def _sorted_ids(self) -> List[str]:
+        # Nodes may also be put into the dictionary directly, a changed count shows the index is stale
+        if self._id_index is None or len(self._id_index) != len(self.nodes):
+            self._id_index = sorted(self.nodes)
+        return self._id_index
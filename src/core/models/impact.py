@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+
+@dataclass
+class ImpactResult:
+    changed: Set[str] = field(default_factory=set)
+    # Next node on the shortest path from an impacted node to a changed one, None for the changed nodes
+    parents: Dict[str, Optional[str]] = field(default_factory=dict)
+    distances: Dict[str, int] = field(default_factory=dict)
+
+    def impacted(self) -> Set[str]:
+        return set(self.parents)
+
+    def path(self, node_id: str) -> List[str]:
+        """Returns the shortest path from the impacted node to the changed node it depends on."""
+        path = []
+        current = node_id
+        while current is not None:
+            path.append(current)
+            current = self.parents.get(current)
+        return path
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class CouplingMetrics:
+    # Dependency edges entering the element (or its contents) from outside
+    fan_in: int = 0
+    # Dependency edges leaving the element (or its contents) to the outside
+    fan_out: int = 0
+    # Distinct outside elements depending on the element (Ca)
+    afferent: int = 0
+    # Distinct outside elements the element depends on (Ce)
+    efferent: int = 0
+
+    @property
+    def instability(self) -> float:
+        """Ce / (Ca + Ce): 0 for an element only used by others, 1 for one only using others."""
+        total = self.afferent + self.efferent
+        return round(self.efferent / total, 3) if total else 0.0
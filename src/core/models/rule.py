@@ -0,0 +1,37 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from core.models.edge import TypeEdge
+
+
+class RuleAction:
+    ALLOW = "allow"
+    DENY = "deny"
+
+
+RULE_ACTIONS = [RuleAction.ALLOW, RuleAction.DENY]
+
+
+@dataclass
+class Rule:
+    # 'allow' or 'deny'
+    action: str
+    # Glob over ids of dependent elements, or '@<id>' for everything an additional element contains
+    source: str
+    # Glob over ids of used elements, or '@<id>'
+    target: str
+    edge_types: List[str] = field(default_factory=lambda: [TypeEdge.USE])
+    # Line of the rules file, 0 for rules created in code
+    line: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.action} {self.source} -> {self.target} {','.join(self.edge_types)}"
+
+
+@dataclass
+class Violation:
+    src: str
+    dest: str
+    type: str
+    # The deny rule the edge matched first
+    rule: Rule
@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class UnusedFile:
+    id: str
+    # Code elements of the file not reachable from the entry points
+    unused: List[str] = field(default_factory=list)
+    # Number of all code elements of the file
+    total: int = 0
+
+    @property
+    def dead(self) -> bool:
+        """True if no code element of the file is reachable, so the whole file can go."""
+        return len(self.unused) == self.total
@@ -0,0 +1,155 @@
+from argparse import Namespace
+import hashlib
+import json
+import logging
+from pathlib import Path
+import shutil
+from typing import Dict, List, Optional
+
+from core.graph.builder import NODES_FILE_NAME, EDGES_FILE_NAME
+from core.graph.hasher import HASH_FORMAT_VERSION
+from interfaces.cli.common import CSV_FORMAT
+from utils.hash import stable_files_hash
+
+logger = logging.getLogger(__name__)
+
+# Arguments of each cacheable command that point to input graph directories
+CACHED_COMMANDS: Dict[str, List[str]] = {
+    "union": ["source", "additional"],
+    "diff": ["first_path", "second_path"],
+    "contract": ["source"],
+    "filter": ["source"],
+    "get_used": ["source"],
+    "get_dependent": ["source"],
+}
+
+# Flags making a command uncacheable: its output refers to the output directory itself,
+# e.g. a sparse difference keeps the path of its base graph relative to the output
+UNCACHED_FLAGS: Dict[str, List[str]] = {
+    "diff": ["sparse"],
+}
+
+# Arguments that never influence the command result
+IGNORED_ARGS = ["command", "output", "cache_dir", "socket", "no_server"]
+
+GRAPH_FILES = [NODES_FILE_NAME, EDGES_FILE_NAME]
+
+
+class ResultCache:
+    __slots__ = ('cache_dir', )
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+
+    def key(self, args: Namespace) -> Optional[str]:
+        """
+        Builds a content-addressed key for a CLI command.
+
+        The key is a digest of the command name, the contents of its input graph files
+        and its remaining arguments normalized to a canonical form (lists are sorted and deduplicated,
+        so argument order does not produce distinct entries). It also covers the hash format version,
+        so results stored with hashes calculated another way are never restored.
+
+        Args:
+            args: Parsed command line arguments
+
+        Returns:
+            Optional[str]: Cache key or None if the command is not cacheable or its inputs are missing
+        """
+        if args.command not in CACHED_COMMANDS:
+            return None
+        if any(getattr(args, flag, False) for flag in UNCACHED_FLAGS.get(args.command, [])):
+            return None
+
+        # Only directory outputs can be stored and restored
+        if getattr(args, "format", CSV_FORMAT) != CSV_FORMAT:
+            return None
+
+        input_args = CACHED_COMMANDS[args.command]
+        hasher = hashlib.sha256()
+        hasher.update(f"{args.command}\0{HASH_FORMAT_VERSION}".encode('utf-8'))
+
+        for arg_name in input_args:
+            file_paths = [Path(getattr(args, arg_name)) / name for name in GRAPH_FILES]
+            if not all(file_path.is_file() for file_path in file_paths):
+                return None
+            hasher.update(stable_files_hash(file_paths).encode('utf-8'))
+
+        params = {}
+        for name, value in sorted(vars(args).items()):
+            if name in IGNORED_ARGS or name in input_args:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                value = sorted(set(value))
+            params[name] = value
+        hasher.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+
+        return hasher.hexdigest()
+
+    def restore(self, key: str, output_path: str | Path) -> bool:
+        """
+        Reproduces a stored result in the output directory.
+
+        Files are copied rather than hard-linked: exporters rewrite their files in place,
+        so a shared inode would let a later run corrupt the cache entry.
+
+        Returns:
+            bool: True if the key was found and the output was restored
+        """
+        entry_path = self.cache_dir / key
+        if not entry_path.is_dir():
+            return False
+
+        output_path = Path(output_path)
+        output_path.mkdir(parents=True, exist_ok=True)
+        for entry in entry_path.iterdir():
+            target = output_path / entry.name
+            shutil.copyfile(entry, target)
+
+        logger.info(f"Restored cached result {key} to {output_path}")
+        return True
+
+    @staticmethod
+    def output_state(output_path: str | Path) -> Dict[str, int]:
+        """Returns modification times of the files in the output directory by their names."""
+        output_path = Path(output_path)
+        if not output_path.is_dir():
+            return {}
+        return {entry.name: entry.stat().st_mtime_ns for entry in output_path.iterdir() if entry.is_file()}
+
+    def store(self, key: str, output_path: str | Path, previous_state: Optional[Dict[str, int]] = None) -> bool:
+        """
+        Saves the files a command produced in its output directory under the given key.
+
+        Args:
+            key: Cache key of the command
+            output_path: Directory with the command result
+            previous_state: Output state taken before the command was run; files left untouched
+                since then are leftovers of a previous run or of other tools and are not cached
+
+        Returns:
+            bool: True if the result was stored
+        """
+        output_path = Path(output_path)
+        current_state = ResultCache.output_state(output_path)
+        previous_state = previous_state or {}
+        produced = [name for name, mtime in current_state.items() if mtime != previous_state.get(name)]
+        if any(name not in produced for name in GRAPH_FILES):
+            logger.warning(f"Output {output_path} was not produced, result is not cached")
+            return False
+
+        entry_path = self.cache_dir / key
+        tmp_path = self.cache_dir / f"{key}.tmp"
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+        tmp_path.mkdir(parents=True)
+
+        for name in produced:
+            shutil.copy2(output_path / name, tmp_path / name)
+
+        if entry_path.exists():
+            shutil.rmtree(entry_path)
+        tmp_path.rename(entry_path)
+
+        logger.info(f"Stored result {key} from {output_path}")
+        return True
@@ -1,9 +1,101 @@
 import argparse
-from interfaces.cli.handlers import handle_diff, handle_extract, handle_union, handle_visualise, handle_contract, handle_filter, handle_get_used, handle_get_dependent, handle_init_additional
+import sys
+
+from core.graph.affected_tests import DEFAULT_TEST_PATTERNS, DEFAULT_TRAVERSED_EDGE_TYPES
+from core.graph.centrality import (CENTRALITY_METRICS, DEFAULT_BETWEENNESS_SAMPLES, DEFAULT_CENTRALITY_EDGE_TYPES,
+                                   DEFAULT_DAMPING, DEFAULT_MAX_ITERATIONS, DEFAULT_TOLERANCE, CentralityMetric)
+from core.graph.cycles import CYCLE_LEVELS, DEFAULT_CYCLE_EDGE_TYPES, CycleLevel
+from core.graph.impact import DEFAULT_STOP_EDGE_TYPES
+from core.graph.query import DIRECTIONS, Direction
+from core.graph.query_cache import DEFAULT_MAX_AGE
+from core.graph.reachability import DEFAULT_REACHABILITY_EDGE_TYPES
+from core.graph.repository import DEFAULT_KEYFRAME_INTERVAL
+from core.graph.sparse import DEFAULT_CONTEXT_DEPTH
+from core.graph.streaming import DEFAULT_BUFFER_SIZE
+from core.graph.unused import DEFAULT_ENTRY_PATTERNS, DEFAULT_UNUSED_EDGE_TYPES
+from core.models.edge import TypeEdge
+from core.models.node import CODE_NODE_TYPES
+from interfaces.cli.cache import ResultCache
+from interfaces.cli.common import CSV_FORMAT, GRAPH_FORMATS, REPORT_FORMATS, add_query_arguments
+from interfaces.cli.remote import forward
+from interfaces.server.client import DEFAULT_SOCKET_PATH, DEFAULT_WORKERS, ServerClient
+
+FORMAT_HELP = ("Output format: 'csv' for a directory with nodes.csv and edges.csv, "
+               "'jsonl' for a JSON Lines file ('-' for stdout)")
+SORTED_HELP = "Write CSV nodes and edges sorted by their keys, so that 'diff --streaming' merges them without sorting"
+
+
+def _dispatch(args):
+    # Handlers import the whole analysis code, so they are loaded only when the command runs in this process
+    from interfaces.cli.handlers import (handle_diff, handle_extract, handle_union, handle_visualise, handle_contract,
+                                         handle_filter, handle_get_used, handle_get_dependent, handle_init_additional,
+                                         handle_repo, handle_patch, handle_diff_many, handle_impact,
+                                         handle_select_tests, handle_query, handle_reach, handle_cycles, handle_path,
+                                         handle_closure, handle_metrics, handle_rank, handle_check, handle_unused,
+                                         handle_serve)
+
+    if args.command == "extract":
+        handle_extract(args)
+    if args.command == "init_additional":
+        handle_init_additional(args)
+    if args.command == "visualize":
+        handle_visualise(args)
+    if args.command == "union":
+        handle_union(args)
+    if args.command == "diff":
+        handle_diff(args)
+    if args.command == "diff-many":
+        handle_diff_many(args)
+    if args.command == "patch":
+        handle_patch(args)
+    if args.command == "contract":
+        handle_contract(args)
+    if args.command == "filter":
+        handle_filter(args)
+    if args.command == "get_used":
+        handle_get_used(args)
+    if args.command == "get_dependent":
+        handle_get_dependent(args)
+    if args.command == "query":
+        handle_query(args)
+    if args.command == "reach":
+        handle_reach(args)
+    if args.command == "cycles":
+        handle_cycles(args)
+    if args.command == "path":
+        handle_path(args)
+    if args.command == "closure":
+        handle_closure(args)
+    if args.command == "metrics":
+        handle_metrics(args)
+    if args.command == "rank":
+        handle_rank(args)
+    if args.command == "check":
+        handle_check(args)
+    if args.command == "unused":
+        handle_unused(args)
+    if args.command == "impact":
+        handle_impact(args)
+    if args.command == "select-tests":
+        handle_select_tests(args)
+    if args.command == "serve":
+        handle_serve(args)
+    if args.command == "repo":
+        handle_repo(args)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Pyflow - Python Dependency Analysis Tool")
+    parser.add_argument("--cache-dir",
+                        default="",
+                        help="Directory of the result cache: commands re-run on unchanged inputs "
+                        "restore their stored output instead of recomputing it (optional)")
+    parser.add_argument("--socket",
+                        default=DEFAULT_SOCKET_PATH,
+                        help="Unix socket of the query server started by 'serve' (PYFLOW_SOCKET by default)")
+    parser.add_argument("--no-server",
+                        action="store_true",
+                        help="Run the command in this process even if a query server is running")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Парсер для команды extract
@@ -14,6 +106,8 @@ def main():
                                 default="",
                                 help="Directory where the extracted dependency graph will be saved")
     extract_parser.add_argument("-l", "--link", default="", help="Git repository URL to clone and analyze (optional)")
+    extract_parser.add_argument("--format", choices=GRAPH_FORMATS, default=CSV_FORMAT, help=FORMAT_HELP)
+    extract_parser.add_argument("--sorted", action="store_true", help=SORTED_HELP)
 
     # Парсер для команды init_additional
     init_additional_parser = subparsers.add_parser(
@@ -29,6 +123,8 @@ def main():
         "additional",
         help="Path to directory containing files with additional nodes and edges, architectural elements and use cases")
     union_parser.add_argument("output", help="Directory where the resulting union graph will be saved")
+    union_parser.add_argument("--format", choices=GRAPH_FORMATS, default=CSV_FORMAT, help=FORMAT_HELP)
+    union_parser.add_argument("--sorted", action="store_true", help=SORTED_HELP)
 
     # Парсер для команды visualize
     visualise_parser = subparsers.add_parser("visualize", help="Generate a visual representation of a dependency graph")
@@ -39,18 +135,61 @@ def main():
         choices=["basic", "diff"],
         default="basic",
         help="Visualization mode: 'basic' for standard view, 'diff' for difference highlighting")
+    visualise_parser.add_argument("--context-depth",
+                                  type=int,
+                                  default=DEFAULT_CONTEXT_DEPTH,
+                                  help="Depth of unchanged context shown around the changes of a sparse difference")
 
     # Парсер для команды diff
     diff_parser = subparsers.add_parser("diff", help="Compare two dependency graphs and visualize their differences")
     diff_parser.add_argument("first_path", help="Path to the first dependency graph file for comparison")
     diff_parser.add_argument("second_path", help="Path to the second dependency graph file for comparison")
     diff_parser.add_argument("output", help="Directory where the difference graph will be saved")
+    diff_parser.add_argument("--format", choices=GRAPH_FORMATS, default=CSV_FORMAT, help=FORMAT_HELP)
+    diff_parser.add_argument("--hierarchical",
+                             action="store_true",
+                             help="Skip subtrees with equal hashes instead of comparing every element")
+    diff_parser.add_argument("--streaming",
+                             action="store_true",
+                             help="Merge CSV graph files without loading them into memory")
+    diff_parser.add_argument("--buffer-size",
+                             type=int,
+                             default=DEFAULT_BUFFER_SIZE,
+                             help="Maximum number of rows kept in memory by --streaming while sorting")
+    diff_parser.add_argument("--sparse",
+                             action="store_true",
+                             help="Save only new, deleted and changed elements with a reference to the first graph")
+    diff_parser.add_argument("--detect-moves",
+                             action="store_true",
+                             help="Mark deleted and new elements with equal hashes as moved")
+    diff_parser.add_argument("--match-names",
+                             action="store_true",
+                             help="With --detect-moves also pair unique deleted and new elements with equal names")
+
+    # Парсер для команды diff-many
+    diff_many_parser = subparsers.add_parser(
+        "diff-many", help="Compare many versions of a graph at once and build the timeline of their elements")
+    diff_many_parser.add_argument("output", help="Directory where the timeline and the summary will be saved")
+    diff_many_parser.add_argument("paths", nargs="+", help="Paths to the graphs of the versions, in order")
+    diff_many_parser.add_argument("--reference",
+                                  default="",
+                                  help="Path of the version the others are compared with (default: the first one)")
+    diff_many_parser.add_argument("--all-pairs", action="store_true", help="Summarize every pair of versions")
+
+    # Парсер для команды patch
+    patch_parser = subparsers.add_parser("patch", help="Apply a sparse difference to its base graph")
+    patch_parser.add_argument("difference", help="Path to the sparse difference directory")
+    patch_parser.add_argument("output", help="Directory where the patched graph will be saved")
+    patch_parser.add_argument("--base", default="", help="Path to the base graph, if it was moved (optional)")
 
     # Парсер для команды contract
     contract_parser = subparsers.add_parser("contract", help="Contract architectural elements in a graph")
     contract_parser.add_argument("source", help="Path to the graph directory")
     contract_parser.add_argument("output", help="Path to the graph directory where the contracted graph will be saved")
-    contract_parser.add_argument("elements", nargs="+", help="List of architectural elements to contract")
+    contract_parser.add_argument("elements",
+                                 nargs="+",
+                                 help="List of architectural elements to contract (or globs over their IDs)")
+    contract_parser.add_argument("--format", choices=GRAPH_FORMATS, default=CSV_FORMAT, help=FORMAT_HELP)
 
     # Парсер для команды filter
     filter_parser = subparsers.add_parser("filter", help="Filter graph based on node and edge types")
@@ -68,53 +207,296 @@ def main():
                                action="store_true",
                                help="Inverse filtering - keep nodes/edges that do NOT match the specified types")
     filter_parser.add_argument("--node-id-mask", help="Regular expression pattern to match node IDs")
+    filter_parser.add_argument("--where",
+                               default="",
+                               help="Expression over node fields (id, name, type, source, hash) with =, !=, "
+                               "~ (glob), in, and, or, not, e.g. \"type in (class, func) and not id ~ 'tests/**'\"")
+    filter_parser.add_argument("--edge-where",
+                               default="",
+                               help="Expression over edge fields (src, dest, type, source), e.g. \"type = use\"")
+    filter_parser.add_argument("--format", choices=GRAPH_FORMATS, default=CSV_FORMAT, help=FORMAT_HELP)
 
     # Парсер для команды get_used
     get_used_parser = subparsers.add_parser("get_used", help="Get elements that are used by specified elements")
     get_used_parser.add_argument("source", help="Path to the source graph file")
     get_used_parser.add_argument("output", help="Path where the result will be saved")
-    get_used_parser.add_argument("elements", nargs="+", help="List of elements to find usages for")
+    get_used_parser.add_argument(
+        "elements",
+        nargs="+",
+        help="List of elements to find usages for, globs like 'core/*/builder.py#*' are expanded")
     get_used_parser.add_argument("-d",
                                  "--depth",
                                  type=int,
                                  default=0,
                                  help="Maximum depth of dependency search (0 for unlimited)")
+    get_used_parser.add_argument("--format", choices=GRAPH_FORMATS, default=CSV_FORMAT, help=FORMAT_HELP)
 
     # Парсер для команды get_dependent
     get_dependent_parser = subparsers.add_parser("get_dependent", help="Get elements that depend on specified elements")
     get_dependent_parser.add_argument("source", help="Path to the source graph file")
     get_dependent_parser.add_argument("output", help="Path where the result will be saved")
-    get_dependent_parser.add_argument("elements", nargs="+", help="List of elements to find dependencies for")
+    get_dependent_parser.add_argument(
+        "elements",
+        nargs="+",
+        help="List of elements to find dependencies for, globs like 'core/*/builder.py#*' are expanded")
     get_dependent_parser.add_argument("-d",
                                       "--depth",
                                       type=int,
                                       default=0,
                                       help="Maximum depth of dependency search (0 for unlimited)")
+    get_dependent_parser.add_argument("--format", choices=GRAPH_FORMATS, default=CSV_FORMAT, help=FORMAT_HELP)
+
+    # Парсер для команды query
+    query_parser = subparsers.add_parser("query",
+                                         help="Get elements reachable from specified elements in one traversal")
+    query_parser.add_argument("source", help="Path to the source graph")
+    add_query_arguments(query_parser)
+    query_parser.add_argument("--batch",
+                              default="",
+                              help="File with one query per line in the form "
+                              "'output elements... [options]': the graph is loaded once for all of them")
+
+    # Парсер для команды reach
+    reach_parser = subparsers.add_parser("reach",
+                                         help="Answer reachability questions with an index stored next to the graph")
+    reach_parser.add_argument("source", help="Path to the source graph")
+    reach_parser.add_argument("src",
+                              nargs="?",
+                              default="",
+                              help="Element whose descendants (or ancestors) are printed if dest is not given")
+    reach_parser.add_argument("dest", nargs="?", default="", help="Element to check the path from src to")
+    reach_parser.add_argument("--ancestors", action="store_true", help="Print elements src is reachable from")
+    reach_parser.add_argument("--pairs", default="", help="File with 'src dest' pairs to check, one per line")
+    reach_parser.add_argument("--edge-types",
+                              nargs="+",
+                              default=DEFAULT_REACHABILITY_EDGE_TYPES,
+                              help="Edge types forming paths")
+    reach_parser.add_argument("--stats", action="store_true", help="Print the index size and build time")
+
+    # Парсер для команды cycles
+    cycles_parser = subparsers.add_parser("cycles",
+                                          help="List dependency cycles with a representative cycle and edges to cut")
+    cycles_parser.add_argument("source", help="Path to the source graph")
+    cycles_parser.add_argument("--level",
+                               choices=CYCLE_LEVELS,
+                               default=CycleLevel.ENTITY,
+                               help="'entity' for cycles between elements, 'file' for import cycles between files")
+    cycles_parser.add_argument("--edge-types",
+                               nargs="+",
+                               default=DEFAULT_CYCLE_EDGE_TYPES,
+                               help="Edge types forming dependencies")
+    cycles_parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+
+    # Парсер для команды path
+    path_parser = subparsers.add_parser("path",
+                                        help="Explain a dependency with the shortest paths between two elements")
+    path_parser.add_argument("source", help="Path to the source graph")
+    path_parser.add_argument("output", help="Directory (or JSONL file) where the graph of the paths will be saved")
+    path_parser.add_argument("src", help="Element the paths start from")
+    path_parser.add_argument("dest", help="Element the paths lead to")
+    path_parser.add_argument("-k", type=int, default=1, help="Number of shortest paths to find")
+    path_parser.add_argument("--edge-types", nargs="+", default=None, help="Edge types forming paths (all by default)")
+    path_parser.add_argument("--exclude", nargs="+", default=[], help="Elements the paths must not pass through")
+    path_parser.add_argument("--format", choices=GRAPH_FORMATS, default=CSV_FORMAT, help=FORMAT_HELP)
+
+    # Парсер для команды closure
+    closure_parser = subparsers.add_parser(
+        "closure", help="Count elements reachable from many elements at once, e.g. transitive fan-in of every file")
+    closure_parser.add_argument("source", help="Path to the source graph")
+    closure_parser.add_argument("elements",
+                                nargs="*",
+                                help="Elements or globs over their IDs to count for (all elements by default)")
+    closure_parser.add_argument("--direction",
+                                choices=DIRECTIONS,
+                                default=Direction.IN,
+                                help="'in' for elements depending on each one (fan-in), 'out' for its dependencies")
+    closure_parser.add_argument("--hops", type=int, default=0, help="Maximum number of hops (0 for no limit)")
+    closure_parser.add_argument("--edge-types",
+                                nargs="+",
+                                default=[TypeEdge.USE],
+                                help="Edge types forming dependencies")
+    closure_parser.add_argument("--files",
+                                action="store_true",
+                                help="Count files: dependencies of the elements of a file are dependencies of the file")
+    closure_parser.add_argument("--top", type=int, default=0, help="Print only N elements with the largest counts")
+    closure_parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+
+    # Парсер для команды metrics
+    metrics_parser = subparsers.add_parser(
+        "metrics", help="Compute fan-in, fan-out, coupling and instability of elements and their containers")
+    metrics_parser.add_argument("source", help="Path to the source graph")
+    metrics_parser.add_argument("output", nargs="?", default="", help="File to write the report to (stdout by default)")
+    metrics_parser.add_argument("--format", choices=REPORT_FORMATS, default=CSV_FORMAT, help="Report format")
+    metrics_parser.add_argument("--node-types", nargs="+", default=[], help="Report only elements of these types")
+    metrics_parser.add_argument("--edge-types",
+                                nargs="+",
+                                default=[TypeEdge.USE],
+                                help="Edge types forming dependencies")
+
+    # Парсер для команды rank
+    rank_parser = subparsers.add_parser("rank", help="Rank elements by centrality to find architectural hotspots")
+    rank_parser.add_argument("source", help="Path to the source graph")
+    rank_parser.add_argument("--metric",
+                             choices=CENTRALITY_METRICS,
+                             default=CentralityMetric.PAGERANK,
+                             help="'pagerank' for widely used elements, 'betweenness' for elements many "
+                             "dependency paths go through")
+    rank_parser.add_argument("-k", "--top", type=int, default=20, help="Number of elements to print")
+    rank_parser.add_argument("--node-types",
+                             nargs="+",
+                             default=CODE_NODE_TYPES,
+                             help="Types of the ranked elements (code elements by default)")
+    rank_parser.add_argument("--edge-types",
+                             nargs="+",
+                             default=DEFAULT_CENTRALITY_EDGE_TYPES,
+                             help="Edge types forming dependencies")
+    rank_parser.add_argument("--damping", type=float, default=DEFAULT_DAMPING, help="PageRank damping factor")
+    rank_parser.add_argument("--tolerance",
+                             type=float,
+                             default=DEFAULT_TOLERANCE,
+                             help="PageRank stops when the ranks change by less than this in total")
+    rank_parser.add_argument("--max-iterations",
+                             type=int,
+                             default=DEFAULT_MAX_ITERATIONS,
+                             help="Maximum number of PageRank iterations")
+    rank_parser.add_argument("--samples",
+                             type=int,
+                             default=DEFAULT_BETWEENNESS_SAMPLES,
+                             help="Number of sources sampled to estimate betweenness")
+    rank_parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+
+    # Парсер для команды check
+    check_parser = subparsers.add_parser(
+        "check", help="Check dependencies against architecture rules, exit with code 1 if any rule is violated")
+    check_parser.add_argument("source", help="Path to the graph directory")
+    check_parser.add_argument("rules",
+                              help="Rules file, one rule per line: '<allow|deny> <source> -> <target> [<edge types>]' "
+                              "with globs over element ids or '@<id>' for an architectural element; "
+                              "the first matching rule decides")
+    check_parser.add_argument("--json", action="store_true", help="Print violations as JSON")
+
+    # Парсер для команды serve
+    serve_parser = subparsers.add_parser(
+        "serve", help="Keep graphs in memory and answer queries of other pyflow calls over a Unix socket")
+    serve_parser.add_argument("graphs", nargs="*", help="Paths to the graphs to load at start")
+    serve_parser.add_argument("-w",
+                              "--workers",
+                              type=int,
+                              default=DEFAULT_WORKERS,
+                              help="Number of threads running queries")
+    serve_parser.add_argument("--max-age",
+                              type=float,
+                              default=DEFAULT_MAX_AGE,
+                              help="Seconds an unused query result is kept in the cache (results are also kept "
+                              "on disk if --cache-dir is given)")
+    serve_parser.add_argument("--stats",
+                              action="store_true",
+                              help="Print loaded graphs and query cache statistics of the running server")
+
+    # Парсер для команды impact
+    impact_parser = subparsers.add_parser("impact", help="Find elements transitively affected by changes")
+    impact_parser.add_argument("source", help="Path to the graph of the changed version")
+    impact_parser.add_argument("-b", "--base", default="", help="Path to the graph of the previous version")
+    impact_parser.add_argument("-c",
+                               "--changed",
+                               nargs="+",
+                               default=[],
+                               help="IDs of changed elements or globs over them "
+                               "(files and directories are expanded to their code)")
+    impact_parser.add_argument("--stop-edge-types",
+                               nargs="*",
+                               default=DEFAULT_STOP_EDGE_TYPES,
+                               help="Edge types that do not propagate changes")
+    impact_parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+
+    # Парсер для команды unused
+    unused_parser = subparsers.add_parser("unused", help="Find code not reachable from entry points, grouped by file")
+    unused_parser.add_argument("source", help="Path to the graph directory")
+    unused_parser.add_argument("-e",
+                               "--entry",
+                               nargs="+",
+                               default=DEFAULT_ENTRY_PATTERNS,
+                               help="Globs over element ids of entry points ('**' crosses directories, "
+                               "files and directories are expanded to their code); tests, package "
+                               "'__init__' modules and 'main' functions by default")
+    unused_parser.add_argument("--edge-types",
+                               nargs="*",
+                               default=DEFAULT_UNUSED_EDGE_TYPES,
+                               help="Edge types followed from the entry points")
+    unused_parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+
+    # Парсер для команды select-tests
+    select_tests_parser = subparsers.add_parser("select-tests",
+                                                help="Print test files affected by changes, ready to pass to pytest")
+    select_tests_parser.add_argument("source", help="Path to the graph of the project")
+    select_tests_parser.add_argument(
+        "-c",
+        "--changed",
+        nargs="+",
+        required=True,
+        help="Changed files, a git revision range like 'main..HEAD' or a single revision like "
+        "'HEAD~3' to compare the working tree with")
+    select_tests_parser.add_argument("--repo", default=".", help="Path to the git repository for a revision range")
+    select_tests_parser.add_argument("--root",
+                                     default="",
+                                     help="Path of the analyzed directory inside the repository: stripped from "
+                                     "changed files and prepended to the selected tests")
+    select_tests_parser.add_argument("--test-patterns",
+                                     nargs="+",
+                                     default=DEFAULT_TEST_PATTERNS,
+                                     help="Patterns of test files: with a slash matched against the path, "
+                                     "otherwise against the file name")
+    select_tests_parser.add_argument("--edge-types",
+                                     nargs="+",
+                                     default=DEFAULT_TRAVERSED_EDGE_TYPES,
+                                     help="Edge types through which changes reach their users")
+
+    # Парсер для команды repo
+    repo_parser = subparsers.add_parser("repo", help="Store graph versions as a base snapshot plus compact deltas")
+    repo_subparsers = repo_parser.add_subparsers(dest="repo_command", required=True)
+
+    repo_add_parser = repo_subparsers.add_parser("add", help="Add a graph as a new version of the repository")
+    repo_add_parser.add_argument("repository", help="Path to the graph repository (created if it doesn't exist)")
+    repo_add_parser.add_argument("source", help="Path to the graph directory to add")
+    repo_add_parser.add_argument("-m", "--message", default="", help="Description of the version")
+    repo_add_parser.add_argument("-k",
+                                 "--keyframe-interval",
+                                 type=int,
+                                 default=DEFAULT_KEYFRAME_INTERVAL,
+                                 help="Store a full snapshot every N versions to bound reconstruction cost")
+
+    repo_checkout_parser = repo_subparsers.add_parser("checkout", help="Reconstruct a version of the graph")
+    repo_checkout_parser.add_argument("repository", help="Path to the graph repository")
+    repo_checkout_parser.add_argument("version", help="Version to reconstruct")
+    repo_checkout_parser.add_argument("output", help="Directory where the reconstructed graph will be saved")
+
+    repo_log_parser = repo_subparsers.add_parser("log", help="List versions of the repository")
+    repo_log_parser.add_argument("repository", help="Path to the graph repository")
+
+    repo_diff_parser = repo_subparsers.add_parser("diff", help="Compare two versions using their stored deltas")
+    repo_diff_parser.add_argument("repository", help="Path to the graph repository")
+    repo_diff_parser.add_argument("first_version", help="Version to compare from")
+    repo_diff_parser.add_argument("second_version", help="Version to compare to")
+    repo_diff_parser.add_argument("output", help="Directory where the difference graph will be saved")
 
     args = parser.parse_args()
 
+    cache = ResultCache(args.cache_dir) if args.cache_dir else None
+    cache_key = cache.key(args) if cache else None
+    if cache_key and cache.restore(cache_key, args.output):
+        return
+    output_state = ResultCache.output_state(args.output) if cache_key else None
+
     try:
-        if args.command == "extract":
-            handle_extract(args)
-        if args.command == "init_additional":
-            handle_init_additional(args)
-        if args.command == "visualize":
-            handle_visualise(args)
-        if args.command == "union":
-            handle_union(args)
-        if args.command == "diff":
-            handle_diff(args)
-        if args.command == "contract":
-            handle_contract(args)
-        if args.command == "filter":
-            handle_filter(args)
-        if args.command == "get_used":
-            handle_get_used(args)
-        if args.command == "get_dependent":
-            handle_get_dependent(args)
+        # A running server answers supported commands without loading the graph in this process
+        if args.no_server or not forward(args, ServerClient(args.socket)):
+            _dispatch(args)
+
+        if cache_key:
+            cache.store(cache_key, args.output, output_state)
 
     except Exception as e:
-        print(f"Error: {str(e)}")
+        print(f"Error: {str(e)}", file=sys.stderr)
         exit(1)
 
 
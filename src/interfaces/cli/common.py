@@ -0,0 +1,32 @@
+from argparse import ArgumentParser
+
+from core.graph.query import DIRECTIONS, DISTANCE_FIELD, Direction
+
+VIS_NAME = "graph.html"
+
+CSV_FORMAT = "csv"
+JSONL_FORMAT = "jsonl"
+GRAPH_FORMATS = [CSV_FORMAT, JSONL_FORMAT]
+JSON_FORMAT = "json"
+REPORT_FORMATS = [CSV_FORMAT, JSON_FORMAT]
+STREAM_PATH = "-"
+
+
+def add_query_arguments(parser: ArgumentParser):
+    """Adds the arguments of a single query, shared by the query command and the lines of its batch file."""
+    parser.add_argument("output", nargs="?", default="", help="Path where the result will be saved")
+    parser.add_argument("elements", nargs="*", default=[], help="IDs of the elements to start from or globs over them")
+    parser.add_argument("--direction",
+                        choices=DIRECTIONS,
+                        default=Direction.OUT,
+                        help="'out' for used elements, 'in' for dependent ones, 'both' for the neighbourhood")
+    parser.add_argument("-d", "--depth", type=int, default=0, help="Maximum number of hops (0 for unlimited)")
+    parser.add_argument("--edge-types", nargs="+", default=None, help="Edge types to traverse (all by default)")
+    parser.add_argument("--stop-node-types",
+                        nargs="+",
+                        default=[],
+                        help="Node types that are included but not traversed further")
+    parser.add_argument("--distance",
+                        action="store_true",
+                        help=f"Add the number of hops from the nearest start element ('{DISTANCE_FIELD}' column)")
+    parser.add_argument("--format", choices=GRAPH_FORMATS, default=CSV_FORMAT, help="Output format")
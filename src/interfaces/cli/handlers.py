@@ -1,44 +1,116 @@
-from argparse import Namespace
+from argparse import ArgumentParser, Namespace
+import csv
+import json
 import logging
 import os
 from pathlib import Path
+import shlex
+import sys
+from typing import List, Optional
 
 from core.models.graph import Graph
+from interfaces.cli.common import CSV_FORMAT, JSON_FORMAT, JSONL_FORMAT, STREAM_PATH, VIS_NAME, add_query_arguments
 from utils.validatie import is_git_url
 from utils.git_handler import GitHandler
 
 from core.graph.parsing.project import ProjectParser
 from core.graph.difference import GraphComparator
-from core.graph.builder import CSVGraphBuilder
-from core.graph.exporter import CSVGraphExporter
+from core.graph.builder import CSVGraphBuilder, JSONLGraphBuilder
+from core.graph.exporter import CSVGraphExporter, JSONLGraphExporter
 from core.graph.visualise import HtmlGraphVisualizer
 from core.graph.contractor import GraphContractor
 from core.graph.dependency import DependencyExtensions
 from core.graph.filters import CommonFilter
+from core.graph.affected_tests import AffectedTestsIndex
+from core.graph.bulk import BulkReachability
+from core.graph.centrality import Centrality, CentralityMetric
+from core.graph.components import ComponentFinder
+from core.graph.cycles import CycleDetector
+from core.graph.impact import ImpactAnalyzer
+from core.graph.metrics import CouplingAnalyzer
+from core.graph.paths import PathFinder
+from core.graph.query import DISTANCE_FIELD, Query, QueryEngine
+from core.graph.query_cache import QUERY_CACHE_DIR_NAME, QueryCache
+from core.graph.reachability import ReachabilityIndex
+from core.graph.repository import GraphRepository
+from core.graph.rules import RuleChecker, RuleParser
+from core.graph.sparse import DEFAULT_CONTEXT_DEPTH, SparseDiff
+from core.graph.streaming import StreamingComparator
+from core.graph.timeline import VersionComparator
+from core.graph.unused import UnusedCodeFinder
+from interfaces.server.client import ServerClient
+from interfaces.server.server import GraphServer
 
 logger = logging.getLogger(__name__)
 
-VIS_NAME = "graph.html"
 DIFF_NAME = "diff.html"
+# Exit codes of 'check': rules are violated, the check could not run
+CHECK_VIOLATIONS_EXIT_CODE = 1
+CHECK_ERROR_EXIT_CODE = 2
+METRICS_FIELDS = ["id", "type", "fan_in", "fan_out", "afferent", "efferent", "instability"]
+
+
+def _input_exists(path: str | Path) -> bool:
+    return str(path) == STREAM_PATH or Path(path).exists()
+
+
+def _is_jsonl_input(path: str | Path) -> bool:
+    return str(path) == STREAM_PATH or Path(path).is_file()
+
+
+def _build_graph(path: str | Path) -> Graph:
+    if _is_jsonl_input(path):
+        return JSONLGraphBuilder.build(str(path))
+    return CSVGraphBuilder.build(path)
+
+
+def _build_diff_graph(path: str | Path, context_depth: int = DEFAULT_CONTEXT_DEPTH) -> Graph:
+    if _is_jsonl_input(path):
+        return JSONLGraphBuilder.build_diff(str(path))
+    if SparseDiff.is_sparse(path):
+        return SparseDiff.load_context(path, context_depth)
+    return CSVGraphBuilder.build_diff(path)
+
+
+def _save_graph(graph: Graph, output: str | Path, output_format: str = CSV_FORMAT, canonical: bool = False):
+    if output_format == JSONL_FORMAT:
+        JSONLGraphExporter.save(graph, str(output))
+    else:
+        CSVGraphExporter.save(graph, output, canonical)
+
+
+def _save_diff_graph(graph: Graph, output: str | Path, output_format: str = CSV_FORMAT):
+    if output_format == JSONL_FORMAT:
+        JSONLGraphExporter.save_diff(graph, str(output))
+    else:
+        CSVGraphExporter.save_diff(graph, output)
+
+
+def _vis_path(source: str | Path) -> str:
+    if str(source) == STREAM_PATH:
+        return VIS_NAME
+    if Path(source).is_file():
+        return str(Path(source).with_suffix(".html"))
+    return os.path.join(source, VIS_NAME)
 
 
 def handle_extract(args: Namespace):
 
     if args.link != "":
         if not is_git_url(args.link):
-            print(f"error validate git link: {args.link}")
+            print(f"error validate git link: {args.link}", file=sys.stderr)
             return
 
         git_dir = GitHandler.clone_repo(args.link, destination=args.output, force_clone=True)
         if git_dir is None:
-            print(f"error while cloning directory: {args.link}")
+            print(f"error while cloning directory: {args.link}", file=sys.stderr)
             return
 
         args.source = os.path.join(git_dir, args.source)
 
     source_path = Path(args.source)
     if not source_path.exists():
-        print(f"source path is not exist: {args.source}")
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
         return None
 
     if args.output is None:
@@ -48,20 +120,23 @@ def handle_extract(args: Namespace):
         parser = ProjectParser(source_path)
         graph = parser.parse()
     except Exception as e:
-        print(f"error parsing project: {args.source}: {str(e)}")
+        print(f"error parsing project: {args.source}: {str(e)}", file=sys.stderr)
         return
 
     try:
-        CSVGraphExporter.save(graph, args.output)
+        _save_graph(graph, args.output, args.format, args.sorted)
     except Exception as e:
-        print(f"error saving project graph {args.source}: {str(e)}")
+        print(f"error saving project graph {args.source}: {str(e)}", file=sys.stderr)
         return
-    
+
+    if args.format != CSV_FORMAT:
+        return
+
     vis_path = os.path.join(args.output, VIS_NAME)
     try:
         HtmlGraphVisualizer.create(graph, vis_path)
     except Exception as e:
-        print(f"error visualize graph {source_path}: {str(e)}")
+        print(f"error visualize graph {source_path}: {str(e)}", file=sys.stderr)
         return
 
 
@@ -71,43 +146,43 @@ def handle_init_additional(args: Namespace):
     try:
         CSVGraphBuilder.init_additional_files(directory)
     except Exception as e:
-        print(f"error initializing additional files in {directory}: {str(e)}")
+        print(f"error initializing additional files in {directory}: {str(e)}", file=sys.stderr)
         return
 
 
 def handle_visualise(args: Namespace):
     source_path = Path(args.source)
-    if not source_path.exists():
-        print(f"source path is not exist: {args.source}")
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
         return
 
     graph: Graph
     if args.mode == "basic":
         try:
-            graph = CSVGraphBuilder.build(source_path)
+            graph = _build_graph(args.source)
         except Exception as e:
-            print(f"error extract graph {source_path}: {str(e)}")
+            print(f"error extract graph {source_path}: {str(e)}", file=sys.stderr)
             return
-        vis_path = os.path.join(source_path, VIS_NAME)
+        vis_path = _vis_path(args.source)
 
         try:
             HtmlGraphVisualizer.create(graph, vis_path)
         except Exception as e:
-            print(f"error visualize graph {source_path}: {str(e)}")
+            print(f"error visualize graph {source_path}: {str(e)}", file=sys.stderr)
             return
 
     if args.mode == "diff":
         try:
-            graph = CSVGraphBuilder.build_diff(source_path)
+            graph = _build_diff_graph(args.source, args.context_depth)
         except Exception as e:
-            print(f"error extract graph {source_path}: {str(e)}")
+            print(f"error extract graph {source_path}: {str(e)}", file=sys.stderr)
             return
-        vis_path = os.path.join(source_path, VIS_NAME)
+        vis_path = _vis_path(args.source)
 
         try:
             HtmlGraphVisualizer.create_difference(graph, vis_path)
         except Exception as e:
-            print(f"error visualize difference graph {source_path}: {str(e)}")
+            print(f"error visualize difference graph {source_path}: {str(e)}", file=sys.stderr)
             return
 
 
@@ -115,119 +190,209 @@ def handle_union(args: Namespace):
     source_path = Path(args.source)
     additional_path = Path(args.additional)
 
-    if not source_path.exists():
-        print(f"source path is not exist: {args.source}")
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
         return
     if not additional_path.exists():
-        print(f"additional path is not exist: {args.additional}")
+        print(f"additional path is not exist: {args.additional}", file=sys.stderr)
         return
 
     try:
-        graph = CSVGraphBuilder.union(source_path, additional_path)
+        if _is_jsonl_input(args.source):
+            graph = JSONLGraphBuilder.union(args.source, additional_path)
+        else:
+            graph = CSVGraphBuilder.union(source_path, additional_path)
     except Exception as e:
-        print(f"error build union graph: {str(e)}")
+        print(f"error build union graph: {str(e)}", file=sys.stderr)
         return
 
     try:
-        CSVGraphExporter.save(graph, args.output)
+        _save_graph(graph, args.output, args.format, args.sorted)
     except Exception as e:
-        print(f"error saving union graph in {args.output}: {str(e)}")
+        print(f"error saving union graph in {args.output}: {str(e)}", file=sys.stderr)
+        return
+
+    if args.format != CSV_FORMAT:
         return
-    
+
     vis_path = os.path.join(args.output, VIS_NAME)
     try:
         HtmlGraphVisualizer.create(graph, vis_path)
     except Exception as e:
-        print(f"error visualize graph {source_path}: {str(e)}")
+        print(f"error visualize graph {source_path}: {str(e)}", file=sys.stderr)
         return
 
 
 def handle_diff(args: Namespace):
     first_path = Path(args.first_path)
     second_path = Path(args.second_path)
-    output_dir = Path(args.output)
 
-    if not first_path.exists():
-        print(f"first graph path is not exist: {args.first_path}")
+    if not _input_exists(args.first_path):
+        print(f"first graph path is not exist: {args.first_path}", file=sys.stderr)
+        return
+    if not _input_exists(args.second_path):
+        print(f"second graph path is not exist: {args.second_path}", file=sys.stderr)
         return
-    if not second_path.exists():
-        print(f"second graph path is not exist: {args.second_path}")
+
+    if args.detect_moves and (args.streaming or args.sparse):
+        print("move detection is not supported for streaming and sparse differences", file=sys.stderr)
+        return
+
+    if args.streaming:
+        if args.format != CSV_FORMAT or _is_jsonl_input(args.first_path) or _is_jsonl_input(args.second_path):
+            print("streaming difference supports only csv graphs", file=sys.stderr)
+            return
+        try:
+            StreamingComparator.save_difference(args.first_path, args.second_path, args.output, args.buffer_size)
+        except Exception as e:
+            print(f"error saving difference graph {args.output}: {str(e)}", file=sys.stderr)
+        return
+
+    if args.sparse and (args.format != CSV_FORMAT or _is_jsonl_input(args.first_path)):
+        print("sparse difference supports only csv graphs", file=sys.stderr)
         return
 
     first_graph: Graph
     second_graph: Graph
     try:
-        first_graph = CSVGraphBuilder.build(first_path)
+        first_graph = _build_graph(args.first_path)
     except Exception as e:
-        print(f"error extract first graph {first_path}: {str(e)}")
+        print(f"error extract first graph {first_path}: {str(e)}", file=sys.stderr)
         return
 
     try:
-        second_graph = CSVGraphBuilder.build(second_path)
+        second_graph = _build_graph(args.second_path)
     except Exception as e:
-        print(f"error extract first graph {second_path}: {str(e)}")
+        print(f"error extract first graph {second_path}: {str(e)}", file=sys.stderr)
+        return
+
+    if args.sparse:
+        try:
+            SparseDiff.save(first_graph, second_graph, args.first_path, args.output)
+        except Exception as e:
+            print(f"error saving sparse difference {args.output}: {str(e)}", file=sys.stderr)
         return
 
     try:
-        difference_graph = GraphComparator.get_difference(first_graph, second_graph)
+        if args.hierarchical:
+            difference_graph = GraphComparator.get_difference_hierarchical(first_graph, second_graph)
+        else:
+            difference_graph = GraphComparator.get_difference(first_graph, second_graph)
+        if args.detect_moves:
+            GraphComparator.detect_moves(difference_graph, args.match_names)
     except Exception as e:
-        print(f"error get difference between {args.first} and {args.second}: {str(e)}")
+        print(f"error get difference between {args.first} and {args.second}: {str(e)}", file=sys.stderr)
         return
 
     try:
-        CSVGraphExporter.save_diff(difference_graph, output_dir)
+        _save_diff_graph(difference_graph, args.output, args.format)
     except Exception as e:
-        print(f"error saving difference graph {args.output}: {str(e)}")
+        print(f"error saving difference graph {args.output}: {str(e)}", file=sys.stderr)
+        return
+
+
+def handle_diff_many(args: Namespace):
+    for path in args.paths:
+        if not _input_exists(path):
+            print(f"graph path is not exist: {path}", file=sys.stderr)
+            return
+
+    if len(set(args.paths)) != len(args.paths):
+        print("versions must be given by distinct paths", file=sys.stderr)
+        return
+
+    reference = args.reference or args.paths[0]
+    if reference not in args.paths:
+        print(f"reference version is not among the compared paths: {reference}", file=sys.stderr)
+        return
+
+    comparator = VersionComparator()
+    for path in args.paths:
+        try:
+            comparator.add_version(path, _build_graph(path))
+        except Exception as e:
+            print(f"error extract graph {path}: {str(e)}", file=sys.stderr)
+            return
+
+    try:
+        summaries = comparator.save(args.output, args.paths.index(reference), args.all_pairs)
+    except Exception as e:
+        print(f"error saving timeline {args.output}: {str(e)}", file=sys.stderr)
+        return
+
+    for summary in summaries:
+        counts = ", ".join(f"{status} {count}" for status, count in summary.counts.items())
+        print(f"{summary.first} -> {summary.second} {summary.element}s: {counts}")
+
+
+def handle_patch(args: Namespace):
+    if not SparseDiff.is_sparse(args.difference):
+        print(f"sparse difference is not found: {args.difference}", file=sys.stderr)
+        return
+
+    try:
+        graph = SparseDiff.apply(args.difference, args.base)
+    except Exception as e:
+        print(f"error applying difference {args.difference}: {str(e)}", file=sys.stderr)
+        return
+
+    try:
+        CSVGraphExporter.save(graph, args.output)
+    except Exception as e:
+        print(f"error saving patched graph {args.output}: {str(e)}", file=sys.stderr)
         return
 
 
 def handle_contract(args: Namespace):
     source_path = Path(args.source)
-    if not source_path.exists():
-        print(f"source path is not exist: {args.source}")
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
         return
 
     output_path = Path(args.output)
 
     try:
-        graph = CSVGraphBuilder.build(source_path)
+        graph = _build_graph(args.source)
     except Exception as e:
-        print(f"error extract graph {source_path}: {str(e)}")
+        print(f"error extract graph {source_path}: {str(e)}", file=sys.stderr)
         return
 
     try:
         contractor = GraphContractor(graph)
-        contracted_graph = contractor.contract_graph(args.elements)
+        contracted_graph = contractor.contract_graph(graph.resolve_ids(args.elements))
     except Exception as e:
-        print(f"error contract graph: {str(e)}")
+        print(f"error contract graph: {str(e)}", file=sys.stderr)
         return
 
     try:
-        CSVGraphExporter.save(contracted_graph, output_path)
+        _save_graph(contracted_graph, output_path, args.format)
     except Exception as e:
-        print(f"error saving contracted graph {output_path}: {str(e)}")
+        print(f"error saving contracted graph {output_path}: {str(e)}", file=sys.stderr)
+        return
+
+    if args.format != CSV_FORMAT:
         return
-    
+
     vis_path = os.path.join(args.output, VIS_NAME)
     try:
         HtmlGraphVisualizer.create(contracted_graph, vis_path)
     except Exception as e:
-        print(f"error visualize graph {source_path}: {str(e)}")
+        print(f"error visualize graph {source_path}: {str(e)}", file=sys.stderr)
         return
 
 
 def handle_filter(args: Namespace):
     source_path = Path(args.source)
-    if not source_path.exists():
-        print(f"source path is not exist: {args.source}")
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
         return
 
     output_path = Path(args.output)
 
     try:
-        graph = CSVGraphBuilder.build(source_path)
+        graph = _build_graph(args.source)
     except Exception as e:
-        print(f"error extract graph {source_path}: {str(e)}")
+        print(f"error extract graph {source_path}: {str(e)}", file=sys.stderr)
         return
 
     try:
@@ -235,88 +400,643 @@ def handle_filter(args: Namespace):
                                             nodes_types=args.node_types if hasattr(args, 'node_types') else [],
                                             edges_types=args.edge_types if hasattr(args, 'edge_types') else [],
                                             node_reg=args.node_id_mask if hasattr(args, 'node_id_mask') else "",
-                                            inv_flag=args.inv if hasattr(args, 'inv') else False)
+                                            inv_flag=args.inv if hasattr(args, 'inv') else False,
+                                            node_where=args.where if hasattr(args, 'where') else "",
+                                            edge_where=args.edge_where if hasattr(args, 'edge_where') else "")
     except Exception as e:
-        print(f"error filter graph: {str(e)}")
+        print(f"error filter graph: {str(e)}", file=sys.stderr)
         return
 
     try:
-        CSVGraphExporter.save(filtered_graph, output_path)
+        _save_graph(filtered_graph, output_path, args.format)
     except Exception as e:
-        print(f"error saving filtered graph {output_path}: {str(e)}")
+        print(f"error saving filtered graph {output_path}: {str(e)}", file=sys.stderr)
         return
-    
+
+    if args.format != CSV_FORMAT:
+        return
+
     vis_path = os.path.join(args.output, VIS_NAME)
     try:
         HtmlGraphVisualizer.create(filtered_graph, vis_path)
     except Exception as e:
-        print(f"error visualize graph {source_path}: {str(e)}")
+        print(f"error visualize graph {source_path}: {str(e)}", file=sys.stderr)
         return
 
 
 def handle_get_used(args: Namespace):
     source_path = Path(args.source)
-    if not source_path.exists():
-        print(f"source path is not exist: {args.source}")
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
         return
 
     output_path = Path(args.output)
 
     try:
-        graph = CSVGraphBuilder.build(source_path)
+        graph = _build_graph(args.source)
     except Exception as e:
-        print(f"error extract graph {source_path}: {str(e)}")
+        print(f"error extract graph {source_path}: {str(e)}", file=sys.stderr)
         return
 
     try:
-        used_graph = DependencyExtensions.get_used_nodes(graph, args.elements, args.depth)
+        used_graph = DependencyExtensions.get_used_nodes(graph, graph.resolve_ids(args.elements), args.depth)
     except Exception as e:
-        print(f"error get used elements: {str(e)}")
+        print(f"error get used elements: {str(e)}", file=sys.stderr)
         return
 
     try:
-        CSVGraphExporter.save(used_graph, output_path)
+        _save_graph(used_graph, output_path, args.format)
     except Exception as e:
-        print(f"error saving used elements graph {output_path}: {str(e)}")
+        print(f"error saving used elements graph {output_path}: {str(e)}", file=sys.stderr)
         return
-    
+
+    if args.format != CSV_FORMAT:
+        return
+
     vis_path = os.path.join(args.output, VIS_NAME)
     try:
         HtmlGraphVisualizer.create(used_graph, vis_path)
     except Exception as e:
-        print(f"error visualize graph {source_path}: {str(e)}")
+        print(f"error visualize graph {source_path}: {str(e)}", file=sys.stderr)
         return
 
 
 def handle_get_dependent(args: Namespace):
     source_path = Path(args.source)
-    if not source_path.exists():
-        print(f"source path is not exist: {args.source}")
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
         return
 
     output_path = Path(args.output)
 
     try:
-        graph = CSVGraphBuilder.build(source_path)
+        graph = _build_graph(args.source)
     except Exception as e:
-        print(f"error extract graph {source_path}: {str(e)}")
+        print(f"error extract graph {source_path}: {str(e)}", file=sys.stderr)
         return
 
     try:
-        dependent_graph = DependencyExtensions.get_dependent_nodes(graph, args.elements, args.depth)
+        dependent_graph = DependencyExtensions.get_dependent_nodes(graph, graph.resolve_ids(args.elements), args.depth)
     except Exception as e:
-        print(f"error get dependent elements: {str(e)}")
+        print(f"error get dependent elements: {str(e)}", file=sys.stderr)
         return
 
     try:
-        CSVGraphExporter.save(dependent_graph, output_path)
+        _save_graph(dependent_graph, output_path, args.format)
     except Exception as e:
-        print(f"error saving dependent elements graph {output_path}: {str(e)}")
+        print(f"error saving dependent elements graph {output_path}: {str(e)}", file=sys.stderr)
+        return
+
+    if args.format != CSV_FORMAT:
         return
-    
+
     vis_path = os.path.join(args.output, VIS_NAME)
     try:
         HtmlGraphVisualizer.create(dependent_graph, vis_path)
     except Exception as e:
-        print(f"error visualize graph {source_path}: {str(e)}")
+        print(f"error visualize graph {source_path}: {str(e)}", file=sys.stderr)
+        return
+
+
+def _run_query(graph: Graph, args: Namespace):
+    query = Query(graph.resolve_ids(args.elements), args.direction, args.depth, args.edge_types, args.stop_node_types,
+                  args.distance)
+    elements = QueryEngine.run(graph, query)
+    if args.format == JSONL_FORMAT:
+        JSONLGraphExporter.save_elements(elements, str(args.output))
+    else:
+        CSVGraphExporter.save_elements(elements, str(args.output), [DISTANCE_FIELD] if args.distance else [])
+
+
+def handle_query(args: Namespace):
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
+        return
+
+    if args.batch and not Path(args.batch).is_file():
+        print(f"batch file is not exist: {args.batch}", file=sys.stderr)
+        return
+
+    if not args.batch and (not args.output or not args.elements):
+        print("output and elements must be specified", file=sys.stderr)
+        return
+
+    try:
+        graph = _build_graph(args.source)
+    except Exception as e:
+        print(f"error extract graph {args.source}: {str(e)}", file=sys.stderr)
+        return
+
+    if not args.batch:
+        try:
+            _run_query(graph, args)
+        except Exception as e:
+            print(f"error run query: {str(e)}", file=sys.stderr)
         return
+
+    line_parser = ArgumentParser(prog="query", exit_on_error=False)
+    add_query_arguments(line_parser)
+    with open(args.batch, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            try:
+                query_args = line_parser.parse_args(shlex.split(line))
+            except SystemExit:
+                # The parser has already reported the error
+                print(f"error parse query on line {number}", file=sys.stderr)
+                continue
+            except Exception as e:
+                print(f"error parse query on line {number}: {str(e)}", file=sys.stderr)
+                continue
+            if not query_args.output or not query_args.elements:
+                print(f"output and elements must be specified on line {number}", file=sys.stderr)
+                continue
+            try:
+                _run_query(graph, query_args)
+            except Exception as e:
+                print(f"error run query on line {number}: {str(e)}", file=sys.stderr)
+
+
+def handle_reach(args: Namespace):
+    if not _input_exists(args.source) or str(args.source) == STREAM_PATH:
+        print(f"graph path is not exist: {args.source}", file=sys.stderr)
+        return
+
+    if args.pairs and not Path(args.pairs).is_file():
+        print(f"pairs file is not exist: {args.pairs}", file=sys.stderr)
+        return
+
+    try:
+        index = ReachabilityIndex.load_or_build(args.source, _build_graph, args.edge_types)
+    except Exception as e:
+        print(f"error build reachability index: {str(e)}", file=sys.stderr)
+        return
+
+    if args.stats:
+        stats = index.stats()
+        print(", ".join(f"{name}: {value}" for name, value in stats.items()))
+
+    try:
+        if args.pairs:
+            with open(args.pairs, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    parts = line.split()
+                    if len(parts) != 2:
+                        print(
+                            f"invalid pair at line {line_number} of {args.pairs}: '{line.strip()}', "
+                            f"expected '<src> <dest>'",
+                            file=sys.stderr)
+                        continue
+                    src, dest = parts
+                    try:
+                        print(f"{src} {dest} {str(index.reaches(src, dest)).lower()}")
+                    except Exception as e:
+                        print(f"error answer reachability query at line {line_number} of {args.pairs}: {str(e)}",
+                              file=sys.stderr)
+        elif args.src and args.dest:
+            print(str(index.reaches(args.src, args.dest)).lower())
+        elif args.src:
+            nodes = index.ancestors(args.src) if args.ancestors else index.descendants(args.src)
+            for node_id in sorted(nodes - {args.src}):
+                print(node_id)
+    except Exception as e:
+        print(f"error answer reachability query: {str(e)}", file=sys.stderr)
+        return
+
+
+def handle_cycles(args: Namespace):
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
+        return
+
+    try:
+        graph = _build_graph(args.source)
+    except Exception as e:
+        print(f"error extract graph {args.source}: {str(e)}", file=sys.stderr)
+        return
+
+    try:
+        cycles = CycleDetector.find(graph, args.edge_types, args.level)
+    except Exception as e:
+        print(f"error find cycles: {str(e)}", file=sys.stderr)
+        return
+
+    if args.json:
+        report = [{"nodes": cycle.nodes, "path": cycle.path, "cut": cycle.cut} for cycle in cycles]
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"cycles: {len(cycles)}")
+    for number, cycle in enumerate(cycles, start=1):
+        print(f"cycle {number}: {len(cycle.nodes)} elements")
+        print(f"  path: {' -> '.join(cycle.path)}")
+        print(f"  cut ({len(cycle.cut)} edges):")
+        for src, dest in cycle.cut:
+            print(f"    {src} -> {dest}")
+
+
+def handle_path(args: Namespace):
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
+        return
+
+    try:
+        graph = _build_graph(args.source)
+    except Exception as e:
+        print(f"error extract graph {args.source}: {str(e)}", file=sys.stderr)
+        return
+
+    try:
+        paths = PathFinder.shortest_paths(graph, args.src, args.dest, args.k, args.edge_types, args.exclude)
+    except Exception as e:
+        print(f"error find paths: {str(e)}", file=sys.stderr)
+        return
+
+    if not paths:
+        print(f"no path from {args.src} to {args.dest}")
+        return
+
+    for path in paths:
+        print(" -> ".join(path))
+
+    try:
+        _save_graph(PathFinder.subgraph(graph, paths, args.edge_types), args.output, args.format)
+    except Exception as e:
+        print(f"error save paths: {str(e)}", file=sys.stderr)
+        return
+
+
+def handle_closure(args: Namespace):
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
+        return
+
+    try:
+        graph = _build_graph(args.source)
+    except Exception as e:
+        print(f"error extract graph {args.source}: {str(e)}", file=sys.stderr)
+        return
+
+    if args.files:
+        graph = ComponentFinder.aggregate_by_file(graph, args.edge_types)
+
+    elements = graph.resolve_ids(args.elements)
+    missing = [element for element in elements if element not in graph.nodes]
+    if missing:
+        print(f"elements not found: {' '.join(missing)}", file=sys.stderr)
+        return
+
+    try:
+        counts = BulkReachability.reachable_counts(graph, elements or None, args.hops, args.edge_types, args.direction)
+    except Exception as e:
+        print(f"error count reachable elements: {str(e)}", file=sys.stderr)
+        return
+
+    ranking = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    if args.top > 0:
+        ranking = ranking[:args.top]
+
+    if args.json:
+        print(json.dumps(dict(ranking), indent=2))
+        return
+
+    for node_id, count in ranking:
+        print(f"{count} {node_id}")
+
+
+def handle_metrics(args: Namespace):
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
+        return
+
+    try:
+        graph = _build_graph(args.source)
+    except Exception as e:
+        print(f"error extract graph {args.source}: {str(e)}", file=sys.stderr)
+        return
+
+    try:
+        metrics = CouplingAnalyzer.compute(graph, args.edge_types)
+    except Exception as e:
+        print(f"error compute metrics: {str(e)}", file=sys.stderr)
+        return
+
+    rows = []
+    for node_id, node_metrics in metrics.items():
+        node_type = graph.nodes[node_id].type
+        if args.node_types and node_type not in args.node_types:
+            continue
+        rows.append({
+            "id": node_id,
+            "type": node_type,
+            "fan_in": node_metrics.fan_in,
+            "fan_out": node_metrics.fan_out,
+            "afferent": node_metrics.afferent,
+            "efferent": node_metrics.efferent,
+            "instability": node_metrics.instability,
+        })
+    rows.sort(key=lambda row: row["id"])
+
+    try:
+        output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        try:
+            if args.format == JSON_FORMAT:
+                json.dump(rows, output, indent=2)
+                output.write("\n")
+            else:
+                writer = csv.DictWriter(output, fieldnames=METRICS_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+        finally:
+            if args.output:
+                output.close()
+    except OSError as e:
+        print(f"error write metrics: {str(e)}", file=sys.stderr)
+        return
+
+
+def handle_rank(args: Namespace):
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
+        return
+
+    try:
+        graph = _build_graph(args.source)
+    except Exception as e:
+        print(f"error extract graph {args.source}: {str(e)}", file=sys.stderr)
+        return
+
+    try:
+        if args.metric == CentralityMetric.BETWEENNESS:
+            scores = Centrality.betweenness(graph, args.samples, args.edge_types)
+        else:
+            scores = Centrality.pagerank(graph, args.edge_types, args.damping, args.tolerance, args.max_iterations)
+    except Exception as e:
+        print(f"error rank elements: {str(e)}", file=sys.stderr)
+        return
+
+    ranked = [(node_id, score) for node_id, score in scores.items() if graph.nodes[node_id].type in args.node_types]
+    ranking = sorted(ranked, key=lambda item: (-item[1], item[0]))[:args.top]
+
+    if args.json:
+        print(json.dumps(dict(ranking), indent=2))
+        return
+
+    for node_id, score in ranking:
+        print(f"{score:.6g} {node_id}")
+
+
+def handle_check(args: Namespace):
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
+        sys.exit(CHECK_ERROR_EXIT_CODE)
+
+    if not Path(args.rules).is_file():
+        print(f"rules file is not exist: {args.rules}", file=sys.stderr)
+        sys.exit(CHECK_ERROR_EXIT_CODE)
+
+    try:
+        graph = _build_graph(args.source)
+    except Exception as e:
+        print(f"error extract graph {args.source}: {str(e)}", file=sys.stderr)
+        sys.exit(CHECK_ERROR_EXIT_CODE)
+
+    try:
+        violations = RuleChecker(RuleParser.load(args.rules)).check(graph)
+    except Exception as e:
+        print(f"error check rules: {str(e)}", file=sys.stderr)
+        sys.exit(CHECK_ERROR_EXIT_CODE)
+
+    if args.json:
+        report = [{
+            "src": violation.src,
+            "dest": violation.dest,
+            "type": violation.type,
+            "rule": str(violation.rule),
+            "line": violation.rule.line
+        } for violation in violations]
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"violations: {len(violations)}")
+        for violation in violations:
+            print(f"  {violation.src} -> {violation.dest} [{violation.type}] "
+                  f"denied by line {violation.rule.line}: {violation.rule}")
+
+    if violations:
+        sys.exit(CHECK_VIOLATIONS_EXIT_CODE)
+
+
+def handle_serve(args: Namespace):
+    if args.stats:
+        try:
+            stats = ServerClient(args.socket).request("stats", {})
+        except Exception as e:
+            print(f"error get server stats: {str(e)}", file=sys.stderr)
+            return
+        for graph_path in stats["graphs"]:
+            print(graph_path)
+        print(", ".join(f"{name}: {value}" for name, value in stats["cache"].items()))
+        return
+
+    if not args.graphs:
+        print("graphs must be specified", file=sys.stderr)
+        return
+
+    for path in args.graphs:
+        if not _input_exists(path) or str(path) == STREAM_PATH:
+            print(f"graph path is not exist: {path}", file=sys.stderr)
+            return
+
+    cache_dir = Path(args.cache_dir) / QUERY_CACHE_DIR_NAME if args.cache_dir else None
+    print(f"serving {len(args.graphs)} graphs on {args.socket}")
+    try:
+        GraphServer(args.socket, args.workers, QueryCache(cache_dir, max_age=args.max_age)).run(args.graphs)
+    except KeyboardInterrupt:
+        return
+    except Exception as e:
+        print(f"error serve graphs: {str(e)}", file=sys.stderr)
+        return
+
+
+def handle_impact(args: Namespace):
+    if not args.base and not args.changed:
+        print("either base graph or changed elements must be specified", file=sys.stderr)
+        return
+
+    for path in [args.source, args.base] if args.base else [args.source]:
+        if not _input_exists(path):
+            print(f"graph path is not exist: {path}", file=sys.stderr)
+            return
+
+    try:
+        graph = _build_graph(args.source)
+        changed = ImpactAnalyzer.expand(graph, graph.resolve_ids(args.changed))
+        if args.base:
+            changed |= ImpactAnalyzer.changed_nodes(_build_graph(args.base), graph, args.stop_edge_types)
+    except Exception as e:
+        print(f"error find changed elements: {str(e)}", file=sys.stderr)
+        return
+
+    try:
+        result = ImpactAnalyzer.analyze(graph, changed, args.stop_edge_types)
+        impacted = sorted(result.impacted())
+        files = ImpactAnalyzer.group_by_file(graph, impacted)
+        arc_elements = ImpactAnalyzer.group_by_arc_element(graph, impacted)
+    except Exception as e:
+        print(f"error analyze impact: {str(e)}", file=sys.stderr)
+        return
+
+    if args.json:
+        paths = {node_id: result.path(node_id) for node_id in impacted}
+        report = {
+            "changed": sorted(result.changed),
+            "impacted": paths,
+            "files": files,
+            "arc_elements": arc_elements,
+        }
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"changed: {len(result.changed)}, impacted: {len(impacted) - len(result.changed)}")
+    for title, groups in (("file", files), ("arc element", arc_elements)):
+        for group_id, node_ids in groups.items():
+            print(f"{title} {group_id}:")
+            for node_id in node_ids:
+                print(f"  {' -> '.join(result.path(node_id))}")
+
+
+def handle_unused(args: Namespace):
+    if not _input_exists(args.source):
+        print(f"source path is not exist: {args.source}", file=sys.stderr)
+        return
+
+    try:
+        graph = _build_graph(args.source)
+    except Exception as e:
+        print(f"error extract graph {args.source}: {str(e)}", file=sys.stderr)
+        return
+
+    try:
+        entries = UnusedCodeFinder.entries(graph, args.entry)
+        unused = UnusedCodeFinder.find(graph, entries, args.edge_types)
+        files = UnusedCodeFinder.group_by_file(graph, unused)
+    except Exception as e:
+        print(f"error find unused code: {str(e)}", file=sys.stderr)
+        return
+
+    if args.json:
+        report = {file.id: {"unused": file.unused, "total": file.total, "dead": file.dead} for file in files}
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"entry points: {len(entries)}, unused: {len(unused)}")
+    for file in files:
+        print(f"file {file.id} ({len(file.unused)} of {file.total}{', whole file' if file.dead else ''}):")
+        for node_id in file.unused:
+            print(f"  {node_id}")
+
+
+def _changed_files(args: Namespace) -> Optional[List[str]]:
+    changed = args.changed
+    # A single argument that is not a file may be a revision range or a single revision
+    if len(changed) == 1 and not Path(changed[0]).exists() and (".." in changed[0]
+                                                                or GitHandler.is_revision(args.repo, changed[0])):
+        changed = GitHandler.changed_files(args.repo, changed[0])
+        if changed is None:
+            return None
+
+    prefix = args.root.strip("/") + "/" if args.root.strip("/") else ""
+    files = []
+    for path in changed:
+        path = Path(path).as_posix().removeprefix("./")
+        if path.startswith(prefix):
+            files.append(path[len(prefix):])
+    return files
+
+
+def handle_select_tests(args: Namespace):
+    if not _input_exists(args.source) or str(args.source) == STREAM_PATH:
+        print(f"graph path is not exist: {args.source}", file=sys.stderr)
+        return
+
+    changed = _changed_files(args)
+    if changed is None:
+        print(f"error get changed files: {args.changed[0]}", file=sys.stderr)
+        return
+
+    try:
+        index = AffectedTestsIndex.load_or_build(args.source, _build_graph, args.test_patterns, args.edge_types)
+        tests = index.select(changed, args.test_patterns)
+    except Exception as e:
+        print(f"error select tests: {str(e)}", file=sys.stderr)
+        return
+
+    prefix = args.root.strip("/") + "/" if args.root.strip("/") else ""
+    print(" ".join(f"{prefix}{test}" for test in tests))
+
+
+def handle_repo(args: Namespace):
+    repo_path = Path(args.repository)
+    if args.repo_command != "add" and not repo_path.exists():
+        print(f"repository path is not exist: {args.repository}", file=sys.stderr)
+        return
+
+    if args.repo_command == "add":
+        source_path = Path(args.source)
+        if not source_path.exists():
+            print(f"source path is not exist: {args.source}", file=sys.stderr)
+            return
+
+        try:
+            graph = CSVGraphBuilder.build(source_path)
+        except Exception as e:
+            print(f"error extract graph {source_path}: {str(e)}", file=sys.stderr)
+            return
+
+        try:
+            entry = GraphRepository(repo_path, args.keyframe_interval).add(graph, args.message)
+        except Exception as e:
+            print(f"error adding graph to repository {repo_path}: {str(e)}", file=sys.stderr)
+            return
+        print(f"version {entry.version}: {entry.changes} changes{' (keyframe)' if entry.keyframe else ''}")
+
+    if args.repo_command == "checkout":
+        try:
+            graph = GraphRepository(repo_path).checkout(args.version)
+        except Exception as e:
+            print(f"error checkout version {args.version}: {str(e)}", file=sys.stderr)
+            return
+
+        try:
+            CSVGraphExporter.save(graph, args.output)
+        except Exception as e:
+            print(f"error saving version graph {args.output}: {str(e)}", file=sys.stderr)
+            return
+
+    if args.repo_command == "log":
+        try:
+            versions = GraphRepository(repo_path).log()
+        except Exception as e:
+            print(f"error reading repository log {repo_path}: {str(e)}", file=sys.stderr)
+            return
+
+        for entry in versions:
+            kind = "keyframe" if entry.keyframe else "delta"
+            print(f"{entry.version}\t{entry.created}\t{kind}\t{entry.changes} changes\t{entry.message}")
+
+    if args.repo_command == "diff":
+        try:
+            difference_graph = GraphRepository(repo_path).diff(args.first_version, args.second_version)
+        except Exception as e:
+            print(f"error get difference between {args.first_version} and {args.second_version}: {str(e)}",
+                  file=sys.stderr)
+            return
+
+        try:
+            CSVGraphExporter.save_diff(difference_graph, args.output)
+        except Exception as e:
+            print(f"error saving difference graph {args.output}: {str(e)}", file=sys.stderr)
+            return
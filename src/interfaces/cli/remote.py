@@ -0,0 +1,191 @@
+from argparse import Namespace
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+from core.graph.builder import JSONLGraphBuilder
+from core.graph.exporter import CSVGraphExporter, JSONLGraphExporter
+from core.graph.query import DISTANCE_FIELD
+from core.models.graph import Graph
+from core.models.node import Node
+from interfaces.cli.common import CSV_FORMAT, JSONL_FORMAT, STREAM_PATH, VIS_NAME
+from interfaces.server.client import ServerClient
+
+logger = logging.getLogger(__name__)
+
+# Commands a running server can answer
+FORWARDED_COMMANDS = ["get_used", "get_dependent", "filter", "query", "diff", "reach"]
+
+
+def _path(path: str) -> str:
+    # The server resolves paths against its own working directory
+    return str(Path(path).resolve())
+
+
+def _is_forwardable(args: Namespace) -> bool:
+    if args.command not in FORWARDED_COMMANDS:
+        return False
+    inputs = [args.first_path, args.second_path] if args.command == "diff" else [args.source]
+    if any(str(path) == STREAM_PATH or not Path(path).exists() for path in inputs):
+        return False
+    if args.command == "diff":
+        return not args.streaming and not args.sparse
+    if args.command == "query":
+        return not args.batch and bool(args.output) and bool(args.elements)
+    return True
+
+
+def _graph(records: List[dict]) -> Graph:
+    graph = Graph()
+    elements = [JSONLGraphBuilder.record_to_element(record) for record in records]
+    for element in elements:
+        if isinstance(element, Node):
+            graph.add_node(element)
+    for element in elements:
+        if not isinstance(element, Node):
+            graph.add_edge(element)
+    return graph
+
+
+def _save_with_visualization(records: List[dict], args: Namespace):
+    graph = _graph(records)
+    if args.format == JSONL_FORMAT:
+        JSONLGraphExporter.save(graph, str(args.output))
+        return
+
+    CSVGraphExporter.save(graph, args.output)
+    # Only results saved as CSV are visualized, so the visualization imports are paid only then
+    from core.graph.visualise import HtmlGraphVisualizer
+    HtmlGraphVisualizer.create(graph, os.path.join(args.output, VIS_NAME))
+
+
+def _forward_dependency(args: Namespace, client: ServerClient):
+    records = client.request(args.command, {
+        "graph": _path(args.source),
+        "elements": args.elements,
+        "depth": args.depth,
+    })
+    _save_with_visualization(records, args)
+
+
+def _forward_filter(args: Namespace, client: ServerClient):
+    records = client.request(
+        "filter", {
+            "graph": _path(args.source),
+            "node_types": args.node_types if hasattr(args, 'node_types') else [],
+            "edge_types": args.edge_types if hasattr(args, 'edge_types') else [],
+            "node_id_mask": args.node_id_mask if hasattr(args, 'node_id_mask') else "",
+            "inv": args.inv if hasattr(args, 'inv') else False,
+            "where": args.where if hasattr(args, 'where') else "",
+            "edge_where": args.edge_where if hasattr(args, 'edge_where') else "",
+        })
+    _save_with_visualization(records, args)
+
+
+def _forward_query(args: Namespace, client: ServerClient):
+    records = client.request(
+        "query", {
+            "graph": _path(args.source),
+            "elements": args.elements,
+            "direction": args.direction,
+            "depth": args.depth,
+            "edge_types": args.edge_types,
+            "stop_node_types": args.stop_node_types,
+            "distance": args.distance,
+        })
+    elements = (JSONLGraphBuilder.record_to_element(record) for record in records)
+    if args.format == JSONL_FORMAT:
+        JSONLGraphExporter.save_elements(elements, str(args.output))
+    else:
+        CSVGraphExporter.save_elements(elements, str(args.output), [DISTANCE_FIELD] if args.distance else [])
+
+
+def _forward_diff(args: Namespace, client: ServerClient):
+    records = client.request(
+        "diff", {
+            "graph": _path(args.first_path),
+            "other": _path(args.second_path),
+            "hierarchical": args.hierarchical,
+            "detect_moves": args.detect_moves,
+            "match_names": args.match_names,
+        })
+    difference_graph = _graph(records)
+    if args.format == JSONL_FORMAT:
+        JSONLGraphExporter.save_diff(difference_graph, str(args.output))
+    else:
+        CSVGraphExporter.save_diff(difference_graph, args.output)
+
+
+def _forward_reach(args: Namespace, client: ServerClient):
+    pairs, line_numbers = [], []
+    if args.pairs:
+        with open(args.pairs, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                parts = line.split()
+                if len(parts) != 2:
+                    print(
+                        f"invalid pair at line {line_number} of {args.pairs}: '{line.strip()}', "
+                        f"expected '<src> <dest>'",
+                        file=sys.stderr)
+                    continue
+                pairs.append(parts)
+                line_numbers.append(line_number)
+
+    result = client.request(
+        "reach", {
+            "graph": _path(args.source),
+            "edge_types": args.edge_types,
+            "src": args.src,
+            "dest": args.dest,
+            "ancestors": args.ancestors,
+            "pairs": pairs,
+        })
+
+    if args.stats:
+        print(", ".join(f"{name}: {value}" for name, value in result["stats"].items()))
+    if args.pairs:
+        for (src, dest), line_number, reaches in zip(pairs, line_numbers, result.get("pairs", [])):
+            if reaches is None:
+                print(f"error answer reachability query at line {line_number} of {args.pairs}", file=sys.stderr)
+            else:
+                print(f"{src} {dest} {str(reaches).lower()}")
+    elif "reaches" in result:
+        print(str(result["reaches"]).lower())
+    for node_id in result.get("nodes", []):
+        print(node_id)
+
+
+FORWARDERS = {
+    "get_used": _forward_dependency,
+    "get_dependent": _forward_dependency,
+    "filter": _forward_filter,
+    "query": _forward_query,
+    "diff": _forward_diff,
+    "reach": _forward_reach,
+}
+
+
+def forward(args: Namespace, client: ServerClient) -> bool:
+    """
+    Runs a command on a running server instead of loading the graph in this process.
+
+    Args:
+        args: Parsed command line arguments
+        client: Client of the server
+
+    Returns:
+        bool: True if the command was handled by the server, False if it should run locally
+    """
+    if not _is_forwardable(args) or not client.is_running():
+        return False
+
+    logger.info(f"Forwarding {args.command} to {client.socket_path}")
+    try:
+        FORWARDERS[args.command](args, client)
+    except Exception as e:
+        print(f"error run {args.command} on server: {str(e)}", file=sys.stderr)
+    return True
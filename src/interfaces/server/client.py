@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+import socket
+import tempfile
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.environ.get("PYFLOW_SOCKET", os.path.join(tempfile.gettempdir(), "pyflow.sock"))
+DEFAULT_WORKERS = 4
+CONNECT_TIMEOUT = 0.5
+READ_CHUNK_SIZE = 1 << 16
+
+
+class ServerClient:
+    """
+    Sends requests to a running GraphServer.
+
+    The module imports nothing but the standard library, so a client call doesn't pay for the imports
+    of the analysis code.
+    """
+    __slots__ = ('socket_path', 'timeout')
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def is_running(self) -> bool:
+        """Checks whether a server listens on the socket."""
+        if not os.path.exists(self.socket_path):
+            return False
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                connection.settimeout(CONNECT_TIMEOUT)
+                connection.connect(self.socket_path)
+            return True
+        except OSError:
+            return False
+
+    def request(self, method: str, params: dict) -> Any:
+        """
+        Sends a request and waits for its result.
+
+        Args:
+            method (str): Name of the server method
+            params (dict): Parameters of the method
+
+        Returns:
+            Any: Result of the method
+
+        Raises:
+            Exception: If the server can't be reached or the method failed
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                connection.settimeout(self.timeout)
+                connection.connect(self.socket_path)
+                connection.sendall(json.dumps({"method": method, "params": params}).encode('utf-8') + b"\n")
+                chunks = []
+                while not chunks or not chunks[-1].endswith(b"\n"):
+                    chunk = connection.recv(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+        except OSError as e:
+            text_error = f"Server {self.socket_path} is not available: {str(e)}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        if not chunks:
+            text_error = f"Server {self.socket_path} closed the connection"
+            logger.critical(text_error)
+            raise Exception(text_error)
+
+        response = json.loads(b"".join(chunks))
+        if not response["ok"]:
+            text_error = f"Server error: {response['error']}"
+            logger.critical(text_error)
+            raise Exception(text_error)
+        return response["result"]
@@ -0,0 +1,275 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+from pathlib import Path
+import signal
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.graph.builder import CSVGraphBuilder, JSONLGraphBuilder
+from core.graph.difference import GraphComparator
+from core.graph.exporter import JSONLGraphExporter
+from core.graph.query import Direction, Query, QueryEngine
+from core.graph.query_cache import QueryCache
+from core.graph.reachability import DEFAULT_REACHABILITY_EDGE_TYPES, ReachabilityIndex
+from core.models.graph import Graph
+from interfaces.server.client import DEFAULT_SOCKET_PATH, DEFAULT_WORKERS
+from utils.paths import graph_files
+
+logger = logging.getLogger(__name__)
+
+# Requests are single lines of JSON, results may be much longer
+REQUEST_LIMIT = 16 << 20
+
+FileState = Tuple[Tuple[str, int, int], ...]
+
+
+class GraphEntry:
+    __slots__ = ('path', 'graph', 'state', 'reachability', 'lock')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.graph: Optional[Graph] = None
+        self.state: FileState = ()
+        self.reachability: Dict[Tuple[str, ...], ReachabilityIndex] = {}
+        self.lock = asyncio.Lock()
+
+
+class GraphServer:
+    """
+    Keeps graphs in memory and answers queries about them over a Unix socket.
+
+    A request is one line of JSON {"method": ..., "params": {...}}, the response is one line of JSON
+    {"ok": true, "result": ...} or {"ok": false, "error": ...}. Queries run in a thread pool, so a heavy
+    query doesn't block the connections of other clients. Before each request the graph files are
+    checked, and a graph whose files changed is loaded again.
+
+    Results of get_used, get_dependent and filter are cached by the fingerprint of the graph, so repeated
+    queries are answered without a traversal and the results of a reloaded graph are not mixed up.
+    """
+    __slots__ = ('socket_path', 'executor', 'graphs', 'cache', 'methods')
+
+    def __init__(self,
+                 socket_path: str = DEFAULT_SOCKET_PATH,
+                 workers: int = DEFAULT_WORKERS,
+                 cache: Optional[QueryCache] = None):
+        self.socket_path = socket_path
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.graphs: Dict[str, GraphEntry] = {}
+        self.cache = cache if cache is not None else QueryCache()
+        self.methods: Dict[str, Callable[[dict], Awaitable]] = {
+            "ping": self._ping,
+            "query": self._query,
+            "get_used": self._get_used,
+            "get_dependent": self._get_dependent,
+            "filter": self._filter,
+            "diff": self._diff,
+            "reach": self._reach,
+            "stats": self._stats,
+        }
+
+    def run(self, graph_paths: Iterable[str]):
+        """Loads the graphs and serves requests until interrupted."""
+        # Termination is handled as an interrupt, so the socket file is removed in both cases
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            asyncio.run(self.serve(graph_paths))
+        finally:
+            self.executor.shutdown(wait=False)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    async def serve(self, graph_paths: Iterable[str]):
+        for graph_path in graph_paths:
+            await self._entry(graph_path)
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path, limit=REQUEST_LIMIT)
+        logger.info(f"Serving {len(self.graphs)} graphs on {self.socket_path}")
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, request: dict) -> dict:
+        """
+        Answers one request.
+
+        Args:
+            request (dict): Method name and its parameters
+
+        Returns:
+            dict: Result of the method or the error
+        """
+        method = self.methods.get(request.get("method"))
+        if method is None:
+            return {"ok": False, "error": f"unknown method {request.get('method')}"}
+        try:
+            return {"ok": True, "result": await method(request.get("params", {}))}
+        except Exception as e:
+            logger.error(f"Request {request.get('method')} failed: {str(e)}")
+            return {"ok": False, "error": str(e)}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"ok": False, "error": f"invalid request: {str(e)}"}
+                else:
+                    response = await self.handle(request)
+                writer.write(json.dumps(response, ensure_ascii=False, default=str).encode('utf-8') + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning(f"Connection closed: {str(e)}")
+        finally:
+            writer.close()
+
+    async def _run(self, function: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def _entry(self, graph_path: str) -> GraphEntry:
+        path = str(Path(graph_path).resolve())
+        # Missing graphs are not registered, so they are not reported as served
+        if not os.path.exists(path):
+            raise ValueError(f"graph {graph_path} does not exist")
+        entry = self.graphs.setdefault(path, GraphEntry(path))
+        async with entry.lock:
+            state = GraphServer._file_state(path)
+            if entry.graph is None or state != entry.state:
+                if entry.graph is not None:
+                    logger.info(f"Graph {path} changed, reloading")
+                try:
+                    entry.graph = await self._run(GraphServer._load_graph, path)
+                except Exception:
+                    if entry.graph is None:
+                        self.graphs.pop(path, None)
+                    raise
+                entry.state = state
+                entry.reachability = {}
+        return entry
+
+    async def _graph_entry(self, params: dict, name: str = "graph") -> GraphEntry:
+        if not params.get(name):
+            raise ValueError(f"parameter '{name}' is required")
+        return await self._entry(params[name])
+
+    async def _graph(self, params: dict, name: str = "graph") -> Graph:
+        return (await self._graph_entry(params, name)).graph
+
+    async def _ping(self, params: dict) -> List[str]:
+        return sorted(self.graphs)
+
+    async def _query(self, params: dict) -> List[dict]:
+        graph = await self._graph(params)
+
+        def run():
+            # Globs are resolved in the worker, the first lookup builds the ID index of the graph
+            query = Query(graph.resolve_ids(params.get("elements", [])), params.get("direction", Direction.OUT),
+                          params.get("depth", 0), params.get("edge_types"), params.get("stop_node_types", []),
+                          params.get("distance", False))
+            return QueryEngine.run(graph, query)
+
+        return await self._run(GraphServer._records, run)
+
+    async def _get_used(self, params: dict) -> List[dict]:
+        graph = await self._graph(params)
+
+        def used():
+            elements = set(graph.resolve_ids(params.get("elements", [])))
+            return GraphServer._elements(self.cache.get_used_nodes(graph, elements, params.get("depth", 0)))
+
+        return await self._run(GraphServer._records, used)
+
+    async def _get_dependent(self, params: dict) -> List[dict]:
+        graph = await self._graph(params)
+
+        def dependent():
+            elements = set(graph.resolve_ids(params.get("elements", [])))
+            return GraphServer._elements(self.cache.get_dependent_nodes(graph, elements, params.get("depth", 0)))
+
+        return await self._run(GraphServer._records, dependent)
+
+    async def _filter(self, params: dict) -> List[dict]:
+        graph = await self._graph(params)
+
+        def apply():
+            return GraphServer._elements(
+                self.cache.filter(graph, params.get("node_types", []), params.get("edge_types", []),
+                                  params.get("node_id_mask", ""), params.get("inv", False), params.get("where", ""),
+                                  params.get("edge_where", "")))
+
+        return await self._run(GraphServer._records, apply)
+
+    async def _diff(self, params: dict) -> List[dict]:
+        first_graph = await self._graph(params)
+        second_graph = await self._graph(params, "other")
+
+        def compare():
+            if params.get("hierarchical", False):
+                difference_graph = GraphComparator.get_difference_hierarchical(first_graph, second_graph)
+            else:
+                difference_graph = GraphComparator.get_difference(first_graph, second_graph)
+            if params.get("detect_moves", False):
+                GraphComparator.detect_moves(difference_graph, params.get("match_names", False))
+            return GraphServer._elements(difference_graph)
+
+        return await self._run(GraphServer._records, compare)
+
+    async def _reach(self, params: dict) -> dict:
+        entry = await self._graph_entry(params)
+        edge_types = tuple(sorted(set(params.get("edge_types") or DEFAULT_REACHABILITY_EDGE_TYPES)))
+        index = entry.reachability.get(edge_types)
+        if index is None:
+            index = await self._run(ReachabilityIndex.build, entry.graph, edge_types)
+            entry.reachability[edge_types] = index
+
+        src, dest = params.get("src", ""), params.get("dest", "")
+        pairs = params.get("pairs", [])
+        result = {"stats": index.stats()}
+        if pairs:
+            result["pairs"] = [GraphServer._reaches_pair(index, pair) for pair in pairs]
+        elif src and dest:
+            result["reaches"] = index.reaches(src, dest)
+        elif src:
+            nodes = index.ancestors(src) if params.get("ancestors", False) else index.descendants(src)
+            result["nodes"] = sorted(nodes - {src})
+        return result
+
+    @staticmethod
+    def _reaches_pair(index: ReachabilityIndex, pair) -> Optional[bool]:
+        """Answers one pair of a batch, a malformed pair gets None instead of failing the whole batch"""
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+            return None
+        try:
+            return index.reaches(*pair)
+        except Exception as e:
+            logger.warning(f"error answer reachability query for {pair}: {str(e)}")
+            return None
+
+    async def _stats(self, params: dict) -> dict:
+        return {"graphs": sorted(self.graphs), "cache": self.cache.stats()}
+
+    @staticmethod
+    def _elements(graph: Graph):
+        yield from graph.get_all_nodes()
+        yield from graph.get_all_edges()
+
+    @staticmethod
+    def _records(elements: Callable[[], Iterable]) -> List[dict]:
+        return [JSONLGraphExporter.to_record(element) for element in elements()]
+
+    @staticmethod
+    def _load_graph(path: str) -> Graph:
+        if Path(path).is_file():
+            return JSONLGraphBuilder.build(path)
+        return CSVGraphBuilder.build(path)
+
+    @staticmethod
+    def _file_state(path: str) -> FileState:
+        state = []
+        for file_path in graph_files(path):
+            stat = file_path.stat()
+            state.append((file_path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(state)
@@ -1,9 +1,9 @@
 import os
 import logging
 import shutil
-from git import Repo, GitCommandError
+from git import Repo, GitCommandError, InvalidGitRepositoryError, NoSuchPathError
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +40,31 @@ class GitHandler:
             logger.error(f"Failed to clone repository: {str(e)}")
             return None
 
+    @staticmethod
+    def changed_files(repo_path: str, rev_range: str) -> Optional[List[str]]:
+        """
+        Lists files changed in a revision range, e.g. 'main..HEAD', or since a single revision, e.g. 'HEAD~3',
+        in which case uncommitted changes of the working tree are included too.
+
+        Paths are relative to the repository root, deleted and renamed files are included.
+        """
+        try:
+            output = Repo(repo_path, search_parent_directories=True).git.diff("--name-only", rev_range)
+        except GitCommandError as e:
+            logger.error(f"Failed to get changed files: {str(e)}")
+            return None
+        return [line for line in output.splitlines() if line]
+
+    @staticmethod
+    def is_revision(repo_path: str, revision: str) -> bool:
+        """Checks whether the string names a commit of the repository, e.g. 'HEAD~3' or a branch."""
+        try:
+            Repo(repo_path, search_parent_directories=True).git.rev_parse("--verify", "--quiet",
+                                                                          f"{revision}^{{commit}}")
+        except (GitCommandError, InvalidGitRepositoryError, NoSuchPathError):
+            return False
+        return True
+
     @staticmethod
     def extract_repo_name(repo_url: str) -> str:
         if repo_url.endswith(".git"):
@@ -0,0 +1,129 @@
+import re
+from typing import Callable, Dict, Generic, List, Optional, Pattern, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Characters that start the non-literal part of a pattern
+WILDCARDS = "*?"
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translates a glob over element ids into a regular expression.
+
+    '**' matches any characters including '/', '**/' also matches no directories at all, '*' matches any
+    characters except '/', '?' matches one character except '/'. All other characters are literal.
+    """
+    parts = []
+    position = 0
+    while position < len(pattern):
+        if pattern.startswith("**/", position):
+            parts.append("(?:.*/)?")
+            position += 3
+        elif pattern.startswith("**", position):
+            parts.append(".*")
+            position += 2
+        elif pattern[position] == "*":
+            parts.append("[^/]*")
+            position += 1
+        elif pattern[position] == "?":
+            parts.append("[^/]")
+            position += 1
+        else:
+            parts.append(re.escape(pattern[position]))
+            position += 1
+    return "".join(parts)
+
+
+def compile_glob(pattern: str) -> Pattern[str]:
+    """Compiles a glob over element ids, see glob_to_regex."""
+    return re.compile(glob_to_regex(pattern), re.DOTALL)
+
+
+def literal_prefix(pattern: str) -> str:
+    """Returns the part of a glob before its first wildcard: every matching id starts with it."""
+    for position, char in enumerate(pattern):
+        if char in WILDCARDS:
+            return pattern[:position]
+    return pattern
+
+
+class GlobTrie(Generic[T]):
+    """
+    Many globs compiled into one matcher. Globs are stored in a character trie under their literal prefixes,
+    so matching an id walks the trie along the id once and tests only the globs whose prefix it starts with,
+    instead of testing every glob. Globs without wildcards and globs of the form '<prefix>**' are decided
+    by the walk itself, without a regular expression.
+    """
+    __slots__ = ('_root', )
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, pattern: str, value: T):
+        """Adds a glob with the value returned when it matches."""
+        prefix = literal_prefix(pattern)
+        node = self._root
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        if prefix == pattern:
+            node.exact.append(value)
+        elif pattern == prefix + "**":
+            node.prefixed.append(value)
+        else:
+            node.patterns.append((compile_glob(pattern), value))
+
+    def match(self, text: str) -> List[T]:
+        """Returns the values of all globs matching the whole text."""
+        result: List[T] = []
+        GlobTrie._walk(self._root, text, 0, result)
+        return result
+
+    def matcher(self, prefix: str) -> Callable[[str], List[T]]:
+        """
+        Returns a matcher of texts starting with the prefix, for matching many texts with a common prefix:
+        the part of the trie along the prefix is walked once, only globs below it are visited per text.
+        """
+        always: List[T] = []
+        patterns: List[Tuple[Pattern[str], T]] = []
+        node: Optional[_TrieNode] = self._root
+        for char in prefix:
+            always.extend(node.prefixed)
+            patterns.extend(node.patterns)
+            node = node.children.get(char)
+            if node is None:
+                break
+
+        def match(text: str) -> List[T]:
+            result = always + [value for regex, value in patterns if regex.fullmatch(text)]
+            if node is not None:
+                GlobTrie._walk(node, text, len(prefix), result)
+            return result
+
+        return match
+
+    @staticmethod
+    def _walk(node: "_TrieNode", text: str, position: int, result: list):
+        while True:
+            result.extend(node.prefixed)
+            for regex, value in node.patterns:
+                if regex.fullmatch(text):
+                    result.append(value)
+            if position == len(text):
+                result.extend(node.exact)
+                return
+            node = node.children.get(text[position])
+            if node is None:
+                return
+            position += 1
+
+
+class _TrieNode:
+    __slots__ = ('children', 'exact', 'prefixed', 'patterns')
+
+    def __init__(self):
+        self.children: Dict[str, _TrieNode] = {}
+        # Globs without wildcards ending here, globs matching anything after this prefix, all other globs
+        self.exact: list = []
+        self.prefixed: list = []
+        self.patterns: List[Tuple[Pattern[str], object]] = []
@@ -1,8 +1,30 @@
 import hashlib
-from typing import List
+from pathlib import Path
+from typing import Iterable, List
+
+READ_CHUNK_SIZE = 1 << 20
 
 
 def stable_hash_from_hashes(hashes: List[str]) -> str:
     hashes.sort()
     combined = '\n'.join(hashes).encode('utf-8')
-    return hashlib.sha256(combined).hexdigest()[0:8]
\ No newline at end of file
+    return hashlib.sha256(combined).hexdigest()[0:8]
+
+
+def stable_multiset_hash(items: Iterable[str]) -> str:
+    total = 0
+    for item in items:
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest()
+        total = (total + int.from_bytes(digest, 'big')) & 0xFFFFFFFFFFFFFFFF
+    return f"{total:016x}"
+
+
+def stable_files_hash(paths: Iterable[Path], extra: str = "") -> str:
+    hasher = hashlib.sha256()
+    for path in paths:
+        hasher.update(path.name.encode('utf-8'))
+        with open(path, 'rb') as f:
+            while chunk := f.read(READ_CHUNK_SIZE):
+                hasher.update(chunk)
+    hasher.update(extra.encode('utf-8'))
+    return hasher.hexdigest()
@@ -0,0 +1,18 @@
+from pathlib import Path
+from typing import List
+
+
+def graph_files(graph_path: str | Path) -> List[Path]:
+    """Returns the files of a graph stored as a directory of CSV files or as a single file."""
+    graph_path = Path(graph_path)
+    if graph_path.is_dir():
+        return sorted(path for path in graph_path.iterdir() if path.suffix == ".csv")
+    return [graph_path]
+
+
+def sidecar_path(graph_path: str | Path, file_name: str) -> Path:
+    """Returns the path of an auxiliary file stored next to a graph: inside its directory or beside its file."""
+    graph_path = Path(graph_path)
+    if graph_path.is_dir():
+        return graph_path / file_name
+    return graph_path.with_name(f"{graph_path.name}.{file_name}")
@@ -0,0 +1,38 @@
+import pytest
+
+from core.graph.bulk import NUMPY_INSTALLED
+from core.graph.hasher import Hasher
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def make_graph():
+    """Returns a factory of graphs: root/ file.py/ a, b, c; a use b (and b use c if extra_use)"""
+
+    def make(extra_use: bool = False) -> Graph:
+        graph = Graph()
+        graph.add_node(Node("root", "root", TypeNode.DIRECTORY))
+        graph.add_node(Node("file.py", "file.py", TypeNode.FILE))
+        graph.add_edge(Edge("root", "file.py", TypeEdge.CONTAIN, TypeSource.CODE))
+        for node_id in ["a", "b", "c"]:
+            graph.add_node(Node(node_id, node_id, TypeNode.FUNC, f"hash_{node_id}"))
+            graph.add_edge(Edge("file.py", node_id, TypeEdge.CONTAIN, TypeSource.CODE))
+        graph.add_edge(Edge("a", "b", TypeEdge.USE, TypeSource.CODE))
+        if extra_use:
+            graph.add_edge(Edge("b", "c", TypeEdge.USE, TypeSource.CODE))
+        return Hasher.recalculate(graph)
+
+    return make
+
+
+@pytest.fixture(params=[
+    pytest.param(True, id="numpy", marks=pytest.mark.skipif(not NUMPY_INSTALLED, reason="NumPy is not installed")),
+    pytest.param(False, id="python")
+])
+def use_numpy(request) -> bool:
+    """Runs a test with and without NumPy"""
+    return request.param
@@ -0,0 +1,73 @@
+import pytest
+
+from core.graph.affected_tests import AffectedTestsIndex, INDEX_FILE_NAME
+from core.graph.builder import CSVGraphBuilder
+from core.graph.components import ComponentFinder
+from core.graph.exporter import CSVGraphExporter
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def project_graph():
+    """Creates a graph with the following structure:
+    a.py/ a1 <-> b.py/ b1 (cycle), c.py/ c1 uses nothing
+    tests/test_a.py/ t_a uses b1
+    test_c.py/ t_c uses c1
+    """
+    graph = Graph()
+    files = [("a.py", "a1"), ("b.py", "b1"), ("c.py", "c1"), ("tests/test_a.py", "t_a"), ("test_c.py", "t_c")]
+    for file_id, entity in files:
+        graph.add_node(Node(file_id, file_id.rsplit('/', 1)[-1], TypeNode.FILE))
+        graph.add_node(Node(f"{file_id}#{entity}", entity, TypeNode.FUNC))
+        graph.add_edge(Edge(file_id, f"{file_id}#{entity}", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("a.py#a1", "b.py#b1", TypeEdge.USE, TypeSource.CODE))
+    graph.add_edge(Edge("b.py#b1", "a.py#a1", TypeEdge.USE, TypeSource.CODE))
+    graph.add_edge(Edge("tests/test_a.py#t_a", "b.py#b1", TypeEdge.USE, TypeSource.CODE))
+    graph.add_edge(Edge("test_c.py#t_c", "c.py#c1", TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_strongly_connected(project_graph: Graph):
+    """Test that a cycle forms one component listed before its users"""
+    components = ComponentFinder.strongly_connected(project_graph, [TypeEdge.USE])
+    position = {node_id: number for number, component in enumerate(components) for node_id in component}
+
+    assert sorted(components[position["a.py#a1"]]) == ["a.py#a1", "b.py#b1"]
+    assert position["b.py#b1"] < position["tests/test_a.py#t_a"]
+    assert len(components) == len(project_graph.nodes) - 1
+
+
+def test_select_through_cycle(project_graph: Graph):
+    """Test that tests using any node of a cycle are selected for a change in the cycle"""
+    index = AffectedTestsIndex.build(project_graph)
+
+    assert index.tests == ["test_c.py", "tests/test_a.py"]
+    assert index.select(["a.py"]) == ["tests/test_a.py"]
+    assert index.select(["c.py", "missing.py"]) == ["test_c.py"]
+    assert index.select(["tests/test_new.py"]) == ["tests/test_new.py"]
+
+
+def test_index_reused_until_graph_changes(tmp_path, project_graph: Graph):
+    """Test that the stored index is used without building the graph while graph files are unchanged"""
+    CSVGraphExporter.save(project_graph, str(tmp_path))
+    built = []
+
+    def build_graph(path):
+        built.append(path)
+        return CSVGraphBuilder.build(path)
+
+    first = AffectedTestsIndex.load_or_build(tmp_path, build_graph)
+    second = AffectedTestsIndex.load_or_build(tmp_path, build_graph)
+    assert (tmp_path / INDEX_FILE_NAME).exists()
+    assert len(built) == 1
+    assert second.files == first.files
+
+    project_graph.add_edge(Edge("test_c.py#t_c", "a.py#a1", TypeEdge.USE, TypeSource.CODE))
+    CSVGraphExporter.save(project_graph, str(tmp_path))
+    third = AffectedTestsIndex.load_or_build(tmp_path, build_graph)
+    assert len(built) == 2
+    assert third.select(["a.py"]) == ["test_c.py", "tests/test_a.py"]
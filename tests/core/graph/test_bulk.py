@@ -0,0 +1,58 @@
+import pytest
+
+from core.graph.bulk import BulkReachability, CSRAdjacency
+from core.graph.query import Direction
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def layered_graph():
+    """Creates a graph with the following structure:
+    file.py/ f0..f5
+    f0 use f1, f1 use f2, f2 use f0, f2 use f3, f3 use f4, f5 use f4
+    """
+    graph = Graph()
+    graph.add_node(Node("file.py", "file.py", TypeNode.FILE))
+    for number in range(6):
+        graph.add_node(Node(f"f{number}", f"f{number}", TypeNode.FUNC))
+        graph.add_edge(Edge("file.py", f"f{number}", TypeEdge.CONTAIN, TypeSource.CODE))
+    for src, dest in [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (5, 4)]:
+        graph.add_edge(Edge(f"f{src}", f"f{dest}", TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_reachable_counts(layered_graph: Graph, use_numpy: bool):
+    """Test that counts of reachable elements match for every source and both directions"""
+    counts = BulkReachability.reachable_counts(layered_graph,
+                                               edge_types=[TypeEdge.USE],
+                                               batch_size=64,
+                                               use_numpy=use_numpy)
+    assert counts == {"file.py": 0, "f0": 4, "f1": 4, "f2": 4, "f3": 1, "f4": 0, "f5": 1}
+
+    fan_in = BulkReachability.reachable_counts(layered_graph, ["f4", "f0"], 0, [TypeEdge.USE], Direction.IN,
+                                               use_numpy=use_numpy)
+    assert fan_in == {"f4": 5, "f0": 2}
+
+
+def test_neighbourhoods(layered_graph: Graph, use_numpy: bool):
+    """Test that k-hop neighbourhoods follow the direction and the hop limit"""
+    result = BulkReachability.neighbourhoods(layered_graph, ["f0", "f4"],
+                                             hops=2,
+                                             edge_types=[TypeEdge.USE],
+                                             direction=Direction.BOTH,
+                                             use_numpy=use_numpy)
+
+    assert result == {"f0": {"f1", "f2", "f3"}, "f4": {"f3", "f5", "f2"}}
+
+
+def test_csr_adjacency(layered_graph: Graph):
+    """Test that the adjacency has sorted neighbours without repeated edges"""
+    adjacency = CSRAdjacency.build(layered_graph, [TypeEdge.USE], Direction.IN, use_numpy=False)
+    number = adjacency.index["f4"]
+    neighbours = adjacency.indices[adjacency.indptr[number]:adjacency.indptr[number + 1]]
+
+    assert [adjacency.ids[neighbour] for neighbour in neighbours] == ["f3", "f5"]
@@ -0,0 +1,64 @@
+import pytest
+
+from core.graph.centrality import Centrality
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def star_graph():
+    """Creates a graph with the following structure:
+    file.py/ hub, f0..f3
+    f0..f3 use hub, hub use f0
+    """
+    graph = Graph()
+    graph.add_node(Node("file.py", "file.py", TypeNode.FILE))
+    for node_id in ["hub", "f0", "f1", "f2", "f3"]:
+        graph.add_node(Node(node_id, node_id, TypeNode.FUNC))
+        graph.add_edge(Edge("file.py", node_id, TypeEdge.CONTAIN, TypeSource.CODE))
+    for number in range(4):
+        graph.add_edge(Edge(f"f{number}", "hub", TypeEdge.USE, TypeSource.CODE))
+    graph.add_edge(Edge("hub", "f0", TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+@pytest.fixture
+def chain_graph():
+    """Creates a graph with the following structure:
+    a use b, b use c, c use d, a use e, e use d
+    """
+    graph = Graph()
+    for node_id in "abcde":
+        graph.add_node(Node(node_id, node_id, TypeNode.FUNC))
+    for src, dest in [("a", "b"), ("b", "c"), ("c", "d"), ("a", "e"), ("e", "d")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_pagerank(star_graph: Graph, use_numpy: bool):
+    """Test that ranks sum to one and the most used element ranks highest"""
+    ranks = Centrality.pagerank(star_graph, use_numpy=use_numpy)
+
+    assert sum(ranks.values()) == pytest.approx(1.0)
+    assert max(ranks, key=ranks.get) == "hub"
+    assert ranks["f0"] > ranks["f1"] == pytest.approx(ranks["f2"])
+
+
+def test_exact_betweenness(chain_graph: Graph, use_numpy: bool):
+    """Test that with every element sampled the values count shortest paths passing through elements"""
+    values = Centrality.betweenness(chain_graph, samples=5, use_numpy=use_numpy)
+
+    # a -> d has the shortest path through e only, a -> c passes through b
+    assert values == pytest.approx({"a": 0.0, "b": 1.0, "c": 1.0, "d": 0.0, "e": 1.0})
+
+
+def test_sampled_betweenness(star_graph: Graph):
+    """Test that the sampled estimate is reproducible and does not depend on NumPy"""
+    first = Centrality.betweenness(star_graph, samples=3, seed=7)
+    second = Centrality.betweenness(star_graph, samples=3, seed=7, use_numpy=False)
+
+    assert first == pytest.approx(second)
+    assert Centrality.betweenness(Graph()) == {}
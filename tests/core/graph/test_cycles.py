@@ -0,0 +1,67 @@
+import pytest
+
+from core.graph.components import ComponentFinder
+from core.graph.cycles import CycleDetector, CycleLevel
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def cyclic_graph():
+    """Creates a graph with the following structure:
+    a.py/ a1, a2; b.py/ b1; c.py/ c1
+    a1 use b1, b1 use c1, c1 use a1 (cycle of three), a2 use a1, c1 use a2 (shorter cycle through a1)
+    """
+    graph = Graph()
+    for file_id, entities in [("a.py", ["a1", "a2"]), ("b.py", ["b1"]), ("c.py", ["c1"])]:
+        graph.add_node(Node(file_id, file_id, TypeNode.FILE))
+        for entity in entities:
+            graph.add_node(Node(entity, entity, TypeNode.FUNC))
+            graph.add_edge(Edge(file_id, entity, TypeEdge.CONTAIN, TypeSource.CODE))
+    for src, dest in [("a1", "b1"), ("b1", "c1"), ("c1", "a1"), ("a2", "a1"), ("c1", "a2")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_entity_cycles(cyclic_graph: Graph):
+    """Test that a component is reported with its shortest cycle and a cut that breaks all cycles"""
+    cycles = CycleDetector.find(cyclic_graph)
+
+    assert len(cycles) == 1
+    assert cycles[0].nodes == ["a1", "a2", "b1", "c1"]
+    assert cycles[0].path == ["a1", "b1", "c1", "a1"]
+
+    for src, dest in cycles[0].cut:
+        cyclic_graph.remove_edge(next(edge for edge in cyclic_graph.get_edges_out(src) if edge.dest == dest))
+    assert CycleDetector.find(cyclic_graph) == []
+
+
+def test_file_cycles(cyclic_graph: Graph):
+    """Test that cycles are found between files aggregated from their elements"""
+    file_graph = ComponentFinder.aggregate_by_file(cyclic_graph, [TypeEdge.USE])
+    assert sorted((edge.src, edge.dest) for edge in file_graph.get_all_edges()) == [("a.py", "b.py"),
+                                                                                   ("b.py", "c.py"),
+                                                                                   ("c.py", "a.py")]
+
+    cycles = CycleDetector.find(cyclic_graph, level=CycleLevel.FILE)
+    assert [cycle.nodes for cycle in cycles] == [["a.py", "b.py", "c.py"]]
+    assert len(cycles[0].cut) == 1
+
+
+def test_feedback_edges_acyclic_after_cut():
+    """Test that the suggested cut leaves no cycle in a dense component"""
+    successors = {f"n{i}": sorted(f"n{j}" for j in range(6) if j != i) for i in range(6)}
+    cut = set(CycleDetector.feedback_edges(successors))
+
+    graph = Graph()
+    for node_id in successors:
+        graph.add_node(Node(node_id, node_id, TypeNode.FUNC))
+    for node_id, dests in successors.items():
+        for dest in dests:
+            if (node_id, dest) not in cut:
+                graph.add_edge(Edge(node_id, dest, TypeEdge.USE, TypeSource.CODE))
+    assert all(len(component) == 1 for component in ComponentFinder.strongly_connected(graph))
+    assert len(cut) == 15
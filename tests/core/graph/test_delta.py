@@ -0,0 +1,130 @@
+from copy import deepcopy
+import pytest
+
+from core.graph.delta import DeltaCalculator
+from core.graph.difference import GraphComparator, DIFFERENCE_STATUS_FIELD
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def sample_graph():
+    """Creates a sample graph with the following structure:
+    directory1/
+        file1.py/
+            code1
+            code2
+        file2.py/
+            code3
+    code3 use code2
+    """
+    graph = Graph()
+
+    for node in [
+            Node("dir1", "directory1", TypeNode.DIRECTORY, "h_dir1"),
+            Node("file1", "file1.py", TypeNode.FILE, "h_file1"),
+            Node("file2", "file2.py", TypeNode.FILE, "h_file2"),
+            Node("code1", "code1", TypeNode.CLASS, "h_code1"),
+            Node("code2", "code2", TypeNode.CLASS, "h_code2"),
+            Node("code3", "code3", TypeNode.CLASS, "h_code3"),
+    ]:
+        graph.add_node(node)
+
+    for edge in [
+            Edge("code3", "code2", TypeEdge.USE, TypeSource.CODE),
+            Edge("dir1", "file1", TypeEdge.CONTAIN, TypeSource.CODE),
+            Edge("dir1", "file2", TypeEdge.CONTAIN, TypeSource.CODE),
+            Edge("file1", "code1", TypeEdge.CONTAIN, TypeSource.CODE),
+            Edge("file1", "code2", TypeEdge.CONTAIN, TypeSource.CODE),
+            Edge("file2", "code3", TypeEdge.CONTAIN, TypeSource.CODE),
+    ]:
+        graph.add_edge(edge)
+
+    return graph
+
+
+@pytest.fixture
+def changed_graph(sample_graph: Graph):
+    """sample_graph with code3 deleted, code1 changed and code4 (using code1) added to file1"""
+    graph = deepcopy(sample_graph)
+    graph.remove_node("code3")
+    graph.get_node("code1").hash = "h_code1_modified"
+    graph.add_node(Node("code4", "code4", TypeNode.FUNC, "h_code4"))
+    graph.add_edge(Edge("file1", "code4", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("code4", "code1", TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def _snapshot(graph: Graph):
+    nodes = {node.id: (node.name, node.type, node.hash, node.source) for node in graph.get_all_nodes()}
+    return nodes, set(graph.get_all_edges())
+
+
+def test_compute_delta(sample_graph: Graph, changed_graph: Graph):
+    """Test that the delta contains only changed elements"""
+    delta = DeltaCalculator.compute(sample_graph, changed_graph)
+
+    assert set(delta.added_nodes) == {"code4"}
+    assert set(delta.removed_nodes) == {"code3"}
+    assert set(delta.changed_nodes) == {"code1"}
+    assert delta.added_edges == {
+        Edge("file1", "code4", TypeEdge.CONTAIN, TypeSource.CODE),
+        Edge("code4", "code1", TypeEdge.USE, TypeSource.CODE),
+    }
+    assert delta.removed_edges == {
+        Edge("code3", "code2", TypeEdge.USE, TypeSource.CODE),
+        Edge("file2", "code3", TypeEdge.CONTAIN, TypeSource.CODE),
+    }
+
+
+def test_compute_delta_identical_graphs(sample_graph: Graph):
+    """Test that identical graphs give an empty delta"""
+    assert DeltaCalculator.compute(sample_graph, deepcopy(sample_graph)).is_empty()
+
+
+def test_apply_delta(sample_graph: Graph, changed_graph: Graph):
+    """Test that applying the delta to the old graph reproduces the new graph"""
+    delta = DeltaCalculator.compute(sample_graph, changed_graph)
+
+    patched = DeltaCalculator.apply(deepcopy(sample_graph), delta)
+
+    assert _snapshot(patched) == _snapshot(changed_graph)
+
+
+def test_compose_deltas(sample_graph: Graph, changed_graph: Graph):
+    """Test that a composed delta equals the sequential application of its parts"""
+    third_graph = deepcopy(changed_graph)
+    third_graph.remove_node("code4")
+    third_graph.add_node(Node("code3", "code3", TypeNode.CLASS, "h_code3_restored"))
+    third_graph.add_edge(Edge("file2", "code3", TypeEdge.CONTAIN, TypeSource.CODE))
+
+    first = DeltaCalculator.compute(sample_graph, changed_graph)
+    second = DeltaCalculator.compute(changed_graph, third_graph)
+    composed = DeltaCalculator.compose(first, second)
+
+    assert set(composed.added_nodes) == set()
+    assert set(composed.removed_nodes) == set()
+    assert set(composed.changed_nodes) == {"code1", "code3"}
+    assert composed.added_edges == set()
+    assert composed.removed_edges == {Edge("code3", "code2", TypeEdge.USE, TypeSource.CODE)}
+
+    patched = DeltaCalculator.apply(deepcopy(sample_graph), composed)
+    assert _snapshot(patched) == _snapshot(third_graph)
+
+
+def test_difference_from_delta(sample_graph: Graph, changed_graph: Graph):
+    """Test that the difference built from a delta matches the full comparison"""
+    delta = DeltaCalculator.compute(sample_graph, changed_graph)
+
+    from_delta = GraphComparator.get_difference_from_delta(changed_graph, delta)
+    full = GraphComparator.get_difference(sample_graph, changed_graph)
+
+    def statuses(graph: Graph):
+        nodes = {node.id: node.meta[DIFFERENCE_STATUS_FIELD] for node in graph.get_all_nodes()}
+        edges = {edge: edge.meta[DIFFERENCE_STATUS_FIELD] for edge in graph.get_all_edges()}
+        return nodes, edges
+
+    assert statuses(from_delta) == statuses(full)
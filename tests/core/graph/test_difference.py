@@ -1,10 +1,14 @@
 from copy import deepcopy
 import pytest
 
-from core.graph.difference import GraphComparator, TypeDiff, DIFFERENCE_STATUS_FIELD
+from core.graph.builder import CSVGraphBuilder
+from core.graph.difference import GraphComparator, TypeDiff, DIFFERENCE_STATUS_FIELD, MOVED_FROM_FIELD
+from core.graph.exporter import CSVGraphExporter
+from core.graph.filters import CommonFilter
+from core.graph.hasher import Hasher
 
 from core.models.graph import Graph
-from core.models.node import Node, TypeNode
+from core.models.node import Node, TypeNode, ROOT_NODE_NAME
 from core.models.edge import Edge, TypeEdge
 from core.models.common import TypeSource
 
@@ -138,4 +142,163 @@ def test_get_difference_changed_node(sample_graph: Graph):
         if node.id != "code1":
             node = diff_graph.get_node(node.id)
             assert node is not None
-            assert node.meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.UNCHACHGED 
\ No newline at end of file
+            assert node.meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.UNCHACHGED 
+
+@pytest.fixture
+def hashed_graph():
+    """Creates a graph with up-to-date hashes and the following structure:
+    root/
+        directory1/
+            file1.py/
+                code1
+                code2
+        file2.py/
+            code3
+    arch_element1 (contains code1)
+    code3 use code2
+    """
+    graph = Graph()
+
+    for node in [
+            Node(ROOT_NODE_NAME, ROOT_NODE_NAME, TypeNode.DIRECTORY),
+            Node("dir1", "directory1", TypeNode.DIRECTORY),
+            Node("dir1/file1", "file1.py", TypeNode.FILE),
+            Node("file2", "file2.py", TypeNode.FILE),
+            Node("dir1/file1#code1", "code1", TypeNode.CLASS, "h_code1"),
+            Node("dir1/file1#code2", "code2", TypeNode.CLASS, "h_code2"),
+            Node("file2#code3", "code3", TypeNode.CLASS, "h_code3"),
+            Node("arch1", "arch_element1", TypeNode.ARC_ELEMENT, source=TypeSource.HAND),
+    ]:
+        graph.add_node(node)
+
+    for src, dest in [(ROOT_NODE_NAME, "dir1"), (ROOT_NODE_NAME, "file2"), ("dir1", "dir1/file1"),
+                      ("dir1/file1", "dir1/file1#code1"), ("dir1/file1", "dir1/file1#code2"),
+                      ("file2", "file2#code3")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("arch1", "dir1/file1#code1", TypeEdge.CONTAIN, TypeSource.HAND))
+    graph.add_edge(Edge("file2#code3", "dir1/file1#code2", TypeEdge.USE, TypeSource.CODE))
+
+    return Hasher.recalculate(graph)
+
+
+def _statuses(graph: Graph):
+    nodes = {node.id: node.meta[DIFFERENCE_STATUS_FIELD] for node in graph.get_all_nodes()}
+    edges = {edge: edge.meta[DIFFERENCE_STATUS_FIELD] for edge in graph.get_all_edges()}
+    return nodes, edges
+
+
+def test_hierarchical_difference_matches_full(hashed_graph: Graph):
+    """Test that the hierarchical difference gives the same statuses as the full comparison"""
+    new_graph = deepcopy(hashed_graph)
+    new_graph.remove_node("dir1/file1#code2")
+    new_graph.get_node("file2#code3").hash = "h_code3_modified"
+    new_graph.add_node(Node("file3", "file3.py", TypeNode.FILE))
+    new_graph.add_node(Node("file3#code4", "code4", TypeNode.FUNC, "h_code4"))
+    new_graph.add_edge(Edge(ROOT_NODE_NAME, "file3", TypeEdge.CONTAIN, TypeSource.CODE))
+    new_graph.add_edge(Edge("file3", "file3#code4", TypeEdge.CONTAIN, TypeSource.CODE))
+    new_graph.add_edge(Edge("file3#code4", "dir1/file1#code1", TypeEdge.USE, TypeSource.CODE))
+    new_graph.add_node(Node("arch2", "arch_element2", TypeNode.ARC_ELEMENT, source=TypeSource.HAND))
+    Hasher.recalculate(new_graph)
+
+    hierarchical = GraphComparator.get_difference_hierarchical(hashed_graph, new_graph)
+
+    assert _statuses(hierarchical) == _statuses(GraphComparator.get_difference(hashed_graph, new_graph))
+    assert hierarchical.get_node("dir1/file1#code2").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.DELETED
+    assert hierarchical.get_node("arch2").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.NEW
+
+
+def test_identical_graphs_fast_path(hashed_graph: Graph):
+    """Test that identical graphs are detected and marked unchanged"""
+    new_graph = deepcopy(hashed_graph)
+
+    assert GraphComparator.is_identical(hashed_graph, new_graph)
+    diff_graph = GraphComparator.get_difference_hierarchical(hashed_graph, new_graph)
+    assert set(_statuses(diff_graph)[0].values()) == {TypeDiff.UNCHACHGED}
+    assert set(_statuses(diff_graph)[1].values()) == {TypeDiff.UNCHACHGED}
+
+    new_graph.add_edge(Edge("dir1/file1#code1", "dir1/file1#code2", TypeEdge.USE, TypeSource.CODE))
+    assert not GraphComparator.is_identical(hashed_graph, new_graph)
+
+
+def test_changed_nodes_skip_equal_subtrees(hashed_graph: Graph):
+    """Test that subtrees with equal hashes are not examined"""
+    new_graph = deepcopy(hashed_graph)
+    new_graph.get_node("file2#code3").hash = "h_code3_modified"
+    Hasher.recalculate(new_graph)
+    # Not visible through the hash of directory1, so it must not be examined
+    new_graph.get_node("dir1/file1#code1").hash = "inconsistent"
+
+    statuses = GraphComparator.get_changed_nodes(hashed_graph, new_graph)
+
+    assert statuses == {
+        ROOT_NODE_NAME: TypeDiff.CHANGED,
+        "file2": TypeDiff.CHANGED,
+        "file2#code3": TypeDiff.CHANGED,
+    }
+
+
+def test_hierarchical_difference_detached_nodes(hashed_graph: Graph):
+    """Test that code nodes detached from the root by a filter are compared and fingerprinted"""
+    new_graph = deepcopy(hashed_graph)
+    new_graph.get_node("file2#code3").hash = "h_code3_modified"
+    Hasher.recalculate(new_graph)
+    old_filtered = CommonFilter.apply(hashed_graph, nodes_types=[TypeNode.DIRECTORY, TypeNode.CLASS])
+    new_filtered = CommonFilter.apply(new_graph, nodes_types=[TypeNode.DIRECTORY, TypeNode.CLASS])
+
+    hierarchical = GraphComparator.get_difference_hierarchical(old_filtered, new_filtered)
+
+    assert _statuses(hierarchical) == _statuses(GraphComparator.get_difference(old_filtered, new_filtered))
+    assert hierarchical.get_node("file2#code3").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.CHANGED
+
+    # The root hash doesn't cover the detached nodes, only the fingerprint does
+    same_root = deepcopy(old_filtered)
+    same_root.get_node("file2#code3").hash = "h_code3_modified"
+    assert not GraphComparator.is_identical(old_filtered, same_root)
+
+
+def test_detect_moves(tmp_path, hashed_graph: Graph):
+    """Test that a function moved to another file and a renamed file are reported as moved"""
+    new_graph = deepcopy(hashed_graph)
+    new_graph.remove_node("dir1/file1#code1")
+    new_graph.add_node(Node("file2#code1", "code1", TypeNode.CLASS, "h_code1"))
+    new_graph.add_edge(Edge("file2", "file2#code1", TypeEdge.CONTAIN, TypeSource.CODE))
+    new_graph.add_edge(Edge("arch1", "file2#code1", TypeEdge.CONTAIN, TypeSource.HAND))
+    new_graph.remove_node("dir1/file1")
+    new_graph.add_node(Node("dir1/renamed", "renamed.py", TypeNode.FILE))
+    new_graph.add_node(Node("dir1/renamed#code2", "code2", TypeNode.CLASS, "h_code2"))
+    new_graph.add_edge(Edge("dir1", "dir1/renamed", TypeEdge.CONTAIN, TypeSource.CODE))
+    new_graph.add_edge(Edge("dir1/renamed", "dir1/renamed#code2", TypeEdge.CONTAIN, TypeSource.CODE))
+    new_graph.remove_node("dir1/file1#code2")
+    Hasher.recalculate(new_graph)
+
+    diff_graph = GraphComparator.get_difference(hashed_graph, new_graph)
+    moves = GraphComparator.detect_moves(diff_graph)
+
+    assert moves == {"dir1/file1#code1": "file2#code1", "dir1/file1#code2": "dir1/renamed#code2"}
+    assert diff_graph.get_node("file2#code1").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.MOVED
+    assert diff_graph.get_node("file2#code1").meta[MOVED_FROM_FIELD] == "dir1/file1#code1"
+    assert diff_graph.get_node("dir1/file1#code1") is None
+
+    statuses = {(edge.src, edge.dest): edge.meta[DIFFERENCE_STATUS_FIELD] for edge in diff_graph.get_all_edges()}
+    assert statuses[("arch1", "file2#code1")] == TypeDiff.MOVED
+    assert statuses[("dir1/file1", "file2#code1")] == TypeDiff.DELETED
+    assert statuses[("file2", "file2#code1")] == TypeDiff.NEW
+    # The edge from code3 to code2 was lost, since code3 is not changed to use the moved code2
+    assert statuses[("file2#code3", "dir1/renamed#code2")] == TypeDiff.DELETED
+
+    CSVGraphExporter.save_diff(diff_graph, str(tmp_path))
+    assert CSVGraphBuilder.build_diff(str(tmp_path)).get_node("file2#code1").meta == diff_graph.get_node(
+        "file2#code1").meta
+
+
+def test_detect_moves_by_name(hashed_graph: Graph):
+    """Test that elements moved with changes are paired by name only when asked to"""
+    new_graph = deepcopy(hashed_graph)
+    new_graph.remove_node("file2#code3")
+    new_graph.add_node(Node("dir1/file1#code3", "code3", TypeNode.CLASS, "h_code3_modified"))
+    new_graph.add_edge(Edge("dir1/file1", "dir1/file1#code3", TypeEdge.CONTAIN, TypeSource.CODE))
+    Hasher.recalculate(new_graph)
+
+    diff_graph = GraphComparator.get_difference(hashed_graph, new_graph)
+    assert GraphComparator.detect_moves(deepcopy(diff_graph)) == {}
+    assert GraphComparator.detect_moves(diff_graph, match_names=True) == {"file2#code3": "dir1/file1#code3"}
@@ -304,4 +304,29 @@ def test_invalid_type_handling(complex_graph: Graph):
                                       edges_types=["INVALID_TYPE", TypeEdge.USE])
     
     for edge in filtered_graph.get_all_edges():
-        assert edge.type == TypeEdge.USE 
\ No newline at end of file
+        assert edge.type == TypeEdge.USE 
+
+
+def test_filter_expressions(complex_graph: Graph):
+    """Test filtering with node and edge expressions combining predicates"""
+    filtered_graph = CommonFilter.apply(complex_graph,
+                                        node_where="type in (class, func) and not (id ~ 'class*' and name = class3)",
+                                        edge_where="type = use or src ~ file?")
+
+    assert {node.id for node in filtered_graph.get_all_nodes()} == {"class1", "class2", "func1", "func2"}
+    assert {(edge.src, edge.dest) for edge in filtered_graph.get_all_edges()} == {("class2", "class1"),
+                                                                                  ("func2", "func1")}
+
+    # Expressions are combined with the other criteria
+    filtered_graph = CommonFilter.apply(complex_graph, nodes_types=[TypeNode.FILE], node_where="id != file2")
+    assert {node.id for node in filtered_graph.get_all_nodes()} == {"file1", "file3"}
+
+
+def test_invalid_filter_expressions(complex_graph: Graph):
+    """Test that unknown fields and malformed expressions are reported"""
+    for expression in ["kind = class", "type = class and", "type in class", "(type = class", "id ~ 'a' extra"]:
+        with pytest.raises(Exception, match="invalid filter expression"):
+            CommonFilter.apply(complex_graph, node_where=expression)
+
+    with pytest.raises(Exception, match="unknown field"):
+        CommonFilter.apply(complex_graph, edge_where="name = x")
@@ -0,0 +1,195 @@
+import pytest
+
+from core.graph.builder import CSVGraphBuilder
+from core.graph.exporter import CSVGraphExporter
+from core.graph.hasher import Hasher
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode, ROOT_NODE_NAME
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+from utils.hash import stable_hash_from_hashes
+
+
+@pytest.fixture
+def sample_graph():
+    """Creates a sample graph with the following structure:
+    root/
+        dir1/
+            file1.py/
+                code1
+                code2
+        file2.py/
+            code3
+    arch1 (contains code1, code3)
+    use_case1 (contains arch1)
+    """
+    graph = Graph()
+
+    for node in [
+            Node(ROOT_NODE_NAME, ROOT_NODE_NAME, TypeNode.DIRECTORY),
+            Node("dir1", "dir1", TypeNode.DIRECTORY),
+            Node("file1", "file1.py", TypeNode.FILE),
+            Node("file2", "file2.py", TypeNode.FILE),
+            Node("code1", "code1", TypeNode.CLASS, "h1"),
+            Node("code2", "code2", TypeNode.FUNC, "h2"),
+            Node("code3", "code3", TypeNode.BODY, "h3"),
+            Node("arch1", "arch1", TypeNode.ARC_ELEMENT, source=TypeSource.HAND),
+            Node("use_case1", "use_case1", TypeNode.USE_CASE, source=TypeSource.HAND),
+    ]:
+        graph.add_node(node)
+
+    for src, dest in [(ROOT_NODE_NAME, "dir1"), (ROOT_NODE_NAME, "file2"), ("dir1", "file1"), ("file1", "code1"),
+                      ("file1", "code2"), ("file2", "code3"), ("arch1", "code1"), ("arch1", "code3"),
+                      ("use_case1", "arch1")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.CONTAIN))
+
+    return graph
+
+
+def test_recalculate_hashes(sample_graph: Graph):
+    """Test that every non-code node gets the hash of its contained nodes"""
+    Hasher.recalculate(sample_graph)
+
+    file1_hash = stable_hash_from_hashes(["code1:h1", "code2:h2"])
+    file2_hash = stable_hash_from_hashes(["code3:h3"])
+    dir1_hash = stable_hash_from_hashes([f"file1.py:{file1_hash}"])
+    arch1_hash = stable_hash_from_hashes(["code1:h1", "code3:h3"])
+
+    assert sample_graph.get_node("file1").hash == file1_hash
+    assert sample_graph.get_node("file2").hash == file2_hash
+    assert sample_graph.get_node("dir1").hash == dir1_hash
+    assert sample_graph.get_node(ROOT_NODE_NAME).hash == stable_hash_from_hashes(
+        [f"dir1:{dir1_hash}", f"file2.py:{file2_hash}"])
+    assert sample_graph.get_node("arch1").hash == arch1_hash
+    assert sample_graph.get_node("use_case1").hash == stable_hash_from_hashes([f"arch1:{arch1_hash}"])
+    assert sample_graph.get_node("code1").hash == "h1"
+
+
+def test_recalculate_resets_stale_hashes(sample_graph: Graph):
+    """Test that previous hashes of non-code nodes are not reused"""
+    Hasher.recalculate(sample_graph)
+    expected = {node.id: node.hash for node in sample_graph.get_all_nodes()}
+
+    for node_id in ["file1", "arch1", "use_case1"]:
+        sample_graph.get_node(node_id).hash = "stale"
+    Hasher.recalculate(sample_graph)
+
+    assert {node.id: node.hash for node in sample_graph.get_all_nodes()} == expected
+
+
+def test_shared_child_contributes_to_every_parent(sample_graph: Graph):
+    """Test that an element contained by several parents is hashed once and used by each of them"""
+    sample_graph.add_node(Node("use_case2", "use_case2", TypeNode.USE_CASE, source=TypeSource.HAND))
+    sample_graph.add_edge(Edge("use_case2", "arch1", TypeEdge.CONTAIN))
+
+    Hasher.recalculate(sample_graph)
+
+    assert sample_graph.get_node("use_case1").hash == sample_graph.get_node("use_case2").hash
+    assert sample_graph.get_node("use_case1").hash == stable_hash_from_hashes(
+        [f"arch1:{sample_graph.get_node('arch1').hash}"])
+
+
+def test_deep_hierarchy(sample_graph: Graph):
+    """Test that hierarchies deeper than the recursion limit are hashed"""
+    parent_id = "dir1"
+    for i in range(5000):
+        node_id = f"{parent_id}/sub{i}"
+        sample_graph.add_node(Node(node_id, f"sub{i}", TypeNode.DIRECTORY))
+        sample_graph.add_edge(Edge(parent_id, node_id, TypeEdge.CONTAIN))
+        parent_id = node_id
+    sample_graph.add_node(Node("deep_code", "deep_code", TypeNode.FUNC, "h_deep"))
+    sample_graph.add_edge(Edge(parent_id, "deep_code", TypeEdge.CONTAIN))
+
+    Hasher.recalculate(sample_graph)
+
+    assert sample_graph.get_node(parent_id).hash == stable_hash_from_hashes(["deep_code:h_deep"])
+    assert sample_graph.get_node(ROOT_NODE_NAME).hash != ""
+
+
+def test_contain_cycle_terminates(sample_graph: Graph):
+    """Test that a contain cycle among hand-added elements is cut instead of recursing forever"""
+    sample_graph.add_edge(Edge("arch1", "use_case1", TypeEdge.CONTAIN))
+
+    Hasher.recalculate(sample_graph)
+
+    assert sample_graph.get_node("arch1").hash != ""
+    assert sample_graph.get_node("use_case1").hash != ""
+
+
+def _hashes(graph: Graph):
+    return {node.id: node.hash for node in graph.get_all_nodes()}
+
+
+def test_update_matches_full_recalculation(sample_graph: Graph):
+    """Test that incremental update after a code change gives the same hashes as full recalculation"""
+    Hasher.recalculate(sample_graph)
+
+    sample_graph.get_node("code1").hash = "h1_modified"
+    Hasher.update(sample_graph, ["code1"])
+    updated = _hashes(sample_graph)
+
+    Hasher.recalculate(sample_graph)
+    assert updated == _hashes(sample_graph)
+    assert updated["arch1"] == stable_hash_from_hashes(["code1:h1_modified", "code3:h3"])
+
+
+def test_update_added_elements(sample_graph: Graph):
+    """Test that added nodes and the nodes containing them are rehashed"""
+    Hasher.recalculate(sample_graph)
+
+    sample_graph.add_node(Node("code4", "code4", TypeNode.FUNC, "h4"))
+    sample_graph.add_edge(Edge("file2", "code4", TypeEdge.CONTAIN))
+    sample_graph.add_node(Node("arch2", "arch2", TypeNode.ARC_ELEMENT, source=TypeSource.HAND))
+    sample_graph.add_edge(Edge("arch2", "code2", TypeEdge.CONTAIN, TypeSource.HAND))
+    Hasher.update(sample_graph, ["code4", "file2", "arch2"])
+    updated = _hashes(sample_graph)
+
+    Hasher.recalculate(sample_graph)
+    assert updated == _hashes(sample_graph)
+
+
+def test_update_stops_at_unchanged_hash(sample_graph: Graph):
+    """Test that ancestors are not rehashed when a recomputed hash equals the old one"""
+    Hasher.recalculate(sample_graph)
+    sample_graph.get_node("dir1").hash = "sentinel"
+
+    Hasher.update(sample_graph, ["code1"])
+
+    assert sample_graph.get_node("dir1").hash == "sentinel"
+
+
+def test_union_recalculates_stale_hashes(tmp_path, sample_graph: Graph):
+    """Test that union repairs stale hashes of the stored graph"""
+    Hasher.recalculate(sample_graph)
+    expected = _hashes(sample_graph)
+    sample_graph.get_node("dir1").hash = "stale"
+    CSVGraphExporter.save(sample_graph, str(tmp_path / "graph"))
+    CSVGraphBuilder.init_additional_files(str(tmp_path / "additional"))
+
+    assert _hashes(CSVGraphBuilder.union(str(tmp_path / "graph"), str(tmp_path / "additional"))) == expected
+
+
+def test_child_names_affect_hash(sample_graph: Graph):
+    """Test that renaming a contained element changes the hash of its parent, but not its own hash"""
+    Hasher.recalculate(sample_graph)
+    before = _hashes(sample_graph)
+
+    sample_graph.get_node("file1").name = "renamed.py"
+    Hasher.recalculate(sample_graph)
+
+    assert sample_graph.get_node("file1").hash == before["file1"]
+    assert sample_graph.get_node("dir1").hash != before["dir1"]
+
+
+def test_fingerprint(sample_graph: Graph):
+    """Test that the fingerprint changes with edges and hand-added nodes"""
+    Hasher.recalculate(sample_graph)
+    fingerprint = Hasher.fingerprint(sample_graph)
+
+    sample_graph.add_edge(Edge("code2", "code1", TypeEdge.USE))
+    with_edge = Hasher.fingerprint(sample_graph)
+    sample_graph.get_node("arch1").name = "renamed"
+    with_renamed_arch = Hasher.fingerprint(sample_graph)
+
+    assert len({fingerprint, with_edge, with_renamed_arch}) == 3
@@ -0,0 +1,73 @@
+from copy import deepcopy
+import pytest
+
+from core.graph.hasher import Hasher
+from core.graph.impact import ImpactAnalyzer
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode, ROOT_NODE_NAME
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def sample_graph():
+    """Creates a graph with the following structure:
+    root/
+        a.py/ a1, a2
+        b.py/ b1
+        c.py/ c1
+    b1 use a1, c1 use b1, c1 use a2
+    service (arc element, contains c.py)
+    """
+    graph = Graph()
+    graph.add_node(Node(ROOT_NODE_NAME, ROOT_NODE_NAME, TypeNode.DIRECTORY))
+    for file_name, entities in [("a.py", ["a1", "a2"]), ("b.py", ["b1"]), ("c.py", ["c1"])]:
+        graph.add_node(Node(file_name, file_name, TypeNode.FILE))
+        graph.add_edge(Edge(ROOT_NODE_NAME, file_name, TypeEdge.CONTAIN, TypeSource.CODE))
+        for entity in entities:
+            graph.add_node(Node(f"{file_name}#{entity}", entity, TypeNode.FUNC, f"h_{entity}"))
+            graph.add_edge(Edge(file_name, f"{file_name}#{entity}", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("b.py#b1", "a.py#a1", TypeEdge.USE, TypeSource.CODE))
+    graph.add_edge(Edge("c.py#c1", "b.py#b1", TypeEdge.USE, TypeSource.CODE))
+    graph.add_edge(Edge("c.py#c1", "a.py#a2", TypeEdge.USE, TypeSource.CODE))
+    graph.add_node(Node("service", "service", TypeNode.ARC_ELEMENT, source=TypeSource.HAND))
+    graph.add_edge(Edge("service", "c.py", TypeEdge.CONTAIN, TypeSource.HAND))
+    return Hasher.recalculate(graph)
+
+
+def test_analyze_with_shortest_paths(sample_graph: Graph):
+    """Test that dependents are found from several changes at once with the shortest explaining paths"""
+    result = ImpactAnalyzer.analyze(sample_graph, ["a.py#a1", "a.py#a2"])
+
+    assert result.impacted() == {"a.py#a1", "a.py#a2", "b.py#b1", "c.py#c1"}
+    assert result.path("c.py#c1") == ["c.py#c1", "a.py#a2"]
+    assert result.distances["b.py#b1"] == 1
+    assert ImpactAnalyzer.group_by_file(sample_graph, result.impacted()) == {
+        "a.py": ["a.py#a1", "a.py#a2"],
+        "b.py": ["b.py#b1"],
+        "c.py": ["c.py#c1"],
+    }
+    assert ImpactAnalyzer.group_by_arc_element(sample_graph, result.impacted()) == {"service": ["c.py#c1"]}
+
+
+def test_stop_edge_types(sample_graph: Graph):
+    """Test that edges of stop types are not followed"""
+    result = ImpactAnalyzer.analyze(sample_graph, ["a.py#a1"], stop_edge_types=[TypeEdge.CONTAIN, TypeEdge.USE])
+
+    assert result.impacted() == {"a.py#a1"}
+
+
+def test_changed_nodes_from_versions(sample_graph: Graph):
+    """Test that changed code and dependents of deleted code are the changes of a new version"""
+    new_graph = deepcopy(sample_graph)
+    new_graph.get_node("a.py#a1").hash = "h_a1_modified"
+    new_graph.remove_node("a.py#a2")
+    Hasher.recalculate(new_graph)
+
+    assert ImpactAnalyzer.changed_nodes(sample_graph, new_graph) == {"a.py#a1", "c.py#c1"}
+
+
+def test_expand_files(sample_graph: Graph):
+    """Test that files are replaced with the code they contain"""
+    assert ImpactAnalyzer.expand(sample_graph, ["a.py", "c.py#c1", "missing"]) == {"a.py#a1", "a.py#a2", "c.py#c1"}
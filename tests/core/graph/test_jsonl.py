@@ -0,0 +1,73 @@
+import json
+import pytest
+
+from core.graph.builder import JSONLGraphBuilder
+from core.graph.exporter import JSONLGraphExporter
+from core.graph.difference import DIFFERENCE_STATUS_FIELD, TypeDiff
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def sample_graph():
+    """Creates a sample graph with the following structure:
+    file1.py/
+        code1
+        code2
+    code2 use code1
+    """
+    graph = Graph()
+    graph.add_node(Node("file1", "file1.py", TypeNode.FILE, "h_file1"))
+    graph.add_node(Node("code1", "code1", TypeNode.CLASS, "h_code1"))
+    graph.add_node(Node("code2", "code2", TypeNode.FUNC, "h_code2", meta={DIFFERENCE_STATUS_FIELD: TypeDiff.NEW}))
+    graph.add_edge(Edge("file1", "code1", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("file1", "code2", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("code2", "code1", TypeEdge.USE, TypeSource.HAND))
+    return graph
+
+
+def test_save_writes_one_record_per_element(tmp_path, sample_graph: Graph):
+    """Test that every node and edge is written as a separate JSON line, nodes first"""
+    file_path = tmp_path / "graph.jsonl"
+    JSONLGraphExporter.save(sample_graph, str(file_path))
+
+    records = [json.loads(line) for line in file_path.read_text(encoding="utf-8").splitlines()]
+
+    assert [record["kind"] for record in records] == ["node"] * 3 + ["edge"] * 3
+    code2 = next(record for record in records if record.get("id") == "code2")
+    assert code2["meta"] == {DIFFERENCE_STATUS_FIELD: TypeDiff.NEW}
+
+
+def test_round_trip(tmp_path, sample_graph: Graph):
+    """Test that a saved graph is built back unchanged"""
+    file_path = tmp_path / "graph.jsonl"
+    JSONLGraphExporter.save(sample_graph, str(file_path))
+
+    graph = JSONLGraphBuilder.build(str(file_path))
+
+    assert {node.id: (node.name, node.type, node.hash, node.source) for node in graph.get_all_nodes()} == {
+        node.id: (node.name, node.type, node.hash, node.source)
+        for node in sample_graph.get_all_nodes()
+    }
+    assert set(graph.get_all_edges()) == set(sample_graph.get_all_edges())
+    assert graph.get_node("code2").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.NEW
+
+
+def test_build_accepts_edges_before_nodes(tmp_path):
+    """Test that edges referencing nodes defined later in the stream are kept"""
+    file_path = tmp_path / "graph.jsonl"
+    lines = [
+        '{"kind": "edge", "src": "a", "dest": "b", "type": "use"}',
+        '{"kind": "node", "id": "a", "name": "a", "type": "func"}',
+        'not a json line',
+        '{"kind": "node", "id": "b", "name": "b", "type": "func"}',
+    ]
+    file_path.write_text("\n".join(lines), encoding="utf-8")
+
+    graph = JSONLGraphBuilder.build(str(file_path))
+
+    assert set(graph.nodes) == {"a", "b"}
+    assert [edge.dest for edge in graph.get_edges_out("a")] == ["b"]
@@ -0,0 +1,67 @@
+import pytest
+
+from core.graph.metrics import CouplingAnalyzer, ContainmentTree
+
+from core.models.graph import Graph
+from core.models.metrics import CouplingMetrics
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def layered_graph():
+    """Creates a graph with the following structure:
+    root/ app/ views.py/ v1, v2
+               models.py/ m1
+          lib/ util.py/ u1
+    arc contain models.py, util.py
+    v1 use m1, v1 use u1, v2 use u1, m1 use u1, v1 use v2
+    """
+    graph = Graph()
+    for node_id, node_type in [("root", TypeNode.DIRECTORY), ("app", TypeNode.DIRECTORY), ("lib", TypeNode.DIRECTORY),
+                               ("views.py", TypeNode.FILE), ("models.py", TypeNode.FILE), ("util.py", TypeNode.FILE),
+                               ("v1", TypeNode.FUNC), ("v2", TypeNode.FUNC), ("m1", TypeNode.CLASS),
+                               ("u1", TypeNode.FUNC), ("arc", TypeNode.ARC_ELEMENT)]:
+        graph.add_node(Node(node_id, node_id, node_type))
+    for src, dest in [("root", "app"), ("root", "lib"), ("app", "views.py"), ("app", "models.py"), ("lib", "util.py"),
+                      ("views.py", "v1"), ("views.py", "v2"), ("models.py", "m1"), ("util.py", "u1"),
+                      ("arc", "models.py"), ("arc", "util.py")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.CONTAIN, TypeSource.CODE))
+    for src, dest in [("v1", "m1"), ("v1", "u1"), ("v2", "u1"), ("m1", "u1"), ("v1", "v2")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_entity_metrics(layered_graph: Graph):
+    """Test that metrics of single elements count their own edges"""
+    metrics = CouplingAnalyzer.compute(layered_graph)
+
+    assert metrics["v1"] == CouplingMetrics(fan_in=0, fan_out=3, afferent=0, efferent=3)
+    assert metrics["u1"] == CouplingMetrics(fan_in=3, fan_out=0, afferent=3, efferent=0)
+    assert metrics["v1"].instability == 1.0
+    assert metrics["u1"].instability == 0.0
+
+
+def test_containers_count_crossing_edges(layered_graph: Graph):
+    """Test that containers count only edges crossing their boundary and distinct outside elements"""
+    metrics = CouplingAnalyzer.compute(layered_graph)
+
+    assert metrics["views.py"] == CouplingMetrics(fan_in=0, fan_out=3, afferent=0, efferent=2)
+    assert metrics["app"] == CouplingMetrics(fan_in=0, fan_out=3, afferent=0, efferent=1)
+    assert metrics["lib"] == CouplingMetrics(fan_in=3, fan_out=0, afferent=3, efferent=0)
+    assert metrics["root"] == CouplingMetrics()
+    assert metrics["app"].instability == 1.0
+
+    # The architectural element overlaps both directories
+    assert metrics["arc"] == CouplingMetrics(fan_in=3, fan_out=0, afferent=2, efferent=0)
+
+
+def test_containment_tree(layered_graph: Graph):
+    """Test that containers precede their contents and the lowest common container is found"""
+    tree = ContainmentTree(layered_graph)
+
+    assert tree.position["root"] < tree.position["app"] < tree.position["views.py"] < tree.position["v1"]
+    assert tree.lca("v1", "m1") == "app"
+    assert tree.lca("v1", "v2") == "views.py"
+    assert tree.lca("v1", "arc") is None
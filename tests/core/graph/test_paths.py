@@ -0,0 +1,53 @@
+import pytest
+
+from core.graph.paths import PathFinder
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def diamond_graph():
+    """Creates a graph with the following structure:
+    a use b, a use c, b use d, c use d, d use e, a use x, x use y, y use e, file.py contain a
+    """
+    graph = Graph()
+    graph.add_node(Node("file.py", "file.py", TypeNode.FILE))
+    for node_id in ["a", "b", "c", "d", "e", "x", "y"]:
+        graph.add_node(Node(node_id, node_id, TypeNode.FUNC))
+    graph.add_edge(Edge("file.py", "a", TypeEdge.CONTAIN, TypeSource.CODE))
+    for src, dest in [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d"), ("d", "e"), ("a", "x"), ("x", "y"),
+                      ("y", "e")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_shortest_path(diamond_graph: Graph):
+    """Test that the shortest path is found and reproducible between paths of equal length"""
+    assert PathFinder.shortest_paths(diamond_graph, "a", "e") == [["a", "b", "d", "e"]]
+    assert PathFinder.shortest_paths(diamond_graph, "file.py", "d") == [["file.py", "a", "b", "d"]]
+    assert PathFinder.shortest_paths(diamond_graph, "file.py", "d", edge_types=[TypeEdge.USE]) == []
+    assert PathFinder.shortest_paths(diamond_graph, "e", "a") == []
+
+
+def test_k_shortest_paths_with_excluded(diamond_graph: Graph):
+    """Test that next paths come in order of length and excluded elements are avoided"""
+    paths = PathFinder.shortest_paths(diamond_graph, "a", "e", k=5)
+    assert paths == [["a", "b", "d", "e"], ["a", "c", "d", "e"], ["a", "x", "y", "e"]]
+
+    assert PathFinder.shortest_paths(diamond_graph, "a", "e", k=5, excluded=["d"]) == [["a", "x", "y", "e"]]
+
+    with pytest.raises(Exception):
+        PathFinder.shortest_paths(diamond_graph, "a", "missing")
+
+
+def test_paths_subgraph(diamond_graph: Graph):
+    """Test that the graph of paths has only their elements and edges"""
+    paths = PathFinder.shortest_paths(diamond_graph, "a", "e", k=2)
+    result = PathFinder.subgraph(diamond_graph, paths)
+
+    assert set(result.nodes) == {"a", "b", "c", "d", "e"}
+    assert sorted((edge.src, edge.dest) for edge in result.get_all_edges()) == [("a", "b"), ("a", "c"), ("b", "d"),
+                                                                                ("c", "d"), ("d", "e")]
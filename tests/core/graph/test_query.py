@@ -0,0 +1,66 @@
+import csv
+import pytest
+
+from core.graph.builder import CSVGraphBuilder
+from core.graph.exporter import CSVGraphExporter
+from core.graph.query import DISTANCE_FIELD, Direction, Query, QueryEngine
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def chain_graph():
+    """Creates a graph with the following structure:
+    file1.py/ f1, file2.py/ f2, f3
+    f1 use f2, f2 use f3, f4 use f1
+    """
+    graph = Graph()
+    graph.add_node(Node("file1.py", "file1.py", TypeNode.FILE))
+    graph.add_node(Node("file2.py", "file2.py", TypeNode.FILE))
+    for node_id in ["f1", "f2", "f3", "f4"]:
+        graph.add_node(Node(node_id, node_id, TypeNode.FUNC))
+    graph.add_edge(Edge("file1.py", "f1", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("file2.py", "f2", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("file2.py", "f3", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("f1", "f2", TypeEdge.USE, TypeSource.CODE))
+    graph.add_edge(Edge("f2", "f3", TypeEdge.USE, TypeSource.CODE))
+    graph.add_edge(Edge("f4", "f1", TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_ego_network_with_distance(chain_graph: Graph):
+    """Test that both directions give the neighbourhood with distances and each edge once"""
+    query = Query(["f1"], Direction.BOTH, depth=1, edge_types=[TypeEdge.USE], distance=True)
+    elements = list(QueryEngine.run(chain_graph, query))
+
+    nodes = {element.id: element.meta[DISTANCE_FIELD] for element in elements if isinstance(element, Node)}
+    edges = [element for element in elements if isinstance(element, Edge)]
+    assert nodes == {"f1": 0, "f2": 1, "f4": 1}
+    assert sorted((edge.src, edge.dest) for edge in edges) == [("f1", "f2"), ("f4", "f1")]
+    assert DISTANCE_FIELD not in chain_graph.get_node("f1").meta
+
+
+def test_multi_source_with_stop_node_types(chain_graph: Graph):
+    """Test that several start nodes share one traversal and stop nodes are not expanded"""
+    result = QueryEngine.subgraph(chain_graph, Query(["f3", "f4"], Direction.IN, stop_node_types=[TypeNode.FILE]))
+
+    assert set(result.nodes) == {"f3", "f4", "f2", "file2.py", "f1", "file1.py"}
+
+    result = QueryEngine.subgraph(chain_graph, Query(["file2.py", "f4"], Direction.OUT))
+    assert set(result.nodes) == {"file2.py", "f1", "f2", "f3", "f4"}
+
+
+def test_stream_to_csv(tmp_path, chain_graph: Graph):
+    """Test that query results are written by the exporter with the distance column"""
+    CSVGraphExporter.save_elements(QueryEngine.run(chain_graph, Query(["f4"], distance=True)), str(tmp_path),
+                                   [DISTANCE_FIELD])
+
+    with open(tmp_path / "nodes.csv", 'r', encoding='utf-8') as f:
+        distances = {row['id']: row[DISTANCE_FIELD] for row in csv.DictReader(f)}
+    assert distances == {"f4": "0", "f1": "1", "f2": "2", "f3": "3"}
+
+    result = CSVGraphBuilder.build(str(tmp_path))
+    assert len(result.get_all_edges()) == 3
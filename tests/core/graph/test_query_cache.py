@@ -0,0 +1,71 @@
+import pytest
+
+from core.graph.query_cache import QueryCache
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+
+
+@pytest.fixture
+def graph(make_graph):
+    return make_graph()
+
+
+def test_repeated_queries_hit(graph: Graph):
+    """Test that identical queries are answered from memory regardless of parameter order"""
+    cache = QueryCache()
+
+    first = cache.filter(graph, [TypeNode.FUNC, TypeNode.FILE])
+    assert cache.filter(graph, [TypeNode.FILE, TypeNode.FUNC]) is first
+    used = cache.get_used_nodes(graph, {"a"})
+    assert set(used.nodes) == {"a", "b"}
+    assert cache.get_used_nodes(graph, {"a"}) is used
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 2, 0.5)
+
+
+def test_changed_graph_and_eviction(make_graph, graph: Graph):
+    """Test that a graph with another fingerprint gets new results and old results are evicted"""
+    cache = QueryCache(max_entries=1)
+
+    assert set(cache.get_used_nodes(graph, {"a"}).nodes) == {"a", "b"}
+    assert set(cache.get_used_nodes(make_graph(extra_use=True), {"a"}).nodes) == {"a", "b", "c"}
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["evictions"], stats["entries"]) == (2, 1, 1)
+
+    cache = QueryCache(max_age=0)
+    cache.get_dependent_nodes(graph, {"b"})
+    cache.get_dependent_nodes(graph, {"b"})
+    assert cache.stats()["misses"] == 2
+
+
+def test_results_on_disk(tmp_path, make_graph, graph: Graph):
+    """Test that results stored on disk are used by another cache"""
+    QueryCache(tmp_path).get_dependent_nodes(graph, {"b"})
+
+    cache = QueryCache(tmp_path)
+    result = cache.get_dependent_nodes(make_graph(), {"b"})
+
+    assert set(result.nodes) == {"a", "b", "file.py", "root"}
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_rootless_and_rehashed_graphs():
+    """Test that graphs without the root are told apart by their nodes and rehashing in place is noticed"""
+    cache = QueryCache()
+    graph = Graph()
+    for node_id in ["a", "b"]:
+        graph.add_node(Node(node_id, node_id, TypeNode.FUNC, "h1"))
+    other = Graph()
+    for node_id in ["a", "b", "zzz"]:
+        other.add_node(Node(node_id, node_id, TypeNode.FUNC, "h2"))
+
+    assert set(cache.filter(graph, [TypeNode.FUNC]).nodes) == {"a", "b"}
+    assert set(cache.filter(other, [TypeNode.FUNC]).nodes) == {"a", "b", "zzz"}
+
+    fingerprint = cache.fingerprint(graph)
+    graph.nodes["a"].hash = "h3"
+    assert cache.fingerprint(graph) != fingerprint
+    assert cache.stats()["misses"] == 2
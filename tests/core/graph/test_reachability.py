@@ -0,0 +1,62 @@
+import pytest
+
+from core.graph.builder import CSVGraphBuilder
+from core.graph.exporter import CSVGraphExporter
+from core.graph.reachability import ReachabilityIndex, REACHABILITY_FILE_NAME
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def cyclic_graph():
+    """Creates a graph with the following structure:
+    file.py/ a, b, c, d, e
+    a use b, b use c, c use b (cycle), c use d, e isolated
+    """
+    graph = Graph()
+    graph.add_node(Node("file.py", "file.py", TypeNode.FILE))
+    for node_id in ["a", "b", "c", "d", "e"]:
+        graph.add_node(Node(node_id, node_id, TypeNode.FUNC))
+        graph.add_edge(Edge("file.py", node_id, TypeEdge.CONTAIN, TypeSource.CODE))
+    for src, dest in [("a", "b"), ("b", "c"), ("c", "b"), ("c", "d")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_reaches_matches_traversal(cyclic_graph: Graph):
+    """Test that the index answers like a traversal over use edges only"""
+    index = ReachabilityIndex.build(cyclic_graph)
+
+    assert index.reaches("a", "d")
+    assert index.reaches("c", "b")
+    assert index.reaches("e", "e")
+    assert not index.reaches("d", "a")
+    assert not index.reaches("file.py", "a")
+    assert index.descendants("b") == {"b", "c", "d"}
+    assert index.ancestors("d") == {"a", "b", "c", "d"}
+    assert index.stats()["components"] == 5
+
+
+def test_unknown_node_raises(cyclic_graph: Graph):
+    """Test that nodes outside the graph are reported"""
+    index = ReachabilityIndex.build(cyclic_graph)
+
+    with pytest.raises(Exception):
+        index.reaches("a", "missing")
+
+
+def test_index_persisted_next_to_graph(tmp_path, cyclic_graph: Graph):
+    """Test that a stored index gives the same answers without building the graph"""
+    CSVGraphExporter.save(cyclic_graph, str(tmp_path))
+    built = ReachabilityIndex.load_or_build(tmp_path, CSVGraphBuilder.build)
+
+    def fail(path):
+        raise AssertionError("graph must not be built")
+
+    loaded = ReachabilityIndex.load_or_build(tmp_path, fail)
+    assert (tmp_path / REACHABILITY_FILE_NAME).exists()
+    assert loaded.descendant_bits == built.descendant_bits
+    assert loaded.ancestors("c") == {"a", "b", "c"}
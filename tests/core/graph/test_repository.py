@@ -0,0 +1,86 @@
+from copy import deepcopy
+import pytest
+
+from core.graph.repository import GraphRepository, SNAPSHOT_DIR_NAME, VERSIONS_DIR_NAME
+from core.graph.difference import DIFFERENCE_STATUS_FIELD, TypeDiff
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def versions():
+    """Creates five versions of a graph: each version adds a function to file1 and changes the file hash"""
+    graph = Graph()
+    graph.add_node(Node("root", "root", TypeNode.DIRECTORY, "h_root"))
+    graph.add_node(Node("file1", "file1.py", TypeNode.FILE, "h_file1_0"))
+    graph.add_edge(Edge("root", "file1", TypeEdge.CONTAIN, TypeSource.CODE))
+
+    result = [deepcopy(graph)]
+    for i in range(1, 5):
+        graph.add_node(Node(f"func{i}", f"func{i}", TypeNode.FUNC, f"h_func{i}"))
+        graph.add_edge(Edge("file1", f"func{i}", TypeEdge.CONTAIN, TypeSource.CODE))
+        if i > 1:
+            graph.add_edge(Edge(f"func{i}", f"func{i - 1}", TypeEdge.USE, TypeSource.CODE))
+        graph.get_node("file1").hash = f"h_file1_{i}"
+        result.append(deepcopy(graph))
+    return result
+
+
+def _snapshot(graph: Graph):
+    nodes = {node.id: (node.name, node.type, node.hash, node.source) for node in graph.get_all_nodes()}
+    return nodes, set(graph.get_all_edges())
+
+
+def test_add_and_checkout(tmp_path, versions):
+    """Test that every stored version is reconstructed exactly"""
+    repository = GraphRepository(tmp_path / "repo", keyframe_interval=3)
+    for graph in versions:
+        repository.add(graph)
+
+    log = repository.log()
+    assert [entry.version for entry in log] == ["1", "2", "3", "4", "5"]
+    assert [entry.keyframe for entry in log] == [True, False, False, True, False]
+    assert log[1].changes == 3
+
+    for entry, graph in zip(log, versions):
+        assert _snapshot(repository.checkout(entry.version)) == _snapshot(graph)
+
+
+def test_keyframes_only_stored_periodically(tmp_path, versions):
+    """Test that non-keyframe versions do not store full snapshots"""
+    repository = GraphRepository(tmp_path / "repo", keyframe_interval=10)
+    for graph in versions:
+        repository.add(graph)
+
+    snapshots = list((tmp_path / "repo" / VERSIONS_DIR_NAME).glob(f"*/{SNAPSHOT_DIR_NAME}"))
+    assert len(snapshots) == 1
+
+
+def test_diff_versions(tmp_path, versions):
+    """Test that versions are compared using their deltas"""
+    repository = GraphRepository(tmp_path / "repo", keyframe_interval=2)
+    for graph in versions:
+        repository.add(graph)
+
+    diff_graph = repository.diff("2", "4")
+
+    assert diff_graph.get_node("func1").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.UNCHACHGED
+    assert diff_graph.get_node("func2").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.NEW
+    assert diff_graph.get_node("func3").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.NEW
+    assert diff_graph.get_node("file1").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.CHANGED
+    assert diff_graph.get_node("func4") is None
+
+    reverse_graph = repository.diff("4", "2")
+    assert reverse_graph.get_node("func3").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.DELETED
+
+
+def test_checkout_unknown_version(tmp_path, versions):
+    """Test that checkout of an unknown version fails"""
+    repository = GraphRepository(tmp_path / "repo")
+    repository.add(versions[0])
+
+    with pytest.raises(Exception):
+        repository.checkout("42")
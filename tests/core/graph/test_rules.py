@@ -0,0 +1,70 @@
+import pytest
+
+from core.graph.rules import RuleChecker, RuleParser
+from utils.glob import GlobTrie
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+RULES = """
+# layering
+allow core/graph/** -> core/models/**
+deny core/** -> interfaces/**
+allow @git_arc -> utils/git_handler.py
+deny ** -> utils/git_handler.py use,contain
+"""
+
+
+@pytest.fixture
+def layered_graph():
+    """Creates a graph with the following structure:
+    core/graph/a.py#f, core/models/m.py#M, interfaces/cli.py#main, utils/git_handler.py#Git
+    git_arc contain interfaces/cli.py
+    core/graph/a.py#f use core/models/m.py#M, core/graph/a.py#f use interfaces/cli.py#main,
+    interfaces/cli.py#main use utils/git_handler.py#Git, core/models/m.py#M use utils/git_handler.py#Git
+    """
+    graph = Graph()
+    for node_id, node_type in [("core/graph/a.py#f", TypeNode.FUNC), ("core/models/m.py#M", TypeNode.CLASS),
+                               ("interfaces/cli.py", TypeNode.FILE), ("interfaces/cli.py#main", TypeNode.FUNC),
+                               ("utils/git_handler.py#Git", TypeNode.CLASS), ("git_arc", TypeNode.ARC_ELEMENT)]:
+        graph.add_node(Node(node_id, node_id, node_type))
+    graph.add_edge(Edge("git_arc", "interfaces/cli.py", TypeEdge.CONTAIN, TypeSource.HAND))
+    graph.add_edge(Edge("interfaces/cli.py", "interfaces/cli.py#main", TypeEdge.CONTAIN, TypeSource.CODE))
+    for src, dest in [("core/graph/a.py#f", "core/models/m.py#M"), ("core/graph/a.py#f", "interfaces/cli.py#main"),
+                      ("interfaces/cli.py#main", "utils/git_handler.py#Git"),
+                      ("core/models/m.py#M", "utils/git_handler.py#Git")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_check_violations(layered_graph: Graph):
+    """Test that the first matching rule decides and group members are exempted by allow rules"""
+    violations = RuleChecker(RuleParser.parse(RULES)).check(layered_graph)
+
+    assert [(violation.src, violation.dest, violation.rule.line) for violation in violations] == [
+        ("core/graph/a.py#f", "interfaces/cli.py#main", 4),
+        ("core/models/m.py#M", "utils/git_handler.py#Git", 6),
+    ]
+
+
+def test_parse_errors():
+    """Test that malformed rules and unknown edge types are reported with their line"""
+    with pytest.raises(Exception, match="line 2"):
+        RuleParser.parse("deny a -> b\nforbid a -> b")
+    with pytest.raises(Exception, match="line 1"):
+        RuleParser.parse("deny a -> b calls")
+
+
+def test_glob_trie():
+    """Test that globs distinguish '**' from '*' and match only whole ids"""
+    trie = GlobTrie()
+    for number, pattern in enumerate(["core/**", "core/*.py", "core/a?.py", "core.py", "**/test_*.py"]):
+        trie.add(pattern, number)
+
+    assert sorted(trie.match("core/ab.py")) == [0, 1, 2]
+    assert trie.match("core/graph/x.py") == [0]
+    assert trie.match("coreXpy") == []
+    assert trie.match("test_a.py") == [4]
+    assert trie.match("tests/core/test_a.py") == [4]
@@ -0,0 +1,111 @@
+import csv
+from copy import deepcopy
+import json
+import pytest
+
+from core.graph.difference import DIFFERENCE_STATUS_FIELD, TypeDiff
+from core.graph.exporter import CSVGraphExporter
+from core.graph.sparse import BASE_FILE_NAME, SparseDiff
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def graphs(tmp_path):
+    """Creates a chain of 20 functions in one file, saved to tmp_path/base, and its new version
+    in which func10 is changed and func20 (using func19) is added
+    """
+    old_graph = Graph()
+    old_graph.add_node(Node("file", "file.py", TypeNode.FILE, "h_file"))
+    for i in range(20):
+        old_graph.add_node(Node(f"func{i}", f"func{i}", TypeNode.FUNC, f"h_func{i}"))
+        old_graph.add_edge(Edge("file", f"func{i}", TypeEdge.CONTAIN, TypeSource.CODE))
+        if i > 0:
+            old_graph.add_edge(Edge(f"func{i}", f"func{i - 1}", TypeEdge.USE, TypeSource.CODE))
+    CSVGraphExporter.save(old_graph, str(tmp_path / "base"))
+
+    new_graph = deepcopy(old_graph)
+    new_graph.get_node("func10").hash = "h_func10_modified"
+    new_graph.add_node(Node("func20", "func20", TypeNode.FUNC, "h_func20"))
+    new_graph.add_edge(Edge("file", "func20", TypeEdge.CONTAIN, TypeSource.CODE))
+    new_graph.add_edge(Edge("func20", "func19", TypeEdge.USE, TypeSource.CODE))
+
+    return old_graph, new_graph
+
+
+def _snapshot(graph: Graph):
+    nodes = {node.id: (node.name, node.type, node.hash, node.source) for node in graph.get_all_nodes()}
+    return nodes, set(graph.get_all_edges())
+
+
+def test_sparse_diff_stores_only_changes(tmp_path, graphs):
+    """Test that unchanged elements are not written"""
+    SparseDiff.save(*graphs, str(tmp_path / "base"), str(tmp_path / "diff"))
+
+    with open(tmp_path / "diff" / "nodes.csv", 'r', encoding='utf-8') as f:
+        nodes = {row['id']: row['diff_status'] for row in csv.DictReader(f)}
+    with open(tmp_path / "diff" / "edges.csv", 'r', encoding='utf-8') as f:
+        edges = [(row['src'], row['dest']) for row in csv.DictReader(f)]
+
+    assert nodes == {"func10": TypeDiff.CHANGED, "func20": TypeDiff.NEW}
+    assert sorted(edges) == [("file", "func20"), ("func20", "func19")]
+    assert SparseDiff.is_sparse(str(tmp_path / "diff"))
+
+
+def test_apply_reproduces_new_graph(tmp_path, graphs):
+    """Test that the sparse difference applied to the base graph gives the new graph"""
+    SparseDiff.save(*graphs, str(tmp_path / "base"), str(tmp_path / "diff"))
+
+    patched = SparseDiff.apply(str(tmp_path / "diff"))
+
+    assert _snapshot(patched) == _snapshot(graphs[1])
+
+
+def test_context_around_changes(tmp_path, graphs):
+    """Test that only the changed elements and their neighbours are loaded from the base graph"""
+    SparseDiff.save(*graphs, str(tmp_path / "base"), str(tmp_path / "diff"))
+
+    graph = SparseDiff.load_context(str(tmp_path / "diff"), depth=1)
+
+    assert set(graph.nodes) == {"file", "func9", "func10", "func11", "func19", "func20"}
+    assert graph.get_node("func10").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.CHANGED
+    assert graph.get_node("func9").meta[DIFFERENCE_STATUS_FIELD] == TypeDiff.UNCHACHGED
+    assert Edge("func10", "func9", TypeEdge.USE, TypeSource.CODE) in graph.get_all_edges()
+
+
+def test_changed_base_is_rejected(tmp_path, graphs):
+    """Test that a difference is not applied to a base graph that was modified after saving"""
+    SparseDiff.save(*graphs, str(tmp_path / "base"), str(tmp_path / "diff"))
+    modified = deepcopy(graphs[0])
+    modified.add_edge(Edge("func0", "func5", TypeEdge.USE, TypeSource.CODE))
+    CSVGraphExporter.save(modified, str(tmp_path / "base"))
+
+    with pytest.raises(Exception):
+        SparseDiff.apply(str(tmp_path / "diff"))
+
+
+def test_moved_together_with_base(tmp_path, graphs):
+    """Test that the base graph is referenced relative to the difference, so both can be moved together"""
+    SparseDiff.save(*graphs, str(tmp_path / "base"), str(tmp_path / "diff"))
+    (tmp_path / "moved").mkdir()
+    (tmp_path / "base").rename(tmp_path / "moved" / "base")
+    (tmp_path / "diff").rename(tmp_path / "moved" / "diff")
+
+    patched = SparseDiff.apply(str(tmp_path / "moved" / "diff"))
+
+    assert _snapshot(patched) == _snapshot(graphs[1])
+
+
+def test_other_hash_format_is_rejected(tmp_path, graphs):
+    """Test that a difference saved with another hash format is not applied"""
+    SparseDiff.save(*graphs, str(tmp_path / "base"), str(tmp_path / "diff"))
+    base_file = tmp_path / "diff" / BASE_FILE_NAME
+    base = json.loads(base_file.read_text(encoding="utf-8"))
+    del base["hash_format"]
+    base_file.write_text(json.dumps(base), encoding="utf-8")
+
+    with pytest.raises(Exception, match="hash format"):
+        SparseDiff.apply(str(tmp_path / "diff"))
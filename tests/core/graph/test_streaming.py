@@ -0,0 +1,92 @@
+import csv
+from copy import deepcopy
+import pytest
+
+from core.graph.difference import GraphComparator
+from core.graph.exporter import CSVGraphExporter
+from core.graph.streaming import StreamingComparator
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def graphs():
+    """Creates two versions of a graph of 30 files with 10 functions each:
+    in the new version one file is deleted, one is added and one function is changed
+    """
+    old_graph = Graph()
+    for i in range(30):
+        file_id = f"file{i}"
+        old_graph.add_node(Node(file_id, f"{file_id}.py", TypeNode.FILE, f"h_{file_id}"))
+        for j in range(10):
+            func_id = f"{file_id}#func{j}"
+            old_graph.add_node(Node(func_id, f"func{j}", TypeNode.FUNC, f"h_{func_id}"))
+            old_graph.add_edge(Edge(file_id, func_id, TypeEdge.CONTAIN, TypeSource.CODE))
+            if j > 0:
+                old_graph.add_edge(Edge(func_id, f"{file_id}#func{j - 1}", TypeEdge.USE, TypeSource.CODE))
+
+    new_graph = deepcopy(old_graph)
+    for j in range(10):
+        new_graph.remove_node(f"file3#func{j}")
+    new_graph.remove_node("file3")
+    new_graph.add_node(Node("file30", "file30.py", TypeNode.FILE, "h_file30"))
+    new_graph.add_node(Node("file30#func0", "func0", TypeNode.FUNC, "h_file30#func0"))
+    new_graph.add_edge(Edge("file30", "file30#func0", TypeEdge.CONTAIN, TypeSource.CODE))
+    new_graph.add_edge(Edge("file30#func0", "file1#func5", TypeEdge.USE, TypeSource.CODE))
+    new_graph.get_node("file7#func2").hash = "h_modified"
+
+    return old_graph, new_graph
+
+
+def _rows(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        return header, sorted(map(tuple, reader))
+
+
+def _assert_same_difference(old_graph: Graph, new_graph: Graph, streaming_path, expected_path):
+    CSVGraphExporter.save_diff(GraphComparator.get_difference(old_graph, new_graph), str(expected_path))
+    for file_name in ["nodes.csv", "edges.csv"]:
+        assert _rows(streaming_path / file_name) == _rows(expected_path / file_name)
+
+
+def test_streaming_difference_of_sorted_graphs(tmp_path, graphs):
+    """Test that canonically sorted graphs are merged into the same difference as the in-memory comparison"""
+    old_graph, new_graph = graphs
+    CSVGraphExporter.save(old_graph, str(tmp_path / "old"), canonical=True)
+    CSVGraphExporter.save(new_graph, str(tmp_path / "new"), canonical=True)
+
+    StreamingComparator.save_difference(str(tmp_path / "old"), str(tmp_path / "new"), str(tmp_path / "diff"))
+
+    _assert_same_difference(old_graph, new_graph, tmp_path / "diff", tmp_path / "expected")
+
+
+def test_streaming_difference_with_external_sort(tmp_path, graphs):
+    """Test that unsorted graphs are sorted in several runs when they don't fit into the buffer"""
+    old_graph, new_graph = graphs
+    CSVGraphExporter.save(old_graph, str(tmp_path / "old"))
+    CSVGraphExporter.save(new_graph, str(tmp_path / "new"))
+
+    StreamingComparator.save_difference(str(tmp_path / "old"),
+                                        str(tmp_path / "new"),
+                                        str(tmp_path / "diff"),
+                                        buffer_size=17)
+
+    _assert_same_difference(old_graph, new_graph, tmp_path / "diff", tmp_path / "expected")
+
+
+def test_canonical_export_is_sorted(tmp_path, graphs):
+    """Test that the canonical export writes nodes and edges sorted by their keys"""
+    CSVGraphExporter.save(graphs[0], str(tmp_path / "graph"), canonical=True)
+
+    with open(tmp_path / "graph" / "nodes.csv", 'r', encoding='utf-8') as f:
+        node_ids = [row['id'] for row in csv.DictReader(f)]
+    with open(tmp_path / "graph" / "edges.csv", 'r', encoding='utf-8') as f:
+        edge_keys = [(row['src'], row['dest'], row['type'], row['source']) for row in csv.DictReader(f)]
+
+    assert node_ids == sorted(node_ids)
+    assert edge_keys == sorted(edge_keys)
@@ -0,0 +1,85 @@
+import csv
+from copy import deepcopy
+import pytest
+
+from core.graph.difference import GraphComparator, DIFFERENCE_STATUS_FIELD, TypeDiff
+from core.graph.timeline import VersionComparator, TIMELINE_NODES_FILE_NAME
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def versions():
+    """Creates three versions of a graph:
+    v1: file1.py/ code1, code2
+    v2: code2 changed, code3 (using code1) added
+    v3: code1 removed together with the edge to it
+    """
+    graph = Graph()
+    graph.add_node(Node("file1", "file1.py", TypeNode.FILE, "h_file1"))
+    graph.add_node(Node("code1", "code1", TypeNode.FUNC, "h_code1"))
+    graph.add_node(Node("code2", "code2", TypeNode.FUNC, "h_code2"))
+    graph.add_edge(Edge("file1", "code1", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("file1", "code2", TypeEdge.CONTAIN, TypeSource.CODE))
+    v1 = deepcopy(graph)
+
+    graph.get_node("code2").hash = "h_code2_modified"
+    graph.add_node(Node("code3", "code3", TypeNode.FUNC, "h_code3"))
+    graph.add_edge(Edge("file1", "code3", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("code3", "code1", TypeEdge.USE, TypeSource.CODE))
+    v2 = deepcopy(graph)
+
+    graph.remove_node("code1")
+    v3 = deepcopy(graph)
+
+    return [("v1", v1), ("v2", v2), ("v3", v3)]
+
+
+@pytest.fixture
+def comparator(versions):
+    comparator = VersionComparator()
+    for label, graph in versions:
+        comparator.add_version(label, graph)
+    return comparator
+
+
+def test_node_timeline(comparator: VersionComparator):
+    """Test the per-version statuses and the history of nodes"""
+    assert comparator.node_statuses("code1") == [TypeDiff.NEW, TypeDiff.UNCHACHGED, TypeDiff.DELETED]
+    assert comparator.history(comparator.node_statuses("code1")) == ("v1", "", "v3")
+    assert comparator.node_statuses("code3") == [None, TypeDiff.NEW, TypeDiff.UNCHACHGED]
+    assert comparator.history(comparator.node_statuses("code2")) == ("v1", "v2", "")
+
+    edge = Edge("code3", "code1", TypeEdge.USE, TypeSource.CODE)
+    assert comparator.edge_statuses(edge) == [None, TypeDiff.NEW, TypeDiff.DELETED]
+
+
+def test_summary_matches_pairwise_difference(versions, comparator: VersionComparator):
+    """Test that the summary counts equal the statuses of separate pairwise comparisons"""
+    summaries = comparator.summary(all_pairs=True)
+    assert len(summaries) == 6
+
+    graphs = dict(versions)
+    for summary in summaries:
+        difference = GraphComparator.get_difference(graphs[summary.first], graphs[summary.second])
+        elements = difference.get_all_nodes() if summary.element == "node" else difference.get_all_edges()
+        expected = {status: 0 for status in summary.counts}
+        for element in elements:
+            expected[element.meta[DIFFERENCE_STATUS_FIELD]] += 1
+        assert summary.counts == expected
+
+
+def test_save_timeline(tmp_path, comparator: VersionComparator):
+    """Test that the timeline has a row per node and a status column per version"""
+    summaries = comparator.save(str(tmp_path), reference=2)
+
+    with open(tmp_path / TIMELINE_NODES_FILE_NAME, 'r', encoding='utf-8') as f:
+        rows = {row['id']: row for row in csv.DictReader(f)}
+
+    assert set(rows) == {"file1", "code1", "code2", "code3"}
+    assert rows["code3"]["first_seen"] == "v2"
+    assert [rows["code1"][label] for label in ["v1", "v2", "v3"]] == ["new", "unchanged", "deleted"]
+    assert [(summary.first, summary.second) for summary in summaries] == [("v3", "v1"), ("v3", "v2")] * 2
@@ -0,0 +1,65 @@
+import pytest
+
+from core.graph.unused import UnusedCodeFinder
+
+from core.models.graph import Graph
+from core.models.node import Node, TypeNode
+from core.models.edge import Edge, TypeEdge
+from core.models.common import TypeSource
+
+
+@pytest.fixture
+def project_graph():
+    """Creates a graph with the following structure:
+    app/ cli.py/ main, body
+         lib.py/ used, helper, dead, body
+         old.py/ legacy, body
+    tests/ test_lib.py/ test_helper
+    main use used, test_helper use helper, legacy use dead
+    """
+    graph = Graph()
+    for node_id, node_type in [("app", TypeNode.DIRECTORY), ("tests", TypeNode.DIRECTORY),
+                               ("app/cli.py", TypeNode.FILE), ("app/lib.py", TypeNode.FILE),
+                               ("app/old.py", TypeNode.FILE), ("tests/test_lib.py", TypeNode.FILE)]:
+        graph.add_node(Node(node_id, node_id, node_type))
+    graph.add_edge(Edge("app", "app/cli.py", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("app", "app/lib.py", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("app", "app/old.py", TypeEdge.CONTAIN, TypeSource.CODE))
+    graph.add_edge(Edge("tests", "tests/test_lib.py", TypeEdge.CONTAIN, TypeSource.CODE))
+    for file_id, name, node_type in [("app/cli.py", "main", TypeNode.FUNC), ("app/cli.py", "body", TypeNode.BODY),
+                                     ("app/lib.py", "used", TypeNode.FUNC), ("app/lib.py", "helper", TypeNode.FUNC),
+                                     ("app/lib.py", "dead", TypeNode.CLASS), ("app/lib.py", "body", TypeNode.BODY),
+                                     ("app/old.py", "legacy", TypeNode.FUNC), ("app/old.py", "body", TypeNode.BODY),
+                                     ("tests/test_lib.py", "test_helper", TypeNode.FUNC)]:
+        graph.add_node(Node(f"{file_id}#{name}", name, node_type))
+        graph.add_edge(Edge(file_id, f"{file_id}#{name}", TypeEdge.CONTAIN, TypeSource.CODE))
+    for src, dest in [("app/cli.py#main", "app/lib.py#used"), ("tests/test_lib.py#test_helper", "app/lib.py#helper"),
+                      ("app/old.py#legacy", "app/lib.py#dead")]:
+        graph.add_edge(Edge(src, dest, TypeEdge.USE, TypeSource.CODE))
+    return graph
+
+
+def test_entries(project_graph: Graph):
+    """Test that matching files and directories are expanded to their code"""
+    entries = UnusedCodeFinder.entries(project_graph)
+
+    assert entries == {"app/cli.py#main", "tests/test_lib.py#test_helper"}
+    assert UnusedCodeFinder.entries(project_graph, ["app/old.py"]) == {"app/old.py#legacy", "app/old.py#body"}
+
+
+def test_find_unused(project_graph: Graph):
+    """Test that reaching an element reaches the body of its file, and code used only by unused code is unused"""
+    unused = UnusedCodeFinder.find(project_graph, UnusedCodeFinder.entries(project_graph))
+
+    assert unused == {"app/lib.py#dead", "app/old.py#legacy", "app/old.py#body"}
+
+
+def test_group_by_file(project_graph: Graph):
+    """Test that files report their unused elements out of all their code"""
+    unused = {"app/lib.py#dead", "app/old.py#legacy", "app/old.py#body"}
+    files = UnusedCodeFinder.group_by_file(project_graph, unused)
+
+    assert [(file.id, file.unused, file.total, file.dead) for file in files] == [
+        ("app/old.py", ["app/old.py#body", "app/old.py#legacy"], 2, True),
+        ("app/lib.py", ["app/lib.py#dead"], 4, False),
+    ]
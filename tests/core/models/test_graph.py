@@ -112,4 +112,30 @@ class TestGraph:
         
         all_edges = graph.get_all_edges()
         assert len(all_edges) == 3
-        assert all(edge in all_edges for edge in sample_edges) 
\ No newline at end of file
+        assert all(edge in all_edges for edge in sample_edges)
+
+    def test_find_by_prefix(self, graph: Graph):
+        for node_id in ["core/graph/a.py", "core/graph/a.py#f", "core/graphs.py", "core/models/b.py", "utils"]:
+            graph.add_node(Node(id=node_id, name=node_id, type="file"))
+
+        assert graph.find_by_prefix("core/graph/") == ["core/graph/a.py", "core/graph/a.py#f"]
+        assert graph.find_by_prefix("core/graph") == ["core/graph/a.py", "core/graph/a.py#f", "core/graphs.py"]
+        assert graph.find_by_prefix("missing") == []
+
+        # The index follows added and removed nodes
+        graph.add_node(Node(id="core/graph/c.py", name="c.py", type="file"))
+        graph.remove_node("core/graph/a.py#f")
+        assert graph.find_by_prefix("core/graph/") == ["core/graph/a.py", "core/graph/c.py"]
+
+    def test_find_by_glob(self, graph: Graph):
+        for node_id in ["core/graph/builder.py#A", "core/graph/builder.py#B", "core/models/builder.py#C",
+                        "core/graph/parsing/builder.py#D", "core/graph/builder.py"]:
+            graph.add_node(Node(id=node_id, name=node_id, type="class"))
+
+        assert graph.find_by_glob("core/*/builder.py#*") == [
+            "core/graph/builder.py#A", "core/graph/builder.py#B", "core/models/builder.py#C"
+        ]
+        assert graph.find_by_glob("core/**/builder.py#D") == ["core/graph/parsing/builder.py#D"]
+        assert graph.resolve_ids(["core/graph/builder.py", "core/m*/*#?", "other"]) == [
+            "core/graph/builder.py", "core/models/builder.py#C", "other"
+        ]
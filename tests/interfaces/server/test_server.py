@@ -0,0 +1,74 @@
+import asyncio
+import os
+import pytest
+
+from core.graph.exporter import CSVGraphExporter
+from interfaces.server.client import ServerClient
+from interfaces.server.server import GraphServer
+
+
+@pytest.fixture
+def graph_path(tmp_path, make_graph):
+    path = tmp_path / "graph"
+    CSVGraphExporter.save(make_graph(), str(path))
+    return str(path)
+
+
+def test_requests_and_hot_reload(make_graph, graph_path):
+    """Test that queries are answered from memory and a changed graph is loaded again"""
+    server = GraphServer(workers=2)
+
+    async def scenario():
+        used = await server.handle({"method": "get_used", "params": {"graph": graph_path, "elements": ["a"]}})
+        assert used["ok"]
+        assert {record["id"] for record in used["result"] if record["kind"] == "node"} == {"a", "b"}
+
+        reach = await server.handle({"method": "reach", "params": {"graph": graph_path, "src": "a", "dest": "c"}})
+        assert reach["result"]["reaches"] is False
+
+        CSVGraphExporter.save(make_graph(extra_use=True), graph_path)
+        reach = await server.handle({"method": "reach", "params": {"graph": graph_path, "src": "a", "dest": "c"}})
+        assert reach["result"]["reaches"] is True
+
+        error = await server.handle({"method": "unknown"})
+        assert not error["ok"]
+
+        pairs = await server.handle({
+            "method": "reach",
+            "params": {
+                "graph": graph_path,
+                "pairs": [["a", "c"], ["a"], ["a", "b", "c"]]
+            }
+        })
+        assert pairs["ok"]
+        assert pairs["result"]["pairs"] == [True, None, None]
+
+        missing = await server.handle({"method": "reach", "params": {"graph": graph_path + "_missing", "src": "a"}})
+        assert not missing["ok"]
+        assert (await server.handle({"method": "ping"}))["result"] == [os.path.realpath(graph_path)]
+
+    asyncio.run(scenario())
+    server.executor.shutdown()
+
+
+def test_client_over_socket(tmp_path, graph_path):
+    """Test that the client reaches a server listening on a Unix socket"""
+    socket_path = str(tmp_path / "pyflow.sock")
+    server = GraphServer(socket_path, workers=1)
+    client = ServerClient(socket_path, timeout=5)
+
+    async def scenario():
+        task = asyncio.create_task(server.serve([graph_path]))
+        loop = asyncio.get_running_loop()
+        while not await loop.run_in_executor(None, client.is_running):
+            await asyncio.sleep(0.01)
+
+        graphs = await loop.run_in_executor(None, client.request, "ping", {})
+        assert graphs == [os.path.realpath(graph_path)]
+        with pytest.raises(Exception):
+            await loop.run_in_executor(None, client.request, "get_used", {"graph": str(tmp_path / "missing")})
+
+        task.cancel()
+
+    asyncio.run(scenario())
+    server.executor.shutdown()